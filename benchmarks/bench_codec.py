@@ -0,0 +1,116 @@
+"""
+benchmarks/bench_codec.py
+Events/sec for the callback and lead serialization paths, before vs after
+the common.models codec.
+
+  before: model_dump() → stdlib json → json.loads → AgentCallback(**d) per event
+  after:  pydantic-core to_json per event → byte join → TypeAdapter.validate_json
+
+Run from the repo root:
+    python -m benchmarks.bench_codec [--events 5000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from common.models import (
+    AgentCallback,
+    AgentType,
+    Lead,
+    encode_callback,
+    encode_callback_batch,
+    parse_callbacks,
+    validate_leads,
+)
+
+
+def make_leads(n: int) -> list[dict]:
+    return [
+        {
+            "place_id": f"place-{i}",
+            "business_name": f"Business {i}",
+            "address": f"{i} Main St",
+            "city": "Austin",
+            "phone": "+1 512 555 0100",
+            "rating": 4.2,
+            "total_ratings": 87,
+            "business_type": "restaurant",
+            "lead_status": "new",
+        }
+        for i in range(n)
+    ]
+
+
+def make_events(leads: list[dict]) -> list[AgentCallback]:
+    return [
+        AgentCallback(
+            agent_type=AgentType.LEAD_FINDER,
+            event="lead_found",
+            business_id=ld["place_id"],
+            business_name=ld["business_name"],
+            message=f"Discovered: {ld['business_name']}",
+            data=ld,
+        )
+        for ld in leads
+    ]
+
+
+def callbacks_before(events: list[AgentCallback]) -> int:
+    body = json.dumps([e.model_dump(mode="json") for e in events]).encode()
+    return len([AgentCallback(**d) for d in json.loads(body)])
+
+
+def callbacks_after(events: list[AgentCallback]) -> int:
+    body = encode_callback_batch([encode_callback(e) for e in events])
+    return len(parse_callbacks(body))
+
+
+def leads_before(raw: list[dict]) -> int:
+    out = []
+    for ld in raw:
+        try:
+            out.append(Lead(**ld))
+        except Exception:
+            continue
+    return len(out)
+
+
+def leads_after(raw: list[dict]) -> int:
+    return len(validate_leads(raw))
+
+
+def bench(fn, arg, n: int, repeat: int) -> float:
+    """Best-of-`repeat` throughput in items/sec."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        assert fn(arg) == n
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = make_leads(args.events)
+    events = make_events(raw)
+
+    rows = [
+        ("callbacks encode+decode", callbacks_before, callbacks_after, events),
+        ("lead validation", leads_before, leads_after, raw),
+    ]
+    print(f"{'path':<26}{'before/s':>14}{'after/s':>14}{'speedup':>10}")
+    for name, before, after, arg in rows:
+        b = bench(before, arg, args.events, args.repeat)
+        a = bench(after, arg, args.events, args.repeat)
+        print(f"{name:<26}{b:>14,.0f}{a:>14,.0f}{a / b:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
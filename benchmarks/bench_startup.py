@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_startup.py
+Cold-start import time per service module.
+
+Each measurement imports the service's app module in a fresh interpreter, so
+nothing is shared between runs — the same cost a scaled-from-zero container
+(or a uvicorn reload) pays before it can serve. Reports the best-of-N time,
+the heaviest top-level packages (from -X importtime), and optionally fails if
+a service exceeds a budget.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup [--repeat 5] [--top 5] [--budget-ms 800]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SERVICES = {
+    "lead_finder": "lead_finder.agent",
+    "lead_manager": "lead_manager.agent",
+    "sdr": "sdr.agent",
+    "deck_generator": "deck_generator.agent",
+    "gmail_listener": "gmail_pubsub_listener.gmail_listener_service",
+    "ui_client": "ui_client.main",
+}
+
+_PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH", "")]))
+    return env
+
+
+def import_seconds(module: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def heaviest_packages(module: str, top: int) -> list[tuple[str, float]]:
+    """Top-level packages by inclusive import time (ms), from -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    own = module.split(".")[0]
+    totals: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit() or "." in name or name in (own, "site", "encodings"):
+            continue
+        # Inclusive: a package imported by another is also counted in its parent
+        totals[name] = max(totals.get(name, 0.0), int(cumulative) / 1000)
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="heaviest packages to list per service (0 = none)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="exit non-zero if any service exceeds this")
+    parser.add_argument("services", nargs="*", choices=[[], *SERVICES], help="subset to measure (default: all)")
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'service':<16}{'import ms':>11}")
+    for name in args.services or SERVICES:
+        module = SERVICES[name]
+        ms = min(import_seconds(module) for _ in range(args.repeat)) * 1000
+        flag = ""
+        if args.budget_ms is not None and ms > args.budget_ms:
+            over_budget.append(name)
+            flag = "  OVER BUDGET"
+        print(f"{name:<16}{ms:>11.0f}{flag}")
+        if args.top:
+            heavy = ", ".join(f"{pkg} {t:.0f}" for pkg, t in heaviest_packages(module, args.top))
+            print(f"{'':<16}  {heavy}")
+
+    if over_budget:
+        sys.exit(f"over {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+benchmarks/bench_uds.py
+Callback throughput into the UI Client over loopback TCP vs its Unix socket.
+
+Starts the real UI Client (`python -m ui_client`) with UDS_DIR set, so it
+listens on both, then drives /agent_callback/batch the way
+common.callbacks.CallbackEmitter does — pre-encoded events, one pooled
+client, several senders — once per transport. Reports events/sec and
+per-request latency for each batch size; batch size 1 is the per-request
+overhead the socket removes, larger batches show how much of it is left once
+requests are amortised.
+
+Run from the repo root:
+    python -m benchmarks.bench_uds [--events 20000] [--batch 1 50] [--senders 8] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from common.config import HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_MAX_KEEPALIVE_CONNECTIONS
+from common.models import AgentCallback, AgentType, encode_callback, encode_callback_batch
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _env(uds_dir: str, port: int) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH", "")]))
+    env.update(UDS_DIR=uds_dir, UI_CLIENT_PORT=str(port), TRACING_ENABLED="false")
+    env.setdefault("STORAGE_BACKEND", "sqlite")
+    env.setdefault("SQLITE_PATH", os.path.join(uds_dir, "bench.db"))
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_events(n: int) -> list[bytes]:
+    return [
+        encode_callback(AgentCallback(
+            agent_type=AgentType.SDR,
+            event="research_completed",
+            business_id=f"place-{i}",
+            business_name=f"Business {i}",
+            message=f"Research complete for Business {i}",
+            data={"step": "research", "chars": 4096},
+        ))
+        for i in range(n)
+    ]
+
+
+async def wait_ready(port: int, path: str, proc: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                sys.exit(f"ui_client exited with {proc.returncode}")
+            if os.path.exists(path):
+                try:
+                    if (await client.get("/health", timeout=2)).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+            await asyncio.sleep(0.2)
+    sys.exit("ui_client did not become ready")
+
+
+async def drive(transport: httpx.AsyncHTTPTransport, port: int, events: list[bytes], batch: int, senders: int) -> tuple[float, list[float]]:
+    """Post every event in batches from `senders` concurrent tasks; returns (seconds, request latencies)."""
+    bodies = [encode_callback_batch(events[i:i + batch]) for i in range(0, len(events), batch)]
+    queue: asyncio.Queue[bytes] = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", transport=transport) as client:
+        await client.get("/health")  # open the first connection outside the timing
+
+        async def sender() -> None:
+            while not queue.empty():
+                body = queue.get_nowait()
+                t = time.perf_counter()
+                resp = await client.post(
+                    "/agent_callback/batch", content=body,
+                    headers={"Content-Type": "application/json"},
+                )
+                latencies.append(time.perf_counter() - t)
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(senders)))
+        return time.perf_counter() - start, latencies
+
+
+def _transport(uds: str | None) -> httpx.AsyncHTTPTransport:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    )
+    return httpx.AsyncHTTPTransport(uds=uds, limits=limits)
+
+
+async def bench(args, port: int, path: str) -> None:
+    events = make_events(args.events)
+    print(f"{args.events} events, {args.senders} senders, best of {args.repeat}")
+    print(f"{'batch':>6}  {'transport':<10}{'events/s':>11}{'req p50 ms':>12}{'req p99 ms':>12}")
+    for batch in args.batch:
+        rates = {}
+        for name, uds in (("tcp", None), ("unix", path)):
+            best = None
+            for _ in range(args.repeat):
+                seconds, latencies = await drive(_transport(uds), port, events, batch, args.senders)
+                if best is None or seconds < best[0]:
+                    best = (seconds, latencies)
+            seconds, latencies = best
+            rates[name] = args.events / seconds
+            p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) >= 2 else latencies[0]
+            print(
+                f"{batch:>6}  {name:<10}{rates[name]:>11.0f}"
+                f"{statistics.median(latencies) * 1000:>12.2f}{p99 * 1000:>12.2f}"
+            )
+        print(f"{'':>6}  unix/tcp  {rates['unix'] / rates['tcp']:>10.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 50], help="events per request")
+    parser.add_argument("--senders", type=int, default=8, help="concurrent requests in flight")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("Unix domain sockets are not available on this platform")
+
+    with tempfile.TemporaryDirectory(prefix="rr-uds-") as uds_dir:
+        port = _free_port()
+        path = os.path.join(uds_dir, "ui_client.sock")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "ui_client"],
+            cwd=ROOT, env=_env(uds_dir, port),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(wait_ready(port, path, proc))
+            asyncio.run(bench(args, port, path))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+common/bigquery_utils.py
+Shared BigQuery data-access layer.
+
+One process-wide bigquery.Client, table schemas in one place, and DDL
+(create_dataset + create_table) that runs at most once per table per process.
+The per-service `tools/bigquery_utils.py` modules are thin wrappers over this.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from common import metrics
+from common.config import (
+    GOOGLE_CLOUD_PROJECT,
+    BIGQUERY_DATASET,
+    BIGQUERY_LEADS_TABLE,
+    BIGQUERY_MEETINGS_TABLE,
+    BIGQUERY_SDR_SESSIONS_TABLE,
+    BIGQUERY_LLM_USAGE_TABLE,
+)
+
+logger = logging.getLogger(__name__)
+
+# ── Schemas ──────────────────────────────────────────────────
+
+LEADS_SCHEMA = [
+    {"name": "place_id", "type": "STRING", "mode": "REQUIRED"},
+    {"name": "business_name", "type": "STRING"},
+    {"name": "address", "type": "STRING"},
+    {"name": "city", "type": "STRING"},
+    {"name": "phone", "type": "STRING"},
+    {"name": "email", "type": "STRING"},
+    {"name": "website", "type": "STRING"},
+    {"name": "rating", "type": "FLOAT"},
+    {"name": "total_ratings", "type": "INTEGER"},
+    {"name": "business_type", "type": "STRING"},
+    {"name": "has_website", "type": "BOOLEAN"},
+    {"name": "lead_status", "type": "STRING"},
+    {"name": "discovered_at", "type": "TIMESTAMP"},
+    {"name": "notes", "type": "STRING"},
+]
+
+MEETINGS_SCHEMA = [
+    {"name": "meeting_id", "type": "STRING"},
+    {"name": "lead_place_id", "type": "STRING"},
+    {"name": "business_name", "type": "STRING"},
+    {"name": "attendee_email", "type": "STRING"},
+    {"name": "start_time", "type": "STRING"},
+    {"name": "end_time", "type": "STRING"},
+    {"name": "google_meet_link", "type": "STRING"},
+    {"name": "calendar_event_id", "type": "STRING"},
+    {"name": "created_at", "type": "TIMESTAMP"},
+    {"name": "notes", "type": "STRING"},
+]
+
+SDR_SCHEMA = [
+    {"name": "session_id", "type": "STRING", "mode": "REQUIRED"},
+    {"name": "lead_place_id", "type": "STRING"},
+    {"name": "business_name", "type": "STRING"},
+    {"name": "research_summary", "type": "STRING"},
+    {"name": "proposal_summary", "type": "STRING"},
+    {"name": "call_transcript", "type": "STRING"},
+    {"name": "call_outcome", "type": "STRING"},
+    {"name": "email_sent", "type": "BOOLEAN"},
+    {"name": "email_subject", "type": "STRING"},
+    {"name": "degraded_steps", "type": "STRING"},  # JSON: step → cheaper path taken for lack of time
+    {"name": "created_at", "type": "TIMESTAMP"},
+]
+
+# One row per LLM attempt or cache hit (common.ledger)
+LLM_USAGE_SCHEMA = [
+    {"name": "call_id", "type": "STRING", "mode": "REQUIRED"},
+    {"name": "created_at", "type": "TIMESTAMP"},
+    {"name": "service", "type": "STRING"},
+    {"name": "call_site", "type": "STRING"},
+    {"name": "model", "type": "STRING"},
+    {"name": "status", "type": "STRING"},
+    {"name": "cached", "type": "BOOLEAN"},
+    {"name": "input_tokens", "type": "INTEGER"},
+    {"name": "output_tokens", "type": "INTEGER"},
+    {"name": "tokens_estimated", "type": "BOOLEAN"},
+    {"name": "latency_ms", "type": "FLOAT"},
+    {"name": "cost_usd", "type": "FLOAT"},
+    {"name": "session_id", "type": "STRING"},
+    {"name": "lead_place_id", "type": "STRING"},
+    {"name": "city", "type": "STRING"},
+    {"name": "trace_id", "type": "STRING"},
+]
+
+TABLE_SCHEMAS: dict[str, list[dict[str, str]]] = {
+    BIGQUERY_LEADS_TABLE: LEADS_SCHEMA,
+    BIGQUERY_MEETINGS_TABLE: MEETINGS_SCHEMA,
+    BIGQUERY_SDR_SESSIONS_TABLE: SDR_SCHEMA,
+    BIGQUERY_LLM_USAGE_TABLE: LLM_USAGE_SCHEMA,
+}
+
+# ── Client singleton ─────────────────────────────────────────
+
+_client = None
+_client_lock = threading.Lock()
+
+_ready_tables: set[str] = set()
+_ddl_lock = threading.Lock()
+_ddl_cache = metrics.CacheStats("bigquery_ddl")
+
+
+def get_client():
+    """Return the process-wide BigQuery client (lazy; None if unavailable)."""
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            try:
+                from google.cloud import bigquery
+                _client = bigquery.Client(project=GOOGLE_CLOUD_PROJECT)
+            except Exception as e:
+                logger.error(f"BigQuery client init failed: {e}")
+                return None
+    return _client
+
+
+def table_ref(table: str) -> str:
+    """Fully-qualified `project.dataset.table` reference."""
+    return f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{table}"
+
+
+# ── DDL (memoized) ───────────────────────────────────────────
+
+def ensure_table(table: str, schema: list[dict[str, str]] | None = None) -> bool:
+    """
+    Create the dataset and table if they don't exist, and add schema fields
+    an existing table is missing (new columns are NULLABLE).
+    Runs the DDL once per table per process; later calls are a set lookup.
+    """
+    if table in _ready_tables:
+        _ddl_cache.hit()
+        return True
+    _ddl_cache.miss()
+
+    schema = schema or TABLE_SCHEMAS.get(table)
+    if not schema:
+        logger.warning(f"No schema registered for table {table}")
+        return False
+
+    with _ddl_lock:
+        if table in _ready_tables:
+            return True
+        client = get_client()
+        if not client:
+            return False
+        try:
+            from google.cloud import bigquery
+
+            dataset_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}"
+            dataset = bigquery.Dataset(dataset_ref)
+            dataset.location = "US"
+            client.create_dataset(dataset, exists_ok=True)
+
+            fields = [
+                bigquery.SchemaField(f["name"], f["type"], mode=f.get("mode", "NULLABLE"))
+                for f in schema
+            ]
+            existing = client.create_table(bigquery.Table(table_ref(table), schema=fields), exists_ok=True)
+            known = {f.name for f in existing.schema}
+            missing = [f for f in fields if f.name not in known]
+            if missing:
+                existing.schema = [*existing.schema, *missing]
+                client.update_table(existing, ["schema"])
+                logger.info(f"Added {[f.name for f in missing]} to {table_ref(table)}")
+            _ready_tables.add(table)
+            logger.info(f"Table {table_ref(table)} ready")
+            return True
+        except Exception as e:
+            logger.error(f"ensure_table failed for {table}: {e}")
+            return False
+
+
+# ── Data access ──────────────────────────────────────────────
+
+def insert_rows(table: str, rows: list[dict[str, Any]]) -> list[str]:
+    """
+    Stream rows into a table, creating it on first use.
+
+    Returns:
+        A list of error strings (empty on success).
+    """
+    if not rows:
+        return []
+    client = get_client()
+    if not client:
+        return ["BigQuery client unavailable"]
+
+    ensure_table(table)
+    try:
+        errors = client.insert_rows_json(table_ref(table), rows)
+        return [str(e) for e in errors] if errors else []
+    except Exception as e:
+        logger.error(f"BQ insert into {table} failed: {e}")
+        return [str(e)]
+
+
+def query(sql: str, params: dict[str, tuple[str, Any]] | None = None) -> list[dict[str, Any]]:
+    """
+    Run a parameterized query and return rows as dicts.
+
+    Args:
+        sql: Standard SQL; reference tables with table_ref().
+        params: name → (BigQuery type, value), e.g. {"email": ("STRING", "a@b.c")}.
+
+    Raises:
+        RuntimeError if the client is unavailable; BigQuery errors propagate.
+    """
+    client = get_client()
+    if not client:
+        raise RuntimeError("BigQuery unavailable")
+
+    from google.cloud import bigquery as bq
+    job_config = bq.QueryJobConfig(
+        query_parameters=[
+            bq.ScalarQueryParameter(name, typ, value)
+            for name, (typ, value) in (params or {}).items()
+        ]
+    )
+    return [dict(row) for row in client.query(sql, job_config=job_config).result()]
+
+
+def update_lead_status(place_id: str, new_status: str) -> None:
+    """Set a lead's status. Raises on failure."""
+    query(
+        f"""
+        UPDATE `{table_ref(BIGQUERY_LEADS_TABLE)}`
+        SET lead_status = @new_status
+        WHERE place_id = @place_id
+        """,
+        {"new_status": ("STRING", new_status), "place_id": ("STRING", place_id)},
+    )
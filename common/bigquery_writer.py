@@ -0,0 +1,220 @@
+"""
+common/bigquery_writer.py
+Async micro-batching writer for BigQuery streaming inserts.
+
+Callers hand rows for any table to write() and get back a future that
+resolves to that submission's error list (empty on success). A background
+task groups queued rows per table and flushes a batch once it reaches
+BQ_WRITER_BATCH_SIZE rows or the oldest row has waited
+BQ_WRITER_FLUSH_INTERVAL_MS. Inserts run off the event loop, at most
+BQ_WRITER_MAX_INFLIGHT at a time; when BigQuery lags, the queue fills and
+write() waits for space (backpressure) instead of buffering without bound.
+
+Usage:
+    from common.bigquery_writer import bq_writer
+
+    future = await bq_writer.write(BIGQUERY_MEETINGS_TABLE, [row])
+    errors = await future          # optional — fire-and-forget is fine too
+
+    # In lifespan:
+    await bq_writer.start()
+    ...
+    await bq_writer.stop()         # flushes pending rows
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from common import bigquery_utils as bq
+from common import metrics
+from common.config import (
+    BQ_WRITER_BATCH_SIZE,
+    BQ_WRITER_FLUSH_INTERVAL_MS,
+    BQ_WRITER_MAX_INFLIGHT,
+    BQ_WRITER_QUEUE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # queue sentinel: flush and exit
+
+
+@dataclass
+class _Submission:
+    table: str
+    rows: list[dict[str, Any]]
+    future: asyncio.Future = field(repr=False)
+
+
+def _insert(table: str, rows: list[dict[str, Any]]) -> dict[int, list[str]]:
+    """Blocking insert (runs on a worker thread). Returns row index → error messages."""
+    client = bq.get_client()
+    if not client:
+        raise RuntimeError("BigQuery client unavailable")
+    bq.ensure_table(table)
+    result = client.insert_rows_json(bq.table_ref(table), rows)
+    errors: dict[int, list[str]] = {}
+    for entry in result or []:
+        idx = entry.get("index", -1) if isinstance(entry, dict) else -1
+        errors.setdefault(idx, []).append(str(entry))
+    return errors
+
+
+class BigQueryWriter:
+    """Buffers rows per table and streams them to BigQuery in micro-batches."""
+
+    def __init__(
+        self,
+        batch_size: int = BQ_WRITER_BATCH_SIZE,
+        flush_interval: float = BQ_WRITER_FLUSH_INTERVAL_MS / 1000,
+        max_inflight: int = BQ_WRITER_MAX_INFLIGHT,
+        max_queue_size: int = BQ_WRITER_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_inflight = max_inflight
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    # ── Lifecycle ────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Start the background flusher on the running loop."""
+        self._ensure_running()
+
+    def _ensure_running(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._task = asyncio.create_task(self._run(), name="bigquery-writer")
+
+    async def stop(self) -> None:
+        """Flush everything queued, wait for in-flight inserts, then stop."""
+        if not self._task or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    # ── Producer side ────────────────────────────────────────
+
+    async def write(self, table: str, rows: list[dict[str, Any]]) -> asyncio.Future:
+        """
+        Queue rows for insertion. Waits only if the queue is full.
+
+        Args:
+            table: Table name (dataset comes from config).
+            rows: JSON-serializable row dicts.
+
+        Returns:
+            A future resolving to this submission's list of error strings.
+        """
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        if not rows:
+            future.set_result([])
+            return future
+        await self._queue.put(_Submission(table, list(rows), future))
+        return future
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    # ── Consumer side ────────────────────────────────────────
+
+    async def _run(self) -> None:
+        buffers: dict[str, list[_Submission]] = {}
+        counts: dict[str, int] = {}
+        deadline: float | None = None
+
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is _STOP:
+                for table in list(buffers):
+                    await self._dispatch(table, buffers.pop(table))
+                return
+
+            if item is not None:
+                buffers.setdefault(item.table, []).append(item)
+                counts[item.table] = counts.get(item.table, 0) + len(item.rows)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if counts[item.table] >= self.batch_size:
+                    counts.pop(item.table)
+                    await self._dispatch(item.table, buffers.pop(item.table))
+
+            if deadline is not None and time.monotonic() >= deadline:
+                for table in list(buffers):
+                    await self._dispatch(table, buffers.pop(table))
+                counts.clear()
+                deadline = None
+            elif not buffers:
+                deadline = None
+
+    async def _dispatch(self, table: str, batch: list[_Submission]) -> None:
+        # Blocks the consumer while max_inflight inserts are outstanding — that
+        # is what lets the queue fill up and push back on producers.
+        await self._inflight.acquire()
+        task = asyncio.create_task(self._flush(table, batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, table: str, batch: list[_Submission]) -> None:
+        rows = [row for sub in batch for row in sub.rows]
+        try:
+            errors = await asyncio.to_thread(_insert, table, rows)
+        except Exception as e:
+            logger.error(f"BQ batch insert into {table} ({len(rows)} rows) failed: {e}")
+            for sub in batch:
+                if not sub.future.done():
+                    sub.future.set_result([str(e)])
+            return
+        finally:
+            self._inflight.release()
+
+        if errors:
+            logger.warning(f"BQ batch insert into {table}: {len(errors)} of {len(rows)} rows rejected")
+        offset = 0
+        for sub in batch:
+            sub_errors = [
+                msg
+                for i in range(offset, offset + len(sub.rows))
+                for msg in errors.get(i, [])
+            ]
+            offset += len(sub.rows)
+            if not sub.future.done():
+                sub.future.set_result(sub_errors)
+
+
+def log_write_errors(future: asyncio.Future, what: str) -> None:
+    """Attach a callback that logs a fire-and-forget write's errors."""
+    def _done(f: asyncio.Future) -> None:
+        if not f.cancelled() and f.result():
+            logger.error(f"{what} failed: {f.result()}")
+    future.add_done_callback(_done)
+
+
+# Process-wide writer shared by every service module
+bq_writer = BigQueryWriter()
+
+metrics.gauge(
+    "rapidreach_bigquery_writer_queue_depth", "Submissions waiting for the BigQuery writer",
+    fn=lambda: bq_writer.pending,
+)
@@ -0,0 +1,184 @@
+"""
+common/callbacks.py
+Non-blocking, batched emitter for AgentCallback events.
+
+Agents used to await one POST per event, so a pipeline stalled on the
+dashboard's availability and a 200-lead search meant 200 sequential POSTs.
+The emitter queues events in-process and a background task flushes them to
+`<callback_url>/batch` once a batch is full or the oldest event has waited
+CALLBACK_BATCH_MAX_DELAY_MS. emit() never blocks or raises.
+
+Usage:
+    from common.callbacks import callback_emitter
+
+    callback_emitter.emit(callback_url, AgentCallback(...))
+
+    # In lifespan:
+    await callback_emitter.start()
+    ...
+    await callback_emitter.stop()   # flushes pending events
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from common import metrics
+from common.config import (
+    CALLBACK_BATCH_MAX_DELAY_MS,
+    CALLBACK_BATCH_MAX_SIZE,
+    CALLBACK_QUEUE_SIZE,
+    UI_CLIENT_URL,
+)
+from common.http_clients import get_client
+from common.models import AgentCallback, encode_callback, encode_callback_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALLBACK_URL = f"{UI_CLIENT_URL}/agent_callback"
+
+_STOP = object()  # queue sentinel: flush and exit
+
+
+def batch_url(callback_url: str) -> str:
+    """Map a single-event callback URL to its bulk counterpart."""
+    return callback_url.rstrip("/") + "/batch"
+
+
+class CallbackEmitter:
+    """Coalesces AgentCallbacks into per-URL batches and posts them in the background."""
+
+    def __init__(
+        self,
+        max_batch_size: int = CALLBACK_BATCH_MAX_SIZE,
+        max_delay: float = CALLBACK_BATCH_MAX_DELAY_MS / 1000,
+        max_queue_size: int = CALLBACK_QUEUE_SIZE,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    # ── Lifecycle ────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Start the background flusher on the running loop."""
+        self._ensure_running()
+
+    def _ensure_running(self) -> None:
+        if self._task and not self._task.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        # A dead worker is replaced on the same queue: events still in it are sent
+        self._task = asyncio.create_task(self._run(), name="callback-emitter")
+
+    async def stop(self) -> None:
+        """Flush whatever is queued, then stop the flusher."""
+        if not self._task or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    # ── Producer side ────────────────────────────────────────
+
+    def emit(self, callback_url: str, payload: AgentCallback) -> None:
+        """
+        Queue an event for delivery. Returns immediately.
+
+        Args:
+            callback_url: Single-event callback URL (defaults to the UI Client).
+            payload: The event to deliver.
+        """
+        url = callback_url or DEFAULT_CALLBACK_URL
+        try:
+            self._ensure_running()
+        except RuntimeError:
+            logger.warning(f"UI callback dropped (no event loop): {payload.event}")
+            return
+
+        try:
+            # Encoded once here (pydantic-core); batches are joined as raw bytes
+            self._queue.put_nowait((url, encode_callback(payload)))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"UI callback queue full, dropping '{payload.event}' ({self.dropped} dropped)")
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    # ── Consumer side ────────────────────────────────────────
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._send(batch)
+            if stopping:
+                # Anything enqueued ahead of the sentinel has been sent;
+                # pick up stragglers that raced in behind it.
+                rest = []
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is not _STOP:
+                        rest.append(item)
+                if rest:
+                    await self._send(rest)
+                return
+
+    async def _send(self, batch: list[tuple[str, bytes]]) -> None:
+        """POST one request per callback URL, preserving event order."""
+        by_url: dict[str, list[bytes]] = {}
+        for url, event in batch:
+            by_url.setdefault(url, []).append(event)
+
+        client = get_client("ui_client")
+        for url, events in by_url.items():
+            for i in range(0, len(events), self.max_batch_size):
+                chunk = events[i:i + self.max_batch_size]
+                try:
+                    resp = await client.post(
+                        batch_url(url),
+                        content=encode_callback_batch(chunk),
+                        headers={"Content-Type": "application/json"},
+                        timeout=10,
+                    )
+                    resp.raise_for_status()
+                except Exception as e:
+                    logger.warning(f"UI callback batch ({len(chunk)} events) failed: {e}")
+
+
+# Process-wide emitter shared by every service module
+callback_emitter = CallbackEmitter()
+
+metrics.gauge(
+    "rapidreach_callback_queue_depth", "UI callback events waiting to be sent",
+    fn=lambda: callback_emitter.pending,
+)
+metrics.gauge(
+    "rapidreach_callback_events_dropped", "UI callback events dropped because the queue was full",
+    fn=lambda: callback_emitter.dropped,
+)
@@ -0,0 +1,196 @@
+"""
+common/concurrency.py
+Adaptive (AIMD) concurrency limits in front of each external dependency.
+
+Static limits are wrong half the time: Places latency varies by region and
+model latency swings widely. Each limiter tracks a smoothed baseline latency
+for its dependency and adjusts how many calls may be in flight:
+
+  - additive increase: while the limit is saturated and latency stays within
+    ADAPTIVE_LATENCY_TOLERANCE × baseline, the limit grows by ~1 per window
+    of `limit` successful calls;
+  - multiplicative decrease: an error, or a sample slower than the tolerance,
+    multiplies the limit by ADAPTIVE_BACKOFF_RATIO (at most once per baseline
+    latency, so one overload episode backs off once, not once per request).
+
+Every successful sample, slow ones included, moves the baseline, so a limiter
+whose first sample was unusually fast settles on the real latency instead of
+backing off forever. Calls with very different latencies (a short classify vs
+a research run on the same model) belong in separate limiters — see `key`.
+
+Calls beyond the limit wait in FIFO order. The current limit and in-flight
+count are exported on /metrics. This complements common.ratelimit: token
+buckets enforce the provider's quota, the limiter keeps latency flat under it.
+
+Usage:
+    from common.concurrency import get_limiter
+
+    async with get_limiter("places"):
+        resp = await client.get(...)
+
+    async with get_limiter("dedalus", key=f"{model}/{site}"):   # one per model + call site
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+
+from common import metrics
+from common.config import (
+    ADAPTIVE_BACKOFF_RATIO,
+    ADAPTIVE_LATENCY_TOLERANCE,
+    ADAPTIVE_LIMITS,
+)
+
+DEFAULT_LIMITS = (4, 1, 32)  # initial, min, max for dependencies missing from ADAPTIVE_LIMITS
+_BASELINE_SMOOTHING = 0.05
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one dependency (enter it via get_limiter())."""
+
+    def __init__(
+        self,
+        name: str,
+        initial: float = DEFAULT_LIMITS[0],
+        min_limit: float = DEFAULT_LIMITS[1],
+        max_limit: float = DEFAULT_LIMITS[2],
+        tolerance: float = ADAPTIVE_LATENCY_TOLERANCE,
+        backoff: float = ADAPTIVE_BACKOFF_RATIO,
+    ):
+        self.name = name
+        self.min_limit = max(1.0, float(min_limit))
+        self.max_limit = max(self.min_limit, float(max_limit))
+        self.limit = min(max(float(initial), self.min_limit), self.max_limit)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline: float | None = None  # smoothed latency of healthy calls (seconds)
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    # ── Slots ────────────────────────────────────────────────
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # A slot was handed over just as we were cancelled — give it back
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self, latency: float | None, ok: bool = True) -> None:
+        """Return a slot; `latency` None means no sample (e.g. the call was cancelled)."""
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if latency is not None:
+            self._adjust(latency, ok, saturated)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+
+    # ── AIMD ─────────────────────────────────────────────────
+
+    def _adjust(self, latency: float, ok: bool, saturated: bool) -> None:
+        if not ok:
+            self._decrease()
+            return
+        if self.baseline is None:
+            self.baseline = latency
+        slow = latency > self.baseline * self.tolerance
+        self.baseline += (latency - self.baseline) * _BASELINE_SMOOTHING
+        if slow:
+            self._decrease()
+            return
+        if saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self.baseline or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+
+class _Slot:
+    """Per-call context (the limiter itself can't hold a start time for concurrent callers)."""
+
+    __slots__ = ("_limiter", "_t0")
+
+    def __init__(self, limiter: AdaptiveLimiter):
+        self._limiter = limiter
+
+    async def __aenter__(self) -> AdaptiveLimiter:
+        await self._limiter.acquire()
+        self._t0 = time.perf_counter()
+        return self._limiter
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            self._limiter.release(None)
+        else:
+            self._limiter.release(time.perf_counter() - self._t0, ok=exc_type is None)
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(dependency: str, key: str = "") -> _Slot:
+    """
+    Return a slot context for the dependency's limiter (created on first use
+    from ADAPTIVE_LIMITS). `key` splits a dependency into independent limiters,
+    e.g. one per LLM model and call site.
+    """
+    name = f"{dependency}:{key}" if key else dependency
+    limiter = _limiters.get(name)
+    if limiter is None:
+        initial, min_limit, max_limit = ADAPTIVE_LIMITS.get(dependency, DEFAULT_LIMITS)
+        limiter = _limiters[name] = AdaptiveLimiter(name, initial, min_limit, max_limit)
+    return _Slot(limiter)
+
+
+def snapshot() -> dict[str, dict[str, float | None]]:
+    """Current state of every limiter (for health/debug output)."""
+    return {
+        name: {"limit": round(lim.limit, 2), "in_flight": lim.in_flight, "baseline_s": lim.baseline}
+        for name, lim in _limiters.items()
+    }
+
+
+metrics.gauge(
+    "rapidreach_concurrency_limit", "Current adaptive concurrency limit", ("limiter",),
+    fn=lambda: {(name,): lim.limit for name, lim in _limiters.items()},
+)
+metrics.gauge(
+    "rapidreach_concurrency_in_flight", "Calls holding an adaptive concurrency slot", ("limiter",),
+    fn=lambda: {(name,): lim.in_flight for name, lim in _limiters.items()},
+)
+metrics.gauge(
+    "rapidreach_concurrency_waiting", "Calls queued for an adaptive concurrency slot", ("limiter",),
+    fn=lambda: {(name,): lim.waiting for name, lim in _limiters.items()},
+)
@@ -14,6 +14,7 @@ LEAD_FINDER_PORT = int(os.getenv("LEAD_FINDER_PORT", "8081"))
 LEAD_MANAGER_PORT = int(os.getenv("LEAD_MANAGER_PORT", "8082"))
 GMAIL_LISTENER_PORT = int(os.getenv("GMAIL_LISTENER_PORT", "8083"))
 SDR_PORT = int(os.getenv("SDR_PORT", "8084"))
+DECK_GENERATOR_PORT = int(os.getenv("DECK_GENERATOR_PORT", "8086"))
 UI_CLIENT_PORT = int(os.getenv("UI_CLIENT_PORT", "8000"))
 
 # ── Service URLs ─────────────────────────────────────────────
@@ -21,8 +22,25 @@ LEAD_FINDER_SERVICE_URL = os.getenv("LEAD_FINDER_SERVICE_URL", f"http://localhos
 LEAD_MANAGER_SERVICE_URL = os.getenv("LEAD_MANAGER_SERVICE_URL", f"http://localhost:{LEAD_MANAGER_PORT}")
 GMAIL_LISTENER_SERVICE_URL = os.getenv("GMAIL_LISTENER_SERVICE_URL", f"http://localhost:{GMAIL_LISTENER_PORT}")
 SDR_SERVICE_URL = os.getenv("SDR_SERVICE_URL", f"http://localhost:{SDR_PORT}")
+DECK_GENERATOR_SERVICE_URL = os.getenv("DECK_GENERATOR_SERVICE_URL", f"http://localhost:{DECK_GENERATOR_PORT}")
 UI_CLIENT_URL = os.getenv("UI_CLIENT_URL", f"http://localhost:{UI_CLIENT_PORT}")
 
+# ── Shared HTTP Clients ──────────────────────────────────────
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# ── Unix Domain Sockets (common.serve) ───────────────────────
+# Services also listen on {UDS_DIR}/{service}.sock; pooled clients use the
+# socket for targets on this host. Empty = TCP only.
+UDS_DIR = os.getenv("UDS_DIR", "")
+
+# ── UI Callbacks ─────────────────────────────────────────────
+CALLBACK_BATCH_MAX_SIZE = int(os.getenv("CALLBACK_BATCH_MAX_SIZE", "50"))
+CALLBACK_BATCH_MAX_DELAY_MS = int(os.getenv("CALLBACK_BATCH_MAX_DELAY_MS", "100"))
+CALLBACK_QUEUE_SIZE = int(os.getenv("CALLBACK_QUEUE_SIZE", "10000"))
+
 # ── Artifact Names (main result payloads) ────────────────────
 LEAD_FINDER_ARTIFACT = "lead_results"
 LEAD_MANAGER_ARTIFACT = "lead_management_decision"
@@ -33,13 +51,138 @@ BIGQUERY_DATASET = os.getenv("BIGQUERY_DATASET", "salesshortcut")
 BIGQUERY_LEADS_TABLE = os.getenv("BIGQUERY_LEADS_TABLE", "leads")
 BIGQUERY_MEETINGS_TABLE = os.getenv("BIGQUERY_MEETINGS_TABLE", "meetings")
 BIGQUERY_SDR_SESSIONS_TABLE = os.getenv("BIGQUERY_SDR_SESSIONS_TABLE", "sdr_sessions")
+BIGQUERY_LLM_USAGE_TABLE = os.getenv("BIGQUERY_LLM_USAGE_TABLE", "llm_usage")
 GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "")
+BQ_WRITER_BATCH_SIZE = int(os.getenv("BQ_WRITER_BATCH_SIZE", "500"))           # rows per insert
+BQ_WRITER_FLUSH_INTERVAL_MS = int(os.getenv("BQ_WRITER_FLUSH_INTERVAL_MS", "1000"))
+BQ_WRITER_MAX_INFLIGHT = int(os.getenv("BQ_WRITER_MAX_INFLIGHT", "2"))         # concurrent inserts
+BQ_WRITER_QUEUE_SIZE = int(os.getenv("BQ_WRITER_QUEUE_SIZE", "1000"))          # queued submissions before backpressure
+
+# ── Startup ──────────────────────────────────────────────────
+PREWARM_STEP_TIMEOUT_SECONDS = float(os.getenv("PREWARM_STEP_TIMEOUT_SECONDS", "20"))
+
+# ── Storage ──────────────────────────────────────────────────
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "bigquery").lower()            # bigquery | sqlite
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/rapidreach.db")
+
+# ── Rate Limits ──────────────────────────────────────────────
+# Token buckets shared by all services on a host (see common.ratelimit).
+# Each API: (tokens per second, burst). A rate of 0 disables the bucket.
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR", "data/ratelimits")               # "" = per-process buckets
+RATE_LIMITS: dict[str, tuple[float, float]] = {
+    "places": (float(os.getenv("RATE_LIMIT_PLACES_RPS", "10")), float(os.getenv("RATE_LIMIT_PLACES_BURST", "10"))),
+    "gmail_send": (float(os.getenv("RATE_LIMIT_GMAIL_SEND_RPS", "2")), float(os.getenv("RATE_LIMIT_GMAIL_SEND_BURST", "5"))),
+    "gmail_modify": (float(os.getenv("RATE_LIMIT_GMAIL_MODIFY_RPS", "20")), float(os.getenv("RATE_LIMIT_GMAIL_MODIFY_BURST", "20"))),
+    "calendar_insert": (float(os.getenv("RATE_LIMIT_CALENDAR_INSERT_RPS", "5")), float(os.getenv("RATE_LIMIT_CALENDAR_INSERT_BURST", "5"))),
+    "elevenlabs_calls": (float(os.getenv("RATE_LIMIT_ELEVENLABS_CALLS_RPS", "1")), float(os.getenv("RATE_LIMIT_ELEVENLABS_CALLS_BURST", "2"))),
+}
+
+# ── Adaptive Concurrency ─────────────────────────────────────
+# AIMD limits per dependency (see common.concurrency): (initial, min, max)
+ADAPTIVE_LIMITS: dict[str, tuple[int, int, int]] = {
+    "places": (8, 1, int(os.getenv("ADAPTIVE_MAX_PLACES", "32"))),
+    "dedalus": (4, 1, int(os.getenv("ADAPTIVE_MAX_DEDALUS", "16"))),
+    "gmail": (4, 1, int(os.getenv("ADAPTIVE_MAX_GMAIL", "16"))),
+    "calendar": (4, 1, int(os.getenv("ADAPTIVE_MAX_CALENDAR", "16"))),
+}
+ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "2.0"))  # × baseline before backing off
+ADAPTIVE_BACKOFF_RATIO = float(os.getenv("ADAPTIVE_BACKOFF_RATIO", "0.9"))
+
+# ── Tracing ──────────────────────────────────────────────────
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_EXPORT_URL = os.getenv("TRACE_EXPORT_URL", f"{UI_CLIENT_URL}/api/traces/spans")
+TRACE_EXPORT_BATCH_SIZE = int(os.getenv("TRACE_EXPORT_BATCH_SIZE", "200"))
+TRACE_EXPORT_INTERVAL_MS = int(os.getenv("TRACE_EXPORT_INTERVAL_MS", "1000"))
+TRACE_STORE_MAX_TRACES = int(os.getenv("TRACE_STORE_MAX_TRACES", "200"))     # kept by the UI Client
 
 # ── LLM Models ───────────────────────────────────────────────
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "openai/gpt-4.1")
 RESEARCH_MODEL = os.getenv("RESEARCH_MODEL", "openai/gpt-4.1")
 CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", "openai/gpt-4.1")
 DRAFT_MODEL = os.getenv("DRAFT_MODEL", "anthropic/claude-sonnet-4-20250514")
+FAST_MODEL = os.getenv("FAST_MODEL", "openai/gpt-4.1-mini")  # last-resort fallback for routed calls
+
+# ── Model Routing (common.router) ────────────────────────────
+# Rough list price (USD per 1M input / output tokens) and capabilities. Routes
+# filter candidates by output cost and requirements (unknown models pass); the
+# LLM ledger prices each call with both. prompt_cache_key / prompt_cache_control
+# say how a model takes prompt-prefix caching hints (common.prompts).
+MODEL_PROFILES: dict[str, dict] = {
+    "openai/gpt-4.1": {
+        "input_cost": 2.0, "cost": 8.0, "capabilities": {"tools", "structured_output", "prompt_cache_key"},
+    },
+    "openai/gpt-4.1-mini": {
+        "input_cost": 0.4, "cost": 1.6, "capabilities": {"tools", "structured_output", "prompt_cache_key"},
+    },
+    "anthropic/claude-sonnet-4-20250514": {
+        "input_cost": 3.0, "cost": 15.0, "capabilities": {"tools", "structured_output", "prompt_cache_control"},
+    },
+}
+
+# Per call site: candidate models in preference order (comma-separated; the
+# router drops duplicates), p90 latency budget in seconds (a model over it is
+# degraded), per-attempt timeout before failing over, cost ceiling, requirements.
+LLM_ROUTES: dict[str, dict] = {
+    "research": {
+        "models": os.getenv("LLM_ROUTE_RESEARCH_MODELS", f"{RESEARCH_MODEL},{DEFAULT_MODEL},{FAST_MODEL}"),
+        "latency_budget_s": 45.0, "failover_timeout_s": 90.0, "max_cost": None, "requires": set(),
+    },
+    "draft": {
+        "models": os.getenv("LLM_ROUTE_DRAFT_MODELS", f"{DRAFT_MODEL},{DEFAULT_MODEL},{FAST_MODEL}"),
+        "latency_budget_s": 30.0, "failover_timeout_s": 60.0, "max_cost": None, "requires": set(),
+    },
+    "review": {
+        "models": os.getenv("LLM_ROUTE_REVIEW_MODELS", f"{CLASSIFIER_MODEL},{DEFAULT_MODEL},{FAST_MODEL}"),
+        "latency_budget_s": 30.0, "failover_timeout_s": 60.0, "max_cost": None, "requires": set(),
+    },
+    "classify": {
+        "models": os.getenv("LLM_ROUTE_CLASSIFY_MODELS", f"{CLASSIFIER_MODEL},{FAST_MODEL}"),
+        "latency_budget_s": 10.0, "failover_timeout_s": 30.0, "max_cost": 10.0,
+        "requires": {"structured_output"},
+    },
+}
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))                   # recent calls kept per model
+LLM_ROUTER_WINDOW_SECONDS = float(os.getenv("LLM_ROUTER_WINDOW_SECONDS", "600"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+
+# ── LLM Gateway (common.llm) ─────────────────────────────────
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))              # per attempt, tool-less runs
+LLM_AGENT_TIMEOUT_SECONDS = float(os.getenv("LLM_AGENT_TIMEOUT_SECONDS", "900"))  # per attempt, runs with tools
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1.0"))
+LLM_LEDGER_ENABLED = os.getenv("LLM_LEDGER_ENABLED", "true").lower() in ("1", "true", "yes")  # common.ledger
+
+# ── LLM Response Cache (common.llm_cache) ────────────────────
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_DEFAULT_TTL_SECONDS", "3600"))
+# Per call site; set LLM_CACHE_TTL_<SITE>=0 to stop caching one
+LLM_CACHE_TTLS: dict[str, int] = {
+    "research": int(os.getenv("LLM_CACHE_TTL_RESEARCH", str(7 * 86400))),
+    "draft_proposal": int(os.getenv("LLM_CACHE_TTL_DRAFT_PROPOSAL", "86400")),
+    "fact_check": int(os.getenv("LLM_CACHE_TTL_FACT_CHECK", "86400")),
+    "analyze_email": int(os.getenv("LLM_CACHE_TTL_ANALYZE_EMAIL", str(7 * 86400))),
+    "deck_content": int(os.getenv("LLM_CACHE_TTL_DECK_CONTENT", "86400")),
+}
+
+# ── Idempotency Keys (common.idempotency) ────────────────────
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))  # how long finished runs are replayed
+IDEMPOTENCY_MAX_MB = float(os.getenv("IDEMPOTENCY_MAX_MB", "64"))             # stored responses per service (LRU)
+
+# ── SDR Deadline (common.deadline) ───────────────────────────
+SDR_DEADLINE_SECONDS = float(os.getenv("SDR_DEADLINE_SECONDS", "300"))  # the UI Client waits this long for /run_sdr
+SDR_RESERVE_SECONDS = float(os.getenv("SDR_RESERVE_SECONDS", "20"))     # always kept back for email + save
+# Seconds each step's full path needs; with less left (after the reserve) it takes its cheaper path
+SDR_STEP_BUDGETS: dict[str, float] = {
+    "web_research": float(os.getenv("SDR_BUDGET_WEB_RESEARCH", "150")),   # else knowledge-only research
+    "research": float(os.getenv("SDR_BUDGET_RESEARCH", "30")),            # else template research
+    "proposal": float(os.getenv("SDR_BUDGET_PROPOSAL", "30")),            # else template proposal
+    "fact_check": float(os.getenv("SDR_BUDGET_FACT_CHECK", "90")),        # else skipped
+    "phone_call": float(os.getenv("SDR_BUDGET_PHONE_CALL", "90")),        # shortest call worth placing
+    "classify": float(os.getenv("SDR_BUDGET_CLASSIFY", "15")),            # else outcome "other"
+    "deck": float(os.getenv("SDR_BUDGET_DECK", "20")),                    # else email without a deck
+}
 
 # ── Email / Gmail ────────────────────────────────────────────
 SALES_EMAIL = os.getenv("SALES_EMAIL", "")
@@ -48,6 +191,8 @@ SERVICE_ACCOUNT_FILE = os.getenv("SERVICE_ACCOUNT_FILE", "")  # kept for BigQuer
 # ── OAuth2 (for personal Gmail + Calendar) ───────────────────
 OAUTH_CREDENTIALS_FILE = os.getenv("OAUTH_CREDENTIALS_FILE", "./credentials/oauth_credentials.json")
 OAUTH_TOKEN_FILE = os.getenv("OAUTH_TOKEN_FILE", "./credentials/token.json")
+OAUTH_REFRESH_MARGIN_SECONDS = int(os.getenv("OAUTH_REFRESH_MARGIN_SECONDS", "300"))
+WORKSPACE_MAX_WORKERS = int(os.getenv("WORKSPACE_MAX_WORKERS", "8"))  # Gmail/Calendar executor threads
 
 # ── ElevenLabs ───────────────────────────────────────────────
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
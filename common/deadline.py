@@ -0,0 +1,148 @@
+"""
+common/deadline.py
+Request deadlines propagated across services.
+
+The UI Client gives up on /run_sdr after SDR_DEADLINE_SECONDS, so work the
+SDR pipeline does after that is wasted. The trigger sets a deadline; it
+follows the request as a context variable (into tools, nested LLM runs and
+tasks they start) and rides along on every pooled httpx request as an
+`x-request-deadline-ms` header holding the milliseconds left — relative, so
+hosts don't need synchronised clocks. A service that receives the header
+continues under the same deadline (DeadlineMiddleware).
+
+Consumers check what is left and pick a cheaper path:
+
+    from common import deadline
+
+    deadline.start(SDR_DEADLINE_SECONDS)          # tightens an inbound deadline, never extends it
+    if deadline.remaining() < 60:
+        ...                                       # knowledge-only research, skip fact-check, ...
+
+The gateway (common.llm) bounds every attempt and retry by the time left,
+and pooled httpx clients clamp their timeouts to it. Once the deadline has
+passed, those calls raise DeadlineExceeded instead of starting.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import httpx
+
+DEADLINE_HEADER = "x-request-deadline-ms"
+_HEADER_KEY = DEADLINE_HEADER.encode()
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the call could start."""
+
+
+def start(seconds: float) -> None:
+    """Give the current request (and tasks it starts) `seconds` from now, unless it already has less."""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is None or at < current:
+        _deadline.set(at)
+
+
+@contextmanager
+def scope(seconds: float) -> Iterator[None]:
+    """A deadline for the body of a with-block only (tightening any outer one)."""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def clear() -> None:
+    """Drop the deadline in the current context (work shared by callers with different deadlines)."""
+    _deadline.set(None)
+
+
+def remaining() -> float:
+    """Seconds left (never negative); math.inf when no deadline is set."""
+    at = _deadline.get()
+    if at is None:
+        return math.inf
+    return max(0.0, at - time.monotonic())
+
+
+def expired() -> bool:
+    return remaining() <= 0
+
+
+def check(what: str = "call") -> None:
+    """Raise DeadlineExceeded if there is no time left."""
+    if expired():
+        raise DeadlineExceeded(f"Request deadline passed before {what}")
+
+
+def bound(timeout: float | None) -> float | None:
+    """A timeout clamped to the time left (None / 0 = no timeout of its own)."""
+    left = remaining()
+    if left == math.inf:
+        return timeout or None
+    return min(timeout, left) if timeout else left
+
+
+# ── Propagation ──────────────────────────────────────────────
+
+async def propagate(request: httpx.Request) -> None:
+    """httpx request hook: send the time left and clamp the request's timeouts to it."""
+    left = remaining()
+    if left == math.inf:
+        return
+    if left <= 0:
+        raise DeadlineExceeded(f"Request deadline passed before {request.method} {request.url.host}{request.url.path}")
+    request.headers[DEADLINE_HEADER] = str(int(left * 1000))
+    timeouts = request.extensions.get("timeout")
+    if timeouts:
+        request.extensions["timeout"] = {k: left if v is None else min(v, left) for k, v in timeouts.items()}
+
+
+def parse_header(value: str | bytes | None) -> float | None:
+    """Seconds from an x-request-deadline-ms header value, or None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        ms = float(value.decode() if isinstance(value, bytes) else value)
+    except ValueError:
+        return None
+    return ms / 1000 if ms >= 0 else None
+
+
+class DeadlineMiddleware:
+    """ASGI middleware: continue the caller's deadline when the request carries one."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        seconds = None
+        if scope["type"] == "http":
+            for key, value in scope["headers"]:
+                if key == _HEADER_KEY:
+                    seconds = parse_header(value)
+                    break
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+def instrument_app(app) -> None:
+    """Continue inbound deadlines in a FastAPI app."""
+    app.add_middleware(DeadlineMiddleware)
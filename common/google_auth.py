@@ -8,21 +8,37 @@ Usage:
 
     # In code:
     from common.google_auth import get_gmail_service, get_calendar_service
-    service = get_gmail_service()
+    service = get_gmail_service()   # cached; credentials stay in memory
+
+    # In a service lifespan (background refresh before expiry):
+    await credential_manager.start()
+    ...
+    await credential_manager.stop()
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
+import threading
+from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from common import metrics
+from common.config import (
+    OAUTH_CREDENTIALS_FILE,
+    OAUTH_REFRESH_MARGIN_SECONDS,
+    OAUTH_TOKEN_FILE,
+)
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
-from common.config import OAUTH_CREDENTIALS_FILE, OAUTH_TOKEN_FILE
+# google.auth, oauthlib and googleapiclient are imported where they are used:
+# together they add ~0.2 s to every service's cold start, and most code paths
+# (and the whole UI Client) never touch them.
 
 logger = logging.getLogger(__name__)
 
@@ -33,14 +49,21 @@ SCOPES = [
     "https://www.googleapis.com/auth/calendar",
 ]
 
+# Floor for the background refresher's sleep, so a failing refresh can't spin
+_MIN_REFRESH_INTERVAL = 60
+
 
-def get_credentials() -> Credentials | None:
+def get_credentials(interactive: bool = True) -> Credentials | None:
     """
     Load or refresh OAuth2 credentials.
 
     First run: opens a browser for user consent, saves token.json.
     Subsequent runs: loads token.json and auto-refreshes if expired.
+    With interactive=False, never opens a browser — returns None instead.
     """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+
     creds = None
 
     # Load existing token
@@ -64,6 +87,8 @@ def get_credentials() -> Credentials | None:
 
     # No valid creds — need interactive authorization
     if not creds or not creds.valid:
+        if not interactive:
+            return None
         creds_path = Path(OAUTH_CREDENTIALS_FILE)
         if not creds_path.exists():
             logger.error(
@@ -74,6 +99,8 @@ def get_credentials() -> Credentials | None:
             return None
 
         try:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file(
                 str(creds_path), SCOPES
             )
@@ -94,22 +121,158 @@ def _save_token(creds: Credentials):
     token_path.write_text(creds.to_json())
 
 
-def get_gmail_service():
-    """Build an authenticated Gmail API service."""
-    creds = get_credentials()
+# ── In-memory credential manager ─────────────────────────────
+
+class CredentialManager:
+    """
+    Keeps OAuth2 credentials in memory and refreshes them before they expire.
+
+    get() is cheap after the first call: no disk read, and an inline refresh
+    only if the background refresher has fallen behind. Built API service
+    objects hold a reference to the same Credentials object, so a refresh
+    updates them in place.
+    """
+
+    def __init__(self, refresh_margin: float = OAUTH_REFRESH_MARGIN_SECONDS):
+        self.refresh_margin = refresh_margin
+        self._creds: Credentials | None = None
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def get(self) -> Credentials | None:
+        """Return valid credentials, loading or refreshing them if needed."""
+        with self._lock:
+            if self._creds is None:
+                self._creds = get_credentials()
+            elif self._needs_refresh(self._creds):
+                self._refresh_locked()
+            return self._creds
+
+    @property
+    def loaded(self) -> bool:
+        """True once credentials are held in memory (get() won't touch disk or prompt)."""
+        return self._creds is not None
+
+    def invalidate(self) -> None:
+        """Drop cached credentials so the next get() reloads from disk."""
+        with self._lock:
+            self._creds = None
+
+    def _needs_refresh(self, creds: Credentials) -> bool:
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        remaining = (creds.expiry - datetime.utcnow()).total_seconds()
+        return remaining < self.refresh_margin
+
+    def _refresh_locked(self) -> None:
+        creds = self._creds
+        if not creds or not creds.refresh_token:
+            return
+        try:
+            from google.auth.transport.requests import Request
+
+            creds.refresh(Request())
+            _save_token(creds)
+            logger.info("OAuth2 token refreshed")
+        except Exception as e:
+            logger.warning(f"OAuth2 token refresh failed: {e}")
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._refresh_locked()
+
+    def _load(self) -> None:
+        # Token file read + possible refresh round-trip: run off the event loop
+        with self._lock:
+            if self._creds is None:
+                self._creds = get_credentials(interactive=False)
+
+    # ── Background refresh ───────────────────────────────────
+
+    async def start(self) -> None:
+        """Load credentials (without interactive consent) and start the refresher."""
+        if self._task and not self._task.done():
+            return
+        await asyncio.to_thread(self._load)
+        self._task = asyncio.create_task(self._refresh_loop(), name="oauth-refresh")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            creds = self._creds
+            if creds is None or creds.expiry is None:
+                delay = self.refresh_margin
+            else:
+                remaining = (creds.expiry - datetime.utcnow()).total_seconds()
+                delay = max(remaining - self.refresh_margin, 0)
+            await asyncio.sleep(max(delay, _MIN_REFRESH_INTERVAL))
+            if self._creds is not None and self._needs_refresh(self._creds):
+                await asyncio.to_thread(self._refresh)
+
+
+credential_manager = CredentialManager()
+
+
+# ── Cached API service objects ───────────────────────────────
+
+# googleapiclient Resources (and their httplib2 transport) are not thread-safe,
+# so each thread gets its own cache.
+_local = threading.local()
+_services_cache = metrics.CacheStats("google_api_services")
+
+
+def _get_service(api: str, version: str):
+    creds = credential_manager.get()
     if not creds:
-        logger.error("No valid OAuth2 credentials for Gmail")
         return None
-    return build("gmail", "v1", credentials=creds)
+
+    cache: dict[tuple[str, str], tuple[Credentials, object]] = getattr(_local, "services", None)
+    if cache is None:
+        cache = _local.services = {}
+
+    cached = cache.get((api, version))
+    if cached and cached[0] is creds:
+        _services_cache.hit()
+        return cached[1]
+    _services_cache.miss()
+
+    from googleapiclient.discovery import build
+
+    service = build(
+        api,
+        version,
+        credentials=creds,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+    cache[(api, version)] = (creds, service)
+    return service
+
+
+def get_gmail_service():
+    """Return an authenticated Gmail API service (cached per thread)."""
+    service = _get_service("gmail", "v1")
+    if not service:
+        logger.error("No valid OAuth2 credentials for Gmail")
+    return service
 
 
 def get_calendar_service():
-    """Build an authenticated Google Calendar API service."""
-    creds = get_credentials()
-    if not creds:
+    """Return an authenticated Google Calendar API service (cached per thread)."""
+    service = _get_service("calendar", "v3")
+    if not service:
         logger.error("No valid OAuth2 credentials for Calendar")
-        return None
-    return build("calendar", "v3", credentials=creds)
+    return service
 
 
 # ── CLI: Run this module to authorize ────────────────────────
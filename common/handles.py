@@ -0,0 +1,100 @@
+"""
+common/handles.py
+Server-side store for bulk tool results, referenced by short handles.
+
+A coordinator run used to move bulk data through the model: find_leads had
+the LLM copy the whole leads JSON from find_businesses into store_leads, and
+process_emails had it copy every email body into analyze_email. Output
+tokens are the slowest part of a run, and long copies get truncated.
+
+Instead, a tool stores its bulk result here and returns a short handle plus
+a compact summary; the next tool takes the handle:
+
+    find_businesses(...)           -> {"result_ref": "r1", "total": 18, ...}
+    store_leads(result_ref="r1")
+
+Handles live in a per-request scope (a context variable, so tools running
+inside the gateway see it). The endpoint reads the stored values back after
+the run, and everything is dropped when the scope exits.
+
+Usage:
+    from common import handles
+
+    with handles.scope() as results:
+        result = await gateway.run(..., tools=[find_businesses, store_leads])
+        batches = results.values("r")
+
+    # In a tool:
+    ref = handles.put(leads, prefix="r")
+    leads = handles.get(result_ref)
+"""
+
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+class HandleError(LookupError):
+    """A handle that isn't in the current scope (typo, or from another request)."""
+
+
+class HandleStore:
+    """Values of one request, keyed by short handles like "r1" or "e3"."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, Any] = {}
+        self._counters: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def put(self, value: Any, prefix: str = "r") -> str:
+        n = self._counters.get(prefix, 0) + 1
+        self._counters[prefix] = n
+        handle = f"{prefix}{n}"
+        self._values[handle] = value
+        return handle
+
+    def get(self, handle: str) -> Any:
+        try:
+            return self._values[handle.strip()]
+        except KeyError:
+            known = ", ".join(self._values) or "none"
+            raise HandleError(f"Unknown handle '{handle}' (known: {known})") from None
+
+    def values(self, prefix: str) -> list[Any]:
+        """Every value stored under `prefix`, in the order they were put."""
+        return [v for h, v in self._values.items() if h.rstrip("0123456789") == prefix]
+
+
+_store: contextvars.ContextVar[HandleStore | None] = contextvars.ContextVar("handle_store", default=None)
+
+
+@contextmanager
+def scope() -> Iterator[HandleStore]:
+    """A fresh handle store for the body of the with-block (one request)."""
+    store = HandleStore()
+    token = _store.set(store)
+    try:
+        yield store
+    finally:
+        _store.reset(token)
+
+
+def current() -> HandleStore:
+    store = _store.get()
+    if store is None:
+        raise RuntimeError("No handle scope is active; wrap the run in handles.scope()")
+    return store
+
+
+def put(value: Any, prefix: str = "r") -> str:
+    """Store a value in the current request's scope and return its handle."""
+    return current().put(value, prefix)
+
+
+def get(handle: str) -> Any:
+    """The value behind a handle in the current request's scope (HandleError if unknown)."""
+    return current().get(handle)
@@ -0,0 +1,177 @@
+"""
+common/http_clients.py
+Shared pooled HTTP clients — one long-lived httpx.AsyncClient per target.
+
+Every outbound call (UI callbacks, inter-service proxies, Google Maps) reuses
+a keep-alive pool instead of paying a fresh TCP/TLS handshake per request.
+Clients are created lazily on first use and closed from each service's
+FastAPI lifespan. Requests made inside a trace carry a `traceparent` header
+and produce a client span (see common.tracing.TracingTransport); requests
+made under a deadline carry the time left and have their timeouts clamped
+to it (see common.deadline). When UDS_DIR is set and a target service runs
+on this host, requests to its origin go through its Unix socket whenever it
+is listening on one, and over loopback TCP otherwise (see common.serve);
+other URLs on the same client always use TCP.
+
+Usage:
+    from common.http_clients import get_client, close_clients
+
+    client = get_client("ui_client")
+    await client.post(url, json=payload, timeout=10)
+
+    # In lifespan shutdown:
+    await close_clients()
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+
+import httpx
+
+from common import deadline, serve
+from common.config import (
+    DECK_GENERATOR_SERVICE_URL,
+    GMAIL_LISTENER_SERVICE_URL,
+    HTTP_ENABLE_HTTP2,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LEAD_FINDER_SERVICE_URL,
+    LEAD_MANAGER_SERVICE_URL,
+    SDR_SERVICE_URL,
+    UI_CLIENT_URL,
+)
+from common.tracing import TracingTransport
+
+logger = logging.getLogger(__name__)
+
+# Known targets → base URL. Requests may still pass absolute URLs
+# (e.g. a caller-supplied callback_url); the base URL only scopes the pool.
+TARGETS: dict[str, str] = {
+    "ui_client": UI_CLIENT_URL,
+    "lead_finder": LEAD_FINDER_SERVICE_URL,
+    "lead_manager": LEAD_MANAGER_SERVICE_URL,
+    "gmail_listener": GMAIL_LISTENER_SERVICE_URL,
+    "sdr": SDR_SERVICE_URL,
+    "deck_generator": DECK_GENERATOR_SERVICE_URL,
+    "google_maps": "https://maps.googleapis.com",
+}
+
+# Dependency label for metrics/spans where it differs from the target name
+DEPENDENCY_NAMES: dict[str, str] = {
+    "google_maps": "places",
+}
+
+DEFAULT_TIMEOUT = 30.0
+
+_LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _local_socket(target: str) -> str | None:
+    """Where the target would listen on a Unix socket, if it is a service on this host."""
+    base_url = TARGETS.get(target)
+    path = serve.socket_path(target)
+    if not base_url or path is None or httpx.URL(base_url).host not in _LOCAL_HOSTS:
+        return None
+    return path
+
+
+class LocalSocketTransport(httpx.AsyncBaseTransport):
+    """
+    Sends each request through the target's Unix socket while it is there,
+    and over TCP otherwise. The socket is checked per request rather than
+    when the pool is built: services start in any order, and one that comes
+    up (or restarts) later is picked up without rebuilding the client.
+    """
+
+    def __init__(self, path: str, limits: httpx.Limits, http2: bool):
+        self.path = path
+        self._uds = httpx.AsyncHTTPTransport(uds=path, limits=limits, http2=http2)
+        self._tcp = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if os.path.exists(self.path):
+            try:
+                return await self._uds.handle_async_request(request)
+            except httpx.ConnectError:
+                # Stale socket file (service stopped, or only its TCP side is up):
+                # nothing was sent, so the request can go over TCP instead
+                logger.debug(f"unix:{self.path} refused the connection, using TCP")
+        return await self._tcp.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._uds.aclose()
+        await self._tcp.aclose()
+
+
+def _build_client(target: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    http2 = HTTP_ENABLE_HTTP2 and _http2_available()
+    if HTTP_ENABLE_HTTP2 and not http2:
+        logger.warning("HTTP_ENABLE_HTTP2 set but 'h2' is not installed, using HTTP/1.1")
+
+    dependency = DEPENDENCY_NAMES.get(target, target)
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    mounts = {}
+    path = _local_socket(target)
+    if path is not None:
+        # Only the target's own origin: absolute URLs elsewhere stay on TCP
+        url = httpx.URL(TARGETS[target])
+        local = LocalSocketTransport(path, limits, http2)
+        mounts[f"{url.scheme}://{url.netloc.decode()}"] = TracingTransport(local, dependency=dependency)
+    return httpx.AsyncClient(
+        base_url=TARGETS.get(target, ""),
+        timeout=DEFAULT_TIMEOUT,
+        transport=TracingTransport(transport, dependency=dependency),
+        mounts=mounts,
+        event_hooks={"request": [deadline.propagate]},
+    )
+
+
+def get_client(target: str) -> httpx.AsyncClient:
+    """
+    Return the pooled client for a target, creating it on first use.
+
+    Args:
+        target: A key from TARGETS, or any name for an ad-hoc pool.
+
+    Returns:
+        A long-lived httpx.AsyncClient. Do not close it — the owning
+        service's lifespan does that via close_clients().
+    """
+    client = _clients.get(target)
+    if client is None or client.is_closed:
+        client = _build_client(target)
+        _clients[target] = client
+        logger.debug(f"Opened pooled HTTP client for '{target}'")
+    return client
+
+
+def open_clients(*targets: str) -> None:
+    """Eagerly create pools for the given targets (call from lifespan startup)."""
+    for target in targets:
+        get_client(target)
+
+
+async def close_clients() -> None:
+    """Close every pooled client (call from lifespan shutdown)."""
+    while _clients:
+        target, client = _clients.popitem()
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Closing HTTP client '{target}' failed: {e}")
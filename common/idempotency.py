@@ -0,0 +1,249 @@
+"""
+common/idempotency.py
+Idempotency keys for the trigger endpoints.
+
+/find_leads, /run_sdr, /process_emails and /generate-deck start long, costly
+runs (a duplicate SDR run is another phone call and five LLM calls), and
+their callers give up before a real run finishes. A caller that retries with
+the same `Idempotency-Key` header gets the original run instead of a new one:
+
+  - while the first request is still running, the retry attaches to it and
+    receives the same response;
+  - once it has finished, the stored response is replayed;
+  - the same key with a different request body is rejected with 422.
+
+Replayed responses carry `Idempotent-Replayed: true`. The run itself
+executes in its own task, so it carries on (and stays attachable) when the
+caller that started it disconnects. Finished responses are kept for
+IDEMPOTENCY_TTL_SECONDS in a per-process LRU bounded to IDEMPOTENCY_MAX_MB.
+Only successful runs are stored: an error status, or a 200 whose JSON body
+reports `"status": "error"` (how the agents return a failed run), is not, so
+retrying after a failure runs again.
+Requests without the header are not affected.
+
+Usage:
+    from common import idempotency
+
+    app = FastAPI(...)
+    idempotency.instrument_app(app, "/run_sdr")   # before the other middleware: innermost
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from common import metrics
+from common.config import IDEMPOTENCY_MAX_MB, IDEMPOTENCY_TTL_SECONDS
+from common.models import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+
+REPLAYS = metrics.counter(
+    "rapidreach_idempotent_replays_total",
+    "Requests answered from an earlier run with the same Idempotency-Key (state: in_flight|completed)",
+    ("path", "state"),
+)
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different body."""
+
+
+class CapturedResponse:
+    """Status, headers and body of a finished response, ready to replay."""
+
+    __slots__ = ("status", "headers", "body", "route")
+
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes, route: Any = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.route = route
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    @property
+    def succeeded(self) -> bool:
+        """Not an error status, nor a JSON body with `"status": "error"`."""
+        if self.status >= 400:
+            return False
+        content_type = next((v for k, v in self.headers if k.lower() == b"content-type"), b"")
+        if not content_type.startswith(b"application/json"):
+            return True
+        try:
+            payload = loads(self.body)
+        except ValueError:
+            return True
+        return not (isinstance(payload, dict) and payload.get("status") == "error")
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "task", "response", "expires_at")
+
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task: asyncio.Task | None = task
+        self.response: CapturedResponse | None = None
+        self.expires_at = 0.0
+
+
+class IdempotencyStore:
+    """In-flight runs and finished responses by (path, key), LRU-bounded by bytes."""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_bytes: int = int(IDEMPOTENCY_MAX_MB * 1024 * 1024)):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(
+        self, key: tuple[str, str], fingerprint: str, fn: Callable[[], Awaitable[CapturedResponse]]
+    ) -> tuple[CapturedResponse, bool]:
+        """The response for `key`: replayed, joined in flight, or from a new run of fn(). Returns (response, replayed)."""
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(f"Idempotency-Key '{key[1]}' was already used with a different request body")
+            if entry.response is not None:
+                REPLAYS.inc(path=key[0], state="completed")
+                return entry.response, True
+            REPLAYS.inc(path=key[0], state="in_flight")
+            return await asyncio.shield(entry.task), True
+
+        task = asyncio.ensure_future(fn())
+        entry = self._entries[key] = _Entry(fingerprint, task)
+        task.add_done_callback(lambda t: self._finish(key, entry, t))
+        return await asyncio.shield(task), False
+
+    def _lookup(self, key: tuple[str, str]) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.response is not None and entry.expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _finish(self, key: tuple[str, str], entry: _Entry, task: asyncio.Task) -> None:
+        if self._entries.get(key) is not entry:
+            return
+        entry.task = None
+        response = None if task.cancelled() or task.exception() is not None else task.result()
+        if response is None or not response.succeeded or response.size > self.max_bytes:
+            del self._entries[key]
+            return
+        entry.response = response
+        entry.expires_at = time.monotonic() + self.ttl
+        self.bytes += response.size
+        self._evict()
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        if entry.response is not None:
+            self.bytes -= entry.response.size
+
+    def _evict(self) -> None:
+        """Drop the least recently used finished responses until under the byte bound."""
+        for key in list(self._entries):
+            if self.bytes <= self.max_bytes:
+                break
+            if self._entries[key].response is not None:
+                self._drop(key)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware: Idempotency-Key handling for the given POST paths."""
+
+    def __init__(self, app, paths: tuple[str, ...], store: IdempotencyStore | None = None):
+        self.app = app
+        self.paths = paths
+        self.store = store or IdempotencyStore()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        key = next((v.decode() for k, v in scope["headers"] if k == IDEMPOTENCY_HEADER.encode()), "")
+        if not key:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        try:
+            response, replayed = await self.store.run(
+                (scope["path"], key), fingerprint, lambda: self._capture(scope, body)
+            )
+        except IdempotencyConflict as e:
+            response, replayed = CapturedResponse(
+                422, [(b"content-type", b"application/json")], dumps({"detail": str(e)})
+            ), False
+
+        headers = list(response.headers)
+        if replayed:
+            headers.append((REPLAYED_HEADER.encode(), b"true"))
+            if response.route is not None:
+                scope["route"] = response.route  # so metrics label the replay with its route
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def _capture(self, scope, body: bytes) -> CapturedResponse:
+        """Run the request through the app with a buffered body and collect its response."""
+        delivered = False
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Future()  # no disconnect: the run outlives its first caller
+
+        status, headers, chunks = 500, [], []
+
+        async def send(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"content-length"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        body_out = b"".join(chunks)
+        headers.append((b"content-length", str(len(body_out)).encode()))
+        return CapturedResponse(status, headers, body_out, scope.get("route"))
+
+
+def instrument_app(app, *paths: str, **options: Any) -> None:
+    """
+    Honour Idempotency-Key on the given POST paths. Call it before the other
+    instrument_app()s so it is the innermost middleware — replays still get
+    server spans and request metrics.
+    """
+    app.add_middleware(IdempotencyMiddleware, paths=paths, **options)
@@ -0,0 +1,184 @@
+"""
+common/ledger.py
+Token, latency and cost ledger for every LLM call.
+
+The gateway (common.llm) records one row per attempt — and per cache hit or
+call joined while an identical one was in flight (cached, zero tokens) — with the model, input/output tokens, latency, estimated cost and call site,
+attributed to whatever the request is working on:
+
+    ledger.attribute(session_id=session_id, lead_place_id=req.place_id, city=req.city)
+
+Attribution is a context variable, so it follows the request into tools and
+nested runs. The call site is the enclosing span (the tool or endpoint that
+made the call, e.g. "draft_proposal" or "POST /find_leads").
+
+DedalusRunner results carry no usage, so token counts are read from the
+`usage` block of each chat completion response by an httpx response hook on
+the gateway's client (ledger.http_client()). A run's requests are summed;
+when no usage comes back (streaming, errors) tokens are estimated from text
+length and flagged tokens_estimated. Cost uses MODEL_PROFILES list prices.
+
+Rows go to storage (the llm_usage table); aggregates per lead, session,
+city, call site, model, service or outcome are served by the SDR service at
+/api/llm_usage and /api/llm_usage/summary.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import uuid
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+from common import metrics
+from common.config import LLM_LEDGER_ENABLED, MODEL_PROFILES
+from common.models import loads
+from common.storage import get_storage
+from common.tracing import current_span, current_trace_id, service_name
+
+logger = logging.getLogger(__name__)
+
+TOKENS = metrics.counter(
+    "rapidreach_llm_tokens_total", "LLM tokens by model, call site and direction (input|output)",
+    ("model", "call_site", "direction"),
+)
+COST = metrics.counter(
+    "rapidreach_llm_cost_usd_total", "Estimated LLM spend (list prices)", ("model", "call_site")
+)
+
+_CHARS_PER_TOKEN = 4
+_ATTRIBUTES = ("session_id", "lead_place_id", "city")
+
+_attribution: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar("ledger_attribution", default={})
+_usage: contextvars.ContextVar[Usage | None] = contextvars.ContextVar("ledger_usage", default=None)
+
+
+def attribute(**fields: str) -> None:
+    """Attribute LLM calls made from here on (this task and tasks it starts) to a session/lead/city."""
+    unknown = set(fields) - set(_ATTRIBUTES)
+    if unknown:
+        raise TypeError(f"Unknown ledger attribute(s): {', '.join(sorted(unknown))}")
+    _attribution.set({**_attribution.get(), **{k: v for k, v in fields.items() if v}})
+
+
+class Usage:
+    """Token counts reported by the responses of one attempt."""
+
+    __slots__ = ("input_tokens", "output_tokens", "responses")
+
+    def __init__(self) -> None:
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.responses = 0
+
+    def add(self, usage: dict[str, Any]) -> None:
+        self.input_tokens += int(usage.get("prompt_tokens") or usage.get("input_tokens") or 0)
+        self.output_tokens += int(usage.get("completion_tokens") or usage.get("output_tokens") or 0)
+        self.responses += 1
+
+
+def track() -> tuple[Usage, contextvars.Token]:
+    """Start collecting usage for an attempt; pass the token to untrack()."""
+    usage = Usage()
+    return usage, _usage.set(usage)
+
+
+def untrack(token: contextvars.Token) -> None:
+    _usage.reset(token)
+
+
+async def _read_usage(response: httpx.Response) -> None:
+    usage = _usage.get()
+    if usage is None or not response.headers.get("content-type", "").startswith("application/json"):
+        return
+    try:
+        await response.aread()
+        body = loads(response.content)
+    except Exception:
+        return
+    if isinstance(body, dict) and isinstance(body.get("usage"), dict):
+        usage.add(body["usage"])
+
+
+def http_client() -> httpx.AsyncClient:
+    """HTTP client for AsyncDedalus that feeds response usage into the current attempt."""
+    return httpx.AsyncClient(
+        timeout=None,
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+        follow_redirects=True,
+        event_hooks={"response": [_read_usage]},
+    )
+
+
+def _estimate(kwargs: dict[str, Any]) -> int:
+    text = "".join(str(kwargs.get(k) or "") for k in ("input", "instructions", "messages"))
+    return len(text) // _CHARS_PER_TOKEN
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int) -> float:
+    profile = MODEL_PROFILES.get(model, {})
+    return (input_tokens * profile.get("input_cost", 0) + output_tokens * profile.get("cost", 0)) / 1_000_000
+
+
+def current_call_site() -> str:
+    """The enclosing span's name (the tool or endpoint making the call), or ""."""
+    parent = current_span()
+    return parent.name if parent is not None else ""
+
+
+async def record(
+    model: str,
+    kwargs: dict[str, Any],
+    seconds: float,
+    status: str,
+    usage: Usage | None = None,
+    output: Any = None,
+    cached: bool = False,
+    call_site: str = "",
+) -> None:
+    """Write one ledger row (never raises — the ledger must not fail a call)."""
+    if not LLM_LEDGER_ENABLED:
+        return
+    try:
+        estimated = False
+        if cached:
+            input_tokens = output_tokens = 0
+        elif usage is not None and usage.responses:
+            input_tokens, output_tokens = usage.input_tokens, usage.output_tokens
+        else:
+            input_tokens = _estimate(kwargs)
+            output_tokens = len(str(output or "")) // _CHARS_PER_TOKEN
+            estimated = True
+        call_site = call_site or current_call_site()
+        cost = cost_usd(model, input_tokens, output_tokens)
+
+        TOKENS.inc(input_tokens, model=model, call_site=call_site, direction="input")
+        TOKENS.inc(output_tokens, model=model, call_site=call_site, direction="output")
+        COST.inc(cost, model=model, call_site=call_site)
+
+        attribution = _attribution.get()
+        row = {
+            "call_id": uuid.uuid4().hex,
+            "created_at": datetime.utcnow().isoformat(),
+            "service": service_name(),
+            "call_site": call_site,
+            "model": model,
+            "status": status,
+            "cached": cached,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_estimated": estimated,
+            "latency_ms": round(seconds * 1000, 1),
+            "cost_usd": round(cost, 6),
+            "session_id": attribution.get("session_id", ""),
+            "lead_place_id": attribution.get("lead_place_id", ""),
+            "city": attribution.get("city", ""),
+            "trace_id": current_trace_id(),
+        }
+        await get_storage().save_llm_usage([row], wait=False)
+    except Exception as e:
+        logger.warning(f"LLM ledger write failed: {e}")
+
@@ -0,0 +1,338 @@
+"""
+common/llm.py
+LLM gateway — the single path from every agent to the Dedalus API.
+
+One AsyncDedalus client (and its connection pool) is shared by the whole
+process instead of one per call. Every run goes through the gateway, which
+adds:
+
+  - per-model concurrency: tool-less runs (single completions) take a slot
+    from the model's adaptive limiter (common.concurrency) and queue behind
+    it when the model is saturated. Runs with tools don't: their duration is
+    dominated by the tools and a tool may itself start a nested run;
+  - a per-attempt timeout: LLM_TIMEOUT_SECONDS for completions,
+    LLM_AGENT_TIMEOUT_SECONDS for runs with tools;
+  - retry with exponential backoff (honouring Retry-After) on timeouts,
+    connection errors, 408/409/429 and 5xx. Runs with tools aren't retried
+    by default — their tools may already have had side effects;
+  - the request's deadline (common.deadline): attempts are cut off when it
+    passes, retries and failovers that can't fit aren't started;
+  - an "llm" span per attempt; tool calls the model makes nest underneath it;
+  - a ledger row per attempt or cache hit with tokens, latency and cost
+    (common.ledger);
+  - model routing: with route="<name>" the model is picked from a latency /
+    cost / capability policy and failed over when degraded (common.router);
+  - coalescing of identical concurrent tool-less runs (common.singleflight)
+    and an opt-in persistent response cache for them (cache="<site>", see
+    common.llm_cache);
+  - prompt layout: prompt=Prompt(...) is rendered for the chosen model with
+    the shared context as a cacheable prefix (common.prompts).
+
+dedalus_labs (and the pydantic type tree behind it) costs ~0.25 s to import,
+so it is loaded on first use rather than when a service module is imported.
+
+Usage:
+    from common.llm import gateway
+
+    result = await gateway.run(input=..., model=DEFAULT_MODEL)
+    result = await gateway.run(input=..., model=RESEARCH_MODEL, mcp_servers=[...], retries=0)
+    result = await gateway.run(prompt=Prompt(...), route="draft", cache="draft_proposal")
+
+    # In lifespan shutdown:
+    await gateway.aclose()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from common import deadline, ledger, metrics
+from common.concurrency import get_limiter
+from common.config import (
+    LLM_AGENT_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+)
+from common.llm_cache import CachedResult, cache_key, llm_cache
+from common.prompts import Prompt
+from common.router import FAILOVERS, router
+from common.singleflight import Group
+from common.tracing import span
+
+if TYPE_CHECKING:
+    import httpx
+    from dedalus_labs import AsyncDedalus, DedalusRunner
+
+logger = logging.getLogger(__name__)
+
+RETRIES = metrics.counter(
+    "rapidreach_llm_retries_total", "LLM attempts retried after a transient failure", ("model", "reason")
+)
+
+# Identical tool-less runs in flight at the same time share one provider call
+_flights = Group("llm")
+
+_RETRYABLE_STATUS = {408, 409, 429}
+_MAX_RETRY_AFTER = 30.0
+
+
+def _retry_reason(exc: BaseException) -> str | None:
+    """Why `exc` is worth retrying, or None if it isn't (bad request, auth, bugs...)."""
+    if isinstance(exc, deadline.DeadlineExceeded):
+        return None
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    from dedalus_labs import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):  # includes APITimeoutError
+        return "connection"
+    if isinstance(exc, APIStatusError):
+        status = exc.status_code
+        if status in _RETRYABLE_STATUS or status >= 500:
+            return str(status)
+    return None
+
+
+def _retry_delay(exc: BaseException, attempt: int, base: float) -> float:
+    """Exponential backoff with jitter; a server-sent Retry-After wins when present."""
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), _MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return base * (2 ** attempt) * (0.5 + random.random())
+
+
+class LLMGateway:
+    """Shared Dedalus client with per-model slots, timeouts and retries."""
+
+    def __init__(
+        self,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        agent_timeout: float = LLM_AGENT_TIMEOUT_SECONDS,
+        retries: int = LLM_MAX_RETRIES,
+        backoff: float = LLM_RETRY_BACKOFF_SECONDS,
+    ):
+        self.timeout = timeout
+        self.agent_timeout = agent_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client: AsyncDedalus | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._runner: DedalusRunner | None = None
+
+    @property
+    def runner(self) -> DedalusRunner:
+        """The process-wide runner, built on first use."""
+        if self._runner is None:
+            from dedalus_labs import AsyncDedalus, DedalusRunner
+
+            # The gateway owns timeouts and retries; the SDK's own would multiply them
+            self._http = ledger.http_client()
+            self._client = AsyncDedalus(max_retries=0, timeout=None, http_client=self._http)
+            self._runner = DedalusRunner(self._client)
+        return self._runner
+
+    async def run(
+        self,
+        *,
+        timeout: float | None = None,
+        retries: int | None = None,
+        cache: str | None = None,
+        route: str | None = None,
+        prompt: Prompt | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        DedalusRunner.run() through the gateway.
+
+        Args:
+            timeout: Seconds per attempt (0 = none). Defaults to LLM_TIMEOUT_SECONDS,
+                     or LLM_AGENT_TIMEOUT_SECONDS when tools are given. Never
+                     longer than the request's deadline allows.
+            retries: Extra attempts on transient errors. Defaults to LLM_MAX_RETRIES,
+                     or 0 when tools are given.
+            cache: Call-site name to cache the response under (LLM_CACHE_TTLS).
+                   Ignored for runs with tools. A hit returns a CachedResult.
+            route: Pick the model from this LLM_ROUTES policy (instead of
+                   `model`) and fail over to the next candidate (common.router).
+            prompt: Context + task (common.prompts), rendered into `messages`
+                    for the model actually called. Use instead of `input`.
+            **kwargs: Passed to DedalusRunner.run() (input, model, tools, ...).
+        """
+        if route is not None:
+            return await self._routed(route, timeout, retries, cache, prompt, kwargs)
+        if prompt is not None:
+            kwargs.update(prompt.render(str(kwargs.get("model", ""))))
+        agentic = bool(kwargs.get("tools"))
+        if timeout is None:
+            timeout = self.agent_timeout if agentic else self.timeout
+        if retries is None:
+            retries = 0 if agentic else self.retries
+        if agentic:
+            return await self._call(kwargs, timeout, retries)
+
+        key = cache_key(kwargs)
+        complete = functools.partial(self._complete, key, cache, kwargs, timeout, retries)
+        if key in _flights:
+            return await self._join(key, kwargs, complete)
+        return await _flights.do(key, complete)
+
+    async def _join(self, key: str, kwargs: dict[str, Any], complete: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Wait for an identical call already in flight. The shared call's attempts
+        are recorded once, in the context of the caller that started it; this
+        records the wait against this caller's own attribution (zero tokens).
+        """
+        model = str(kwargs.get("model", ""))
+        t0 = time.perf_counter()
+        try:
+            result = await _flights.do(key, complete)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            await ledger.record(model, kwargs, time.perf_counter() - t0, status, cached=True)
+            raise
+        await ledger.record(model, kwargs, time.perf_counter() - t0, "ok", cached=True)
+        return result
+
+    async def _routed(
+        self,
+        route: str,
+        timeout: float | None,
+        retries: int | None,
+        cache: str | None,
+        prompt: Prompt | None,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Try the route's candidates in order; all but the last get one bounded attempt."""
+        models = router.candidates(route)
+        failover_timeout = router.policy(route).get("failover_timeout_s")
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            attempt_timeout = timeout
+            if not last and failover_timeout:
+                attempt_timeout = min(timeout, failover_timeout) if timeout else failover_timeout
+            try:
+                return await self.run(
+                    model=model,
+                    timeout=attempt_timeout,
+                    retries=retries if last else 0,
+                    cache=cache,
+                    prompt=prompt,
+                    **kwargs,
+                )
+            except Exception as e:
+                reason = _retry_reason(e)
+                if last or reason is None or deadline.expired():
+                    raise
+                FAILOVERS.inc(route=route, model=models[i + 1])
+                logger.warning(f"LLM route '{route}': {model} failed ({reason}); falling back to {models[i + 1]}")
+
+    async def _complete(
+        self, key: str, cache: str | None, kwargs: dict[str, Any], timeout: float, retries: int
+    ) -> Any:
+        """A tool-less run: served from the response cache when the call site opted in."""
+        if not cache or llm_cache is None:
+            return await self._call(kwargs, timeout, retries, cache)
+        hit, output = await llm_cache.get(cache, key)
+        if hit:
+            await ledger.record(str(kwargs.get("model", "")), kwargs, 0.0, "ok", cached=True)
+            return CachedResult(output)
+        result = await self._call(kwargs, timeout, retries, cache)
+        if result.final_output:
+            await llm_cache.put(cache, key, result.final_output)
+        return result
+
+    async def _call(self, kwargs: dict[str, Any], timeout: float, retries: int, site: str | None = None) -> Any:
+        """
+        Attempts with retry; tool-less attempts hold a slot of the limiter for
+        the model and call site (`site`, else the enclosing span) — a classify
+        call and a research run on one model have very different latencies.
+        """
+        model = str(kwargs.get("model", ""))
+        agentic = bool(kwargs.get("tools"))
+        limiter_key = f"{model}/{site or ledger.current_call_site()}"
+        attempt = 0
+        while True:
+            try:
+                if agentic:
+                    return await self._attempt(model, timeout, attempt, kwargs)
+                async with get_limiter("dedalus", key=limiter_key):
+                    return await self._attempt(model, timeout, attempt, kwargs)
+            except Exception as e:
+                reason = _retry_reason(e)
+                if reason is None or attempt >= retries:
+                    raise
+                delay = _retry_delay(e, attempt, self.backoff)
+                if delay >= deadline.remaining():
+                    raise
+                RETRIES.inc(model=model, reason=reason)
+                logger.warning(f"LLM call to {model} failed ({reason}); retry {attempt + 1}/{retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _attempt(self, model: str, timeout: float, attempt: int, kwargs: dict[str, Any]) -> Any:
+        tools = kwargs.get("tools") or []
+        deadline.check(f"LLM call to {model}")
+        usage, token = ledger.track()
+        t0 = time.perf_counter()
+        try:
+            with span(
+                f"llm {model}", kind="llm", dependency="dedalus", operation=model, tools=len(tools), attempt=attempt
+            ) as s:
+                result = await asyncio.wait_for(self.runner.run(**kwargs), deadline.bound(timeout))
+                if s is not None:
+                    s.set(
+                        tool_calls=len(getattr(result, "tool_results", None) or []),
+                        input_tokens=usage.input_tokens,
+                        output_tokens=usage.output_tokens,
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            seconds = time.perf_counter() - t0
+            router.record(model, seconds, ok=False)
+            status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            await ledger.record(model, kwargs, seconds, status, usage)
+            raise
+        finally:
+            ledger.untrack(token)
+        seconds = time.perf_counter() - t0
+        router.record(model, seconds, ok=True)
+        await ledger.record(model, kwargs, seconds, "ok", usage, output=result.final_output)
+        return result
+
+    async def aclose(self) -> None:
+        """Close the shared client and cache (call from lifespan shutdown)."""
+        if llm_cache is not None:
+            llm_cache.close()
+        client, self._client, self._http, self._runner = self._client, None, None, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Closing Dedalus client failed: {e}")
+
+
+# Process-wide gateway shared by every agent
+gateway = LLMGateway()
+
+
+async def prewarm() -> None:
+    """
+    Prewarm step: build the shared client (the dedalus_labs import runs on a
+    worker thread) and open a pooled connection to the Dedalus API, so the
+    first LLM call doesn't pay for DNS + TCP + TLS. Any HTTP response counts.
+    """
+    await asyncio.to_thread(lambda: gateway.runner)
+    await gateway._http.head(str(gateway._client.base_url))
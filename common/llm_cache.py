@@ -0,0 +1,199 @@
+"""
+common/llm_cache.py
+Persistent, opt-in cache of LLM responses.
+
+Re-running SDR on the same business repeats research, draft and fact-check;
+a duplicate email re-runs analyze_email and a retried deck request re-runs
+generate_deck_content. Call sites opt in by name through the gateway:
+
+    result = await gateway.run(input=..., route="draft", cache="draft_proposal")
+
+The key is a SHA-256 of the run's arguments (model, prompt, instructions,
+tool names, response_format, MCP servers, sampling options), so any change
+to the prompt or model is a miss. Each call site has its own TTL
+(LLM_CACHE_TTLS). Entries live in a small SQLite file shared by every service
+on the host; when it grows past LLM_CACHE_MAX_MB the least recently used
+entries are evicted. Hits and misses are exported per call site as the
+`llm:<site>` cache in rapidreach_cache_requests_total.
+
+Only tool-less runs are cached — runs with tools have side effects.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from common import metrics
+from common.config import (
+    LLM_CACHE_DEFAULT_TTL_SECONDS,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTLS,
+)
+from common.models import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+_EVICT_TO = 0.9  # evict down to this fraction of the size bound
+_RESYNC_EVERY = 256  # puts between recounts of the bytes stored (other processes share the file)
+
+
+class CachedResult:
+    """Stands in for a runner result on a cache hit."""
+
+    cached = True
+
+    def __init__(self, final_output: Any):
+        self.final_output = final_output
+        self.tool_results: list = []
+
+
+def _canonical(value: Any) -> Any:
+    # Models before callables (classes are callable too): a changed schema must change the key
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        return value.model_json_schema()
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    return repr(value)
+
+
+def cache_key(kwargs: dict[str, Any]) -> str:
+    """Content hash of a run's arguments."""
+    material = json.dumps(kwargs, sort_keys=True, default=_canonical, ensure_ascii=False)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with per-site TTLs and a size-bounded LRU."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._puts = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._stats: dict[str, metrics.CacheStats] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, site TEXT, value BLOB, size INTEGER,"
+                " expires_at REAL, last_access REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+            self.bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def stats(self, site: str) -> metrics.CacheStats:
+        stats = self._stats.get(site)
+        if stats is None:
+            stats = self._stats[site] = metrics.CacheStats(f"llm:{site}")
+        return stats
+
+    # ── Sync (run on worker threads) ─────────────────────────
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            if row[1] < now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.bytes -= len(row[0])
+                return False, None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return True, loads(row[0])
+
+    def _put(self, key: str, site: str, value: Any, ttl: float) -> None:
+        blob = dumps(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, site, value, size, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, site, blob, len(blob), now + ttl, now),
+            )
+            self.bytes += len(blob) - (old[0] if old else 0)
+            self._puts += 1
+            if self._puts % _RESYNC_EVERY == 0:
+                self.bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if self.bytes > self.max_bytes:
+                self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones, until under the bound."""
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        target = self.max_bytes * _EVICT_TO
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.execute("COMMIT")
+        self.bytes = total
+        logger.info(f"LLM cache over {self.max_bytes} bytes; evicted {evicted} entries")
+
+    # ── Async API ────────────────────────────────────────────
+
+    async def get(self, site: str, key: str) -> tuple[bool, Any]:
+        """Look up a key; returns (hit, final_output). Errors count as misses."""
+        try:
+            hit, value = await asyncio.to_thread(self._get, key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            hit, value = False, None
+        if hit:
+            self.stats(site).hit()
+        else:
+            self.stats(site).miss()
+        return hit, value
+
+    async def put(self, site: str, key: str, value: Any) -> None:
+        """Store a final_output under the site's TTL. Unserialisable outputs are skipped."""
+        ttl = LLM_CACHE_TTLS.get(site, LLM_CACHE_DEFAULT_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        try:
+            await asyncio.to_thread(self._put, key, site, value, ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Process-wide cache used by common.llm.gateway; None when LLM_CACHE_ENABLED is off
+llm_cache: LLMCache | None = LLMCache() if LLM_CACHE_ENABLED else None
+
+metrics.gauge(
+    "rapidreach_llm_cache_bytes", "Bytes stored in the LLM response cache",
+    fn=lambda: llm_cache.bytes if llm_cache is not None else 0,
+)
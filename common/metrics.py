@@ -0,0 +1,339 @@
+"""
+common/metrics.py
+Prometheus-style metrics and the /metrics endpoint for every service.
+
+Latency histograms are fed by the spans in common.tracing, so anything already
+wrapped in @traced / span() — every agent tool, LLM run and external API call —
+is measured without further code; a new tool gets metrics by being @traced:
+
+  rapidreach_tool_duration_seconds{tool,status}                    pipeline steps + tools
+  rapidreach_dependency_duration_seconds{dependency,operation,status}
+                                                                   places, gmail, calendar, bigquery,
+                                                                   elevenlabs, dedalus, peer services
+  rapidreach_http_request_duration_seconds{method,route,status}    inbound requests
+  rapidreach_http_requests_in_flight                               inbound requests being served
+
+Queue depths, cache hit ratios and WebSocket client counts are gauges read at
+scrape time from the objects that own them (see gauge(fn=...) / CacheStats).
+
+Rendered in the Prometheus text format by hand — no client library needed.
+
+Usage:
+    from common import metrics
+
+    metrics.instrument_app(app)             # /metrics + request metrics
+
+    metrics.gauge("rapidreach_callback_queue_depth", "Queued UI callbacks",
+                  fn=lambda: callback_emitter.pending)
+
+    google_services_cache = metrics.CacheStats("google_api_services")
+    google_services_cache.hit()
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from fastapi.responses import Response
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Spans range from sub-millisecond cache lookups to multi-minute phone calls.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """
+    A settable gauge, or a callback gauge when `fn` is given. `fn` returns a
+    number, or a {label-value tuple: number} dict for labelled gauges.
+    """
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        fn: Callable[[], float | dict[tuple, float]] | None = None,
+    ):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> list[str]:
+        if self._fn is not None:
+            try:
+                result = self._fn()
+            except Exception:
+                return []
+            items = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key → [per-bucket counts..., +Inf count], sum
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[i] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ── Registry ─────────────────────────────────────────────────
+
+_registry: dict[str, _Metric] = {}
+
+
+def _register(metric: _Metric) -> _Metric:
+    existing = _registry.get(metric.name)
+    if existing is not None:
+        return existing  # re-import / re-registration returns the original
+    _registry[metric.name] = metric
+    return metric
+
+
+def counter(name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: tuple[str, ...] = (), fn: Callable | None = None) -> Gauge:
+    return _register(Gauge(name, help, labelnames, fn))
+
+
+def histogram(name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in list(_registry.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Caches ───────────────────────────────────────────────────
+
+CACHE_REQUESTS = counter(
+    "rapidreach_cache_requests_total", "Cache lookups by cache and result (hit|miss)", ("cache", "result")
+)
+_caches: dict[str, "CacheStats"] = {}
+
+
+def _cache_hit_ratios() -> dict[tuple, float]:
+    ratios = {}
+    for name in list(_caches):
+        hits = CACHE_REQUESTS.value(cache=name, result="hit")
+        total = hits + CACHE_REQUESTS.value(cache=name, result="miss")
+        if total:
+            ratios[(name,)] = hits / total
+    return ratios
+
+
+gauge("rapidreach_cache_hit_ratio", "Hits / lookups since process start", ("cache",), fn=_cache_hit_ratios)
+
+
+class CacheStats:
+    """Hit/miss accounting for one named cache (exported as counters and a ratio gauge)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        _caches[name] = self
+
+    def hit(self) -> None:
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+
+    def miss(self) -> None:
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+
+
+# ── Span-fed latency (called by common.tracing) ──────────────
+
+TOOL_DURATION = histogram(
+    "rapidreach_tool_duration_seconds", "Agent tool and pipeline step latency", ("tool", "status")
+)
+DEPENDENCY_DURATION = histogram(
+    "rapidreach_dependency_duration_seconds",
+    "Latency of calls to external APIs, LLMs and peer services",
+    ("dependency", "operation", "status"),
+)
+SPAN_DURATION = histogram(
+    "rapidreach_span_duration_seconds", "Latency of other internal spans", ("name", "status")
+)
+
+
+def observe_span(name: str, kind: str, seconds: float, status: str, attributes: dict[str, Any]) -> None:
+    """Route a finished span to the matching latency histogram."""
+    if kind == "tool":
+        TOOL_DURATION.observe(seconds, tool=name, status=status)
+    elif kind in ("client", "llm"):
+        DEPENDENCY_DURATION.observe(
+            seconds,
+            dependency=attributes.get("dependency", "other"),
+            operation=attributes.get("operation", name),
+            status=status,
+        )
+    elif kind == "internal":
+        SPAN_DURATION.observe(seconds, name=name, status=status)
+    # server spans are covered by the request histogram below
+
+
+# ── HTTP ─────────────────────────────────────────────────────
+
+HTTP_DURATION = histogram(
+    "rapidreach_http_request_duration_seconds", "Inbound HTTP request latency", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = gauge("rapidreach_http_requests_in_flight", "Inbound HTTP requests being served")
+HTTP_IN_FLIGHT.set(0)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: in-flight gauge and latency histogram labelled by route template."""
+
+    def __init__(self, app, exclude: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            HTTP_DURATION.observe(time.perf_counter() - t0, method=scope["method"], route=route, status=status)
+
+
+def metrics_response() -> Response:
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+def instrument_app(app) -> None:
+    """Add request metrics and a GET /metrics endpoint to a FastAPI app."""
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
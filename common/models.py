@@ -2,13 +2,26 @@
 common/models.py
 Shared Pydantic models used across all services.
 Single source of truth for Lead, Meeting, SDRResult, EmailRecord, and callback payloads.
+
+Also hosts the fast codec used on hot paths (see "Codec" at the bottom):
+orjson dumps/loads, bulk TypeAdapter validation for lists of leads/events,
+model_construct-based `trusted()` for data this system produced itself, and
+ToolResult — the in-process return type of agent tools.
 """
 
 from __future__ import annotations
 from datetime import datetime
 from enum import Enum
-from typing import Any, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Optional, TypeVar
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from common.tracing import current_trace_id
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover — falls back to the stdlib encoder
+    orjson = None
+    import json as _json
 
 
 # ── Enums ────────────────────────────────────────────────────
@@ -86,6 +99,7 @@ class SDRResult(BaseModel):
     call_outcome: CallOutcome = CallOutcome.OTHER
     email_sent: bool = False
     email_subject: str = ""
+    degraded_steps: dict[str, str] = Field(default_factory=dict)  # step → cheaper path taken for lack of time
     created_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
 
 
@@ -144,6 +158,7 @@ class AgentCallback(BaseModel):
     message: str = ""
     timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
     data: dict[str, Any] = {}
+    trace_id: str = Field(default_factory=current_trace_id)  # correlates the event with its trace
 
 
 # ── Request / Response Models ────────────────────────────────
@@ -174,3 +189,107 @@ class SDRRequest(BaseModel):
 class ProcessEmailsRequest(BaseModel):
     callback_url: str = ""
     max_emails: int = 10
+
+
+# ── Codec ────────────────────────────────────────────────────
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes (orjson; models, enums and datetimes included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return _json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON bytes/str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return _json.loads(data)
+
+
+def trusted(model: type[M], data: dict[str, Any]) -> M:
+    """
+    Build a model without validation. Only for data this system produced
+    (e.g. a model_dump() round-tripped in-process) — never for external input.
+    """
+    return model.model_construct(**data)
+
+
+LEAD_LIST = TypeAdapter(list[Lead])
+CALLBACK_LIST = TypeAdapter(list[AgentCallback])
+
+
+def validate_leads(raw_leads: list[dict[str, Any]]) -> list[Lead]:
+    """
+    Validate a list of lead dicts in one pass. If any item is invalid, the
+    bad ones are dropped (one-by-one fallback) instead of failing the batch.
+    """
+    try:
+        return LEAD_LIST.validate_python(raw_leads)
+    except ValidationError:
+        valid: list[Lead] = []
+        for ld in raw_leads:
+            try:
+                valid.append(Lead.model_validate(ld))
+            except ValidationError:
+                continue
+        return valid
+
+
+def dump_leads(leads: list[Lead]) -> list[dict[str, Any]]:
+    """JSON-ready dicts for a list of leads (single serializer call)."""
+    return LEAD_LIST.dump_python(leads, mode="json")
+
+
+def encode_callback(payload: AgentCallback) -> bytes:
+    """One event as JSON bytes, serialized by pydantic-core."""
+    return payload.__pydantic_serializer__.to_json(payload)
+
+
+def encode_callback_batch(encoded: list[bytes]) -> bytes:
+    """Join pre-encoded events into a JSON array body."""
+    return b"[" + b",".join(encoded) + b"]"
+
+
+def parse_callbacks(body: bytes) -> list[AgentCallback]:
+    """Parse + validate a JSON array of callbacks straight from bytes."""
+    return CALLBACK_LIST.validate_json(body)
+
+
+# ── Tool results ─────────────────────────────────────────────
+
+class ToolResult(dict):
+    """
+    Structured return value of an agent tool.
+
+    In-process callers use it as the dict it is — no json.loads round-trip.
+    It is only serialized when it leaves the process: the Dedalus runner
+    builds the LLM tool message with str(result), which renders JSON here,
+    and HTTP responses / orjson handle dict subclasses natively.
+    """
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return dumps(self).decode()
+
+
+def as_result(value: Any) -> dict[str, Any]:
+    """
+    Normalize a tool/LLM output to a dict: ToolResults and dicts pass through,
+    JSON strings (e.g. raw LLM text) are parsed. Raises on invalid JSON.
+    """
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return loads(value)
@@ -0,0 +1,144 @@
+"""
+common/prewarm.py
+Startup prewarming and readiness for the agent services.
+
+Without it, the first request after a deploy pays for TLS handshakes, the
+Dedalus/ElevenLabs client setup, OAuth token load, API discovery documents
+and template parsing. Each service registers warm-up steps in its lifespan;
+they run concurrently in the background (sync steps on worker threads), and
+/health answers 503 until every step has finished. A failing step is logged
+and reported but does not keep the service unready — a missing API key
+shouldn't make the container unhealthy forever.
+
+Usage:
+    from common.prewarm import Prewarmer
+
+    prewarm = Prewarmer("sdr")
+    prewarm.add("dedalus", llm.prewarm)
+    prewarm.add("ui_client", partial(warm_client, "ui_client", "/health"))
+
+    # In lifespan:
+    await prewarm.start()
+    ...
+    await prewarm.stop()
+
+    @app.get("/health")
+    async def health():
+        return prewarm.health_response()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+
+from common.config import PREWARM_STEP_TIMEOUT_SECONDS
+from common.http_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+WarmStep = Callable[[], Any] | Callable[[], Awaitable[Any]]
+
+
+async def warm_client(target: str, path: str = "/") -> None:
+    """
+    Open a pooled keep-alive connection (DNS + TCP + TLS) to a target.
+    Any HTTP response counts; only transport errors fail the step.
+    """
+    await get_client(target).head(path, timeout=PREWARM_STEP_TIMEOUT_SECONDS)
+
+
+class Prewarmer:
+    """Runs named warm-up steps once at startup and tracks readiness."""
+
+    def __init__(self, service: str, timeout: float = PREWARM_STEP_TIMEOUT_SECONDS):
+        self.service = service
+        self.timeout = timeout
+        self._steps: dict[str, WarmStep] = {}
+        self.results: dict[str, str] = {}
+        self.durations_ms: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+
+    def add(self, name: str, step: WarmStep) -> None:
+        """
+        Register a step: a coroutine function (or partial of one), or a
+        blocking callable, which runs on a worker thread.
+        """
+        self._steps[name] = step
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    # ── Lifecycle ────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Start warming in the background; the service can accept liveness probes meanwhile."""
+        if self._task and not self._task.done():
+            return
+        self._ready.clear()
+        self._task = asyncio.create_task(self._run(), name=f"prewarm-{self.service}")
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _run(self) -> None:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self._steps.items()))
+        self._ready.set()
+        failed = [name for name, result in self.results.items() if result != "ok"]
+        logger.info(
+            f"{self.service} warm in {(time.perf_counter() - t0) * 1000:.0f} ms"
+            + (f" ({len(failed)} step(s) failed: {', '.join(failed)})" if failed else "")
+        )
+
+    async def _run_step(self, name: str, step: WarmStep) -> None:
+        t0 = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step):
+                await asyncio.wait_for(step(), self.timeout)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(step), self.timeout)
+            self.results[name] = "ok"
+        except Exception as e:
+            self.results[name] = f"failed: {type(e).__name__}: {e}" if str(e) else f"failed: {type(e).__name__}"
+            logger.warning(f"Prewarm step '{name}' {self.results[name]}")
+        finally:
+            self.durations_ms[name] = round((time.perf_counter() - t0) * 1000, 1)
+
+    # ── Health ───────────────────────────────────────────────
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "status": "ok" if self.ready else "warming",
+            "service": self.service,
+            "timestamp": datetime.utcnow().isoformat(),
+            "prewarm": {
+                name: {"result": self.results.get(name, "pending"), "ms": self.durations_ms.get(name)}
+                for name in self._steps
+            },
+        }
+
+    def health_response(self) -> JSONResponse:
+        """200 once warm, 503 while warming — suitable as a readiness probe."""
+        return JSONResponse(self.health(), status_code=200 if self.ready else 503)
@@ -0,0 +1,91 @@
+"""
+common/prompts.py
+Prompt layout for provider-side prompt-prefix caching.
+
+The research report (and, for the deck, the call transcript) is sent in full
+to draft_proposal, fact_check_proposal and generate_deck_content. Providers
+cache the longest identical prompt prefix — OpenAI automatically (routed by
+`prompt_cache_key`), Anthropic up to an explicit `cache_control` breakpoint —
+so a Prompt puts the shared context first, laid out byte-for-byte the same
+for every step, and the step's own instructions last:
+
+    from common.prompts import Prompt
+
+    prompt = Prompt(
+        "Write a compelling, tailored website proposal ...",
+        business=business_name,
+        research=research_summary,
+    )
+    result = await gateway.run(prompt=prompt, route="draft", cache="draft_proposal")
+
+The gateway renders the prompt for the model it ends up calling: a system
+message, then one user message whose content blocks are the context sections
+in a fixed order (CONTEXT_SECTIONS) followed by the task. Models with the
+"prompt_cache_control" capability (MODEL_PROFILES) get a breakpoint after
+each context section; models with "prompt_cache_key" get a key derived from
+the business and research, so every step about one lead shares a cache entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from common.config import MODEL_PROFILES
+
+SYSTEM = (
+    "You are RapidReach's sales development assistant. You help small local businesses "
+    "get a professional online presence. The business context comes first; the task comes last."
+)
+
+# Order of the shared context; earlier sections are shared by more steps
+CONTEXT_SECTIONS = (
+    ("business", "BUSINESS"),
+    ("research", "RESEARCH FINDINGS"),
+    ("transcript", "CALL TRANSCRIPT"),
+)
+
+_KEY_SECTIONS = ("business", "research")
+
+
+class Prompt:
+    """A shared, cacheable context prefix plus a per-step task suffix."""
+
+    def __init__(self, task: str, *, business: str = "", research: str = "", transcript: str = ""):
+        self.task = task
+        self.context = {"business": business, "research": research, "transcript": transcript}
+
+    def blocks(self) -> list[str]:
+        """The context sections present, each as one text block."""
+        return [
+            f"{title}:\n{self.context[name].strip()}"
+            for name, title in CONTEXT_SECTIONS
+            if self.context[name]
+        ]
+
+    @property
+    def cache_key(self) -> str:
+        """Routing key for the shared prefix: the same for every step about one business."""
+        material = "\x00".join(self.context[name] for name in _KEY_SECTIONS)
+        return "rr-" + hashlib.sha256(material.encode()).hexdigest()[:32]
+
+    def render(self, model: str) -> dict[str, Any]:
+        """DedalusRunner.run() kwargs (messages, prompt_cache_key) for `model`."""
+        capabilities = MODEL_PROFILES.get(model, {}).get("capabilities", ())
+        content: list[dict[str, Any]] = []
+        for text in self.blocks():
+            block: dict[str, Any] = {"type": "text", "text": text}
+            if "prompt_cache_control" in capabilities:
+                block["cache_control"] = {"type": "ephemeral"}
+            content.append(block)
+        content.append({"type": "text", "text": self.task})
+
+        kwargs: dict[str, Any] = {
+            "messages": [
+                {"role": "system", "content": SYSTEM},
+                {"role": "user", "content": content},
+            ],
+        }
+        if "prompt_cache_key" in capabilities:
+            kwargs["prompt_cache_key"] = self.cache_key
+        return kwargs
@@ -0,0 +1,180 @@
+"""
+common/ratelimit.py
+Per-API token buckets shared by every service process on a host.
+
+Places, Gmail send/modify, Calendar insert and ElevenLabs batch calls all have
+quotas; concurrent runs used to hit 429s and fail. Callers now await a token
+before each call instead:
+
+    from common.ratelimit import acquire
+
+    await acquire("places")
+    resp = await client.get(PLACES_SEARCH_URL, params=params)
+
+Buckets are configured in common.config.RATE_LIMITS (rate per second, burst).
+With RATE_LIMIT_DIR set (the default), each bucket's state lives in a small
+file under that directory and is updated under an exclusive flock, so every
+process on the host draws from the same bucket. Without it — or where fcntl
+isn't available — buckets are per-process.
+
+A caller that finds the bucket empty reserves the next token (the bucket goes
+into debt) and sleeps until it is due, so waiters are served in arrival order
+without polling. Unknown API names are not limited.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+from common import metrics
+from common.config import RATE_LIMIT_DIR, RATE_LIMITS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover — non-POSIX hosts fall back to per-process buckets
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WAIT_SECONDS = metrics.histogram(
+    "rapidreach_rate_limit_wait_seconds",
+    "Time spent waiting for a rate-limit token",
+    ("api",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+THROTTLED = metrics.counter(
+    "rapidreach_rate_limit_throttled_total", "Acquisitions that had to wait for a token", ("api",)
+)
+
+
+def _reserve(tokens: float, updated: float, now: float, rate: float, burst: float, n: float) -> tuple[float, float]:
+    """Refill, take n tokens (possibly into debt); returns (tokens left, seconds to wait)."""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate) - n
+    return tokens, (-tokens / rate if tokens < 0 else 0.0)
+
+
+class MemoryBucket:
+    """Token bucket for this process only."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1) -> float:
+        with self._lock:
+            now = time.time()
+            self._tokens, wait = _reserve(self._tokens, self._updated, now, self.rate, self.burst, n)
+            self._updated = now
+            return wait
+
+
+class FileBucket:
+    """
+    Token bucket whose state (two doubles: tokens, last update) lives in a file
+    shared by every process on the host; updates happen under flock(LOCK_EX).
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, path: Path, rate: float, burst: float):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._fd: int | None = None
+        self._lock = threading.Lock()  # fd is shared by this process's threads
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def reserve(self, n: float = 1) -> float:
+        with self._lock:
+            fd = self._open()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, self._STATE.size, 0)
+                now = time.time()
+                if len(raw) == self._STATE.size:
+                    tokens, updated = self._STATE.unpack(raw)
+                else:
+                    tokens, updated = self.burst, now  # new bucket starts full
+                tokens, wait = _reserve(tokens, updated, now, self.rate, self.burst, n)
+                os.pwrite(fd, self._STATE.pack(tokens, now), 0)
+                return wait
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RateLimiter:
+    """Registry of named buckets built from RATE_LIMITS."""
+
+    def __init__(self, limits: dict[str, tuple[float, float]] = RATE_LIMITS, directory: str = RATE_LIMIT_DIR):
+        self.limits = limits
+        self.directory = Path(directory) if directory and fcntl is not None else None
+        self._buckets: dict[str, MemoryBucket | FileBucket] = {}
+
+    def _bucket(self, api: str) -> MemoryBucket | FileBucket | None:
+        bucket = self._buckets.get(api)
+        if bucket is None:
+            limit = self.limits.get(api)
+            if not limit or limit[0] <= 0:
+                return None
+            rate, burst = limit
+            if self.directory is not None:
+                bucket = FileBucket(self.directory / f"{api}.bucket", rate, max(burst, 1))
+            else:
+                bucket = MemoryBucket(rate, max(burst, 1))
+            self._buckets[api] = bucket
+        return bucket
+
+    async def acquire(self, api: str, n: float = 1) -> float:
+        """
+        Wait until n tokens are available for `api`. Returns the seconds waited.
+        A shared bucket that can't be opened degrades to a per-process one.
+        """
+        bucket = self._bucket(api)
+        if bucket is None:
+            return 0.0
+        try:
+            wait = bucket.reserve(n)
+        except OSError as e:
+            logger.warning(f"Shared rate-limit bucket for '{api}' unavailable ({e}); using a per-process bucket")
+            rate, burst = self.limits[api]
+            bucket = self._buckets[api] = MemoryBucket(rate, max(burst, 1))
+            wait = bucket.reserve(n)
+        WAIT_SECONDS.observe(wait, api=api)
+        if wait > 0:
+            THROTTLED.inc(api=api)
+            await asyncio.sleep(wait)
+        return wait
+
+    def close(self) -> None:
+        for bucket in self._buckets.values():
+            if isinstance(bucket, FileBucket):
+                bucket.close()
+        self._buckets.clear()
+
+
+# Process-wide limiter shared by every service module
+rate_limiter = RateLimiter()
+
+
+async def acquire(api: str, n: float = 1) -> float:
+    """Await a token from the named bucket (see RATE_LIMITS in common.config)."""
+    return await rate_limiter.acquire(api, n)
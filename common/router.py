@@ -0,0 +1,136 @@
+"""
+common/router.py
+Latency- and cost-aware model routing with automatic fallback.
+
+Call sites name a route instead of a model:
+
+    result = await gateway.run(input=..., route="draft", cache="draft_proposal")
+
+A route (common.config.LLM_ROUTES) lists candidate models in preference order
+with a p90 latency budget, a cost ceiling and required capabilities
+(MODEL_PROFILES). The gateway records every attempt here; a model whose recent
+error rate reaches LLM_ROUTER_MAX_ERROR_RATE, or whose recent p90 latency is
+over the route's budget, is degraded and moves behind the healthy candidates.
+If the chosen model fails with a transient error or exceeds the route's
+failover timeout, the gateway moves on to the next candidate. The last
+candidate gets the normal timeout and retries.
+
+Per-model p90 latency and error rate are exported on /metrics.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+
+from common import metrics
+from common.config import (
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_WINDOW,
+    LLM_ROUTER_WINDOW_SECONDS,
+    LLM_ROUTES,
+    MODEL_PROFILES,
+)
+
+FAILOVERS = metrics.counter(
+    "rapidreach_llm_failovers_total", "Routed LLM calls that fell back to another model", ("route", "model")
+)
+
+_MIN_SAMPLES = 3  # fewer recent calls than this never mark a model degraded
+
+
+class ModelStats:
+    """Rolling window of (time, latency, ok) for one model."""
+
+    def __init__(self, size: int = LLM_ROUTER_WINDOW, max_age: float = LLM_ROUTER_WINDOW_SECONDS):
+        self.max_age = max_age
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=size)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), seconds, ok))
+
+    def _recent(self) -> list[tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.max_age
+        return [s for s in self._samples if s[0] >= cutoff]
+
+    def error_rate(self) -> float | None:
+        recent = self._recent()
+        if len(recent) < _MIN_SAMPLES:
+            return None
+        return sum(1 for _, _, ok in recent if not ok) / len(recent)
+
+    def p90(self) -> float | None:
+        latencies = sorted(seconds for _, seconds, ok in self._recent() if ok)
+        if len(latencies) < _MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(0.9 * len(latencies)) - 1)]
+
+
+class ModelRouter:
+    """Orders a route's candidate models by policy and recent health."""
+
+    def __init__(self, routes: dict[str, dict] = LLM_ROUTES, profiles: dict[str, dict] = MODEL_PROFILES):
+        self.routes = routes
+        self.profiles = profiles
+        self._stats: dict[str, ModelStats] = {}
+
+    def stats(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        self.stats(model).record(seconds, ok)
+
+    def policy(self, route: str) -> dict:
+        try:
+            return self.routes[route]
+        except KeyError:
+            raise ValueError(f"Unknown LLM route '{route}'") from None
+
+    def _eligible(self, model: str, policy: dict) -> bool:
+        profile = self.profiles.get(model)
+        if profile is None:
+            return True
+        max_cost = policy.get("max_cost")
+        if max_cost is not None and profile.get("cost", 0) > max_cost:
+            return False
+        return set(policy.get("requires", ())) <= set(profile.get("capabilities", ()))
+
+    def degraded(self, model: str, policy: dict) -> bool:
+        stats = self.stats(model)
+        error_rate = stats.error_rate()
+        if error_rate is not None and error_rate >= LLM_ROUTER_MAX_ERROR_RATE:
+            return True
+        p90 = stats.p90()
+        return p90 is not None and p90 > policy.get("latency_budget_s", math.inf)
+
+    def candidates(self, route: str) -> list[str]:
+        """Eligible models for a route: healthy ones first, each group in preference order."""
+        policy = self.policy(route)
+        models = [m.strip() for m in policy["models"].split(",") if m.strip()]
+        eligible = [m for m in dict.fromkeys(models) if self._eligible(m, policy)]
+        if not eligible:
+            raise ValueError(f"No model for LLM route '{route}' meets its cost ceiling and requirements")
+        healthy = [m for m in eligible if not self.degraded(m, policy)]
+        return healthy + [m for m in eligible if m not in healthy]
+
+    def snapshot(self) -> dict[str, dict[str, float | None]]:
+        return {
+            model: {"p90_s": stats.p90(), "error_rate": stats.error_rate()}
+            for model, stats in self._stats.items()
+        }
+
+
+# Process-wide router fed by common.llm.gateway
+router = ModelRouter()
+
+
+def _gauge(field: str):
+    return lambda: {(m,): v[field] for m, v in router.snapshot().items() if v[field] is not None}
+
+
+metrics.gauge("rapidreach_llm_model_p90_seconds", "Recent p90 latency of successful calls", ("model",), fn=_gauge("p90_s"))
+metrics.gauge("rapidreach_llm_model_error_rate", "Recent share of failed calls", ("model",), fn=_gauge("error_rate"))
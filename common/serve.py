@@ -0,0 +1,88 @@
+"""
+common/serve.py
+Run a service on TCP and, when UDS_DIR is set, on a Unix domain socket too.
+
+Services on one host call each other through the URLs in common.config, so
+the callback fan-in to the UI Client's /agent_callback and the SDR → deck hop
+go through the loopback TCP stack. With UDS_DIR set, every service also
+listens on {UDS_DIR}/{service}.sock, and the pooled clients
+(common.http_clients) send requests for a local target through that socket
+instead. TCP stays up for browsers, remote callers and health checks.
+
+Usage (a service's __main__.py):
+    from common import serve
+
+    serve.run("sdr.agent:app", "sdr", SDR_PORT, reload=True)
+
+uvicorn's reloader binds a single socket, so reload is turned off while
+UDS_DIR is set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import stat
+
+from common.config import UDS_DIR
+
+logger = logging.getLogger(__name__)
+
+# uvicorn is imported where it is used: common.http_clients imports this
+# module for socket_path(), and service modules shouldn't pay for uvicorn.
+
+
+def socket_path(service: str) -> str | None:
+    """Where `service` listens on this host, or None when UDS_DIR is not set."""
+    if not UDS_DIR or not hasattr(socket, "AF_UNIX"):
+        return None
+    return os.path.join(UDS_DIR, f"{service}.sock")
+
+
+def bind_unix(path: str) -> socket.socket:
+    """Bind a listening Unix socket at `path`, replacing a stale one left by a crash."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise RuntimeError(f"{path} exists and is not a socket")
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o660)
+    return sock
+
+
+async def serve(app, service: str, port: int, host: str = "0.0.0.0", **kwargs) -> None:
+    """Serve `app` (an app or "module:attr" string) on host:port and its Unix socket."""
+    import uvicorn
+
+    config = uvicorn.Config(app, host=host, port=port, **kwargs)
+    server = uvicorn.Server(config)
+    path = socket_path(service)
+    if path is None:
+        await server.serve()
+        return
+
+    sockets = [config.bind_socket(), bind_unix(path)]
+    logger.info(f"{service} also listening on unix:{path}")
+    try:
+        await server.serve(sockets=sockets)
+    finally:
+        for sock in sockets:
+            sock.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def run(app, service: str, port: int, host: str = "0.0.0.0", reload: bool = False, **kwargs) -> None:
+    """Blocking entrypoint: uvicorn.run() on TCP, or TCP + Unix socket when UDS_DIR is set."""
+    if socket_path(service) is None:
+        import uvicorn
+
+        uvicorn.run(app, host=host, port=port, reload=reload, **kwargs)
+        return
+    if reload:
+        logger.warning("UDS_DIR is set: auto-reload is disabled")
+    asyncio.run(serve(app, service, port, host, **kwargs))
@@ -0,0 +1,87 @@
+"""
+common/singleflight.py
+Coalesce identical in-flight requests.
+
+When two operators run SDR on the same lead, or the Pub/Sub listener and
+/process_emails pick up the same message, the same LLM prompt, Places lookup
+or Gmail fetch is issued twice at the same time. A Group lets concurrent
+callers with the same key share one call: the first caller starts it, later
+callers await the same result (or exception). Nothing is remembered once the
+call finishes — this is not a cache (see common.llm_cache for that).
+
+The call runs in its own task, so one waiter being cancelled doesn't cancel
+it for the others; it is cancelled only when every waiter has gone. It runs
+without the first caller's request deadline (common.deadline): each waiter
+stops waiting when its own deadline passes, so the call lasts as long as the
+waiter with the longest deadline still wants it. Other context (trace, ledger
+attribution) is the first caller's; callers that join can check `key in group`
+first to account for themselves (the LLM gateway records a ledger row each).
+
+Usage:
+    from common.singleflight import Group
+
+    _details_flight = Group("place_details")
+
+    detail = await _details_flight.do(place_id, lambda: _fetch_details(place_id))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Hashable
+
+from common import deadline, metrics
+
+SHARED = metrics.counter(
+    "rapidreach_singleflight_shared_total", "Calls that joined an identical in-flight call", ("group",)
+)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class Group:
+    """Keyed set of in-flight calls; one per kind of request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[Hashable, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a call with this key is in flight (a do() now would join it)."""
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() unless a call with the same key is already in flight; return its result."""
+        flight = self._flights.get(key)
+        if flight is None:
+            context = contextvars.copy_context()
+            context.run(deadline.clear)
+            flight = self._flights[key] = _Flight(asyncio.get_running_loop().create_task(fn(), context=context))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            SHARED.inc(group=self.name)
+        flight.waiters += 1
+        try:
+            done, _ = await asyncio.wait((flight.task,), timeout=deadline.bound(None))
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()  # every waiter has gone
+        if not done:
+            raise deadline.DeadlineExceeded(f"Request deadline passed waiting for a shared '{self.name}' call")
+        return flight.task.result()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,483 @@
+"""
+common/storage.py
+Pluggable persistence for leads, meetings, SDR sessions, lead status and the
+LLM usage ledger.
+
+Two backends implement the same async interface:
+  - BigQueryStorage — the production default (common.bigquery_utils + bq_writer)
+  - SQLiteStorage   — an embedded WAL-mode database for single-node and offline
+                      runs; hot lookups like find_lead_by_email are indexed and
+                      sub-millisecond.
+
+Pick one with STORAGE_BACKEND=bigquery|sqlite (SQLITE_PATH for the file).
+
+Usage:
+    from common.storage import get_storage
+
+    storage = get_storage()
+    lead = await storage.find_lead_by_email("owner@example.com")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from common import bigquery_utils as bq
+from common.bigquery_writer import bq_writer, log_write_errors
+from common.config import (
+    BIGQUERY_LEADS_TABLE,
+    BIGQUERY_LLM_USAGE_TABLE,
+    BIGQUERY_MEETINGS_TABLE,
+    BIGQUERY_SDR_SESSIONS_TABLE,
+    SQLITE_PATH,
+    STORAGE_BACKEND,
+)
+from common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class StorageUnavailable(RuntimeError):
+    """Raised when the configured backend cannot be reached."""
+
+
+class Storage(ABC):
+    """
+    Async persistence interface shared by all services.
+
+    Write methods return a list of error strings (empty on success). With
+    wait=False a backend may acknowledge before the write is durable and
+    report failures through logging instead.
+    """
+
+    name: str = ""
+
+    async def start(self) -> None:
+        """Open connections / start background writers (call from lifespan)."""
+
+    async def stop(self) -> None:
+        """Flush and close (call from lifespan shutdown)."""
+
+    async def prewarm(self) -> None:
+        """Create clients/tables ahead of the first request (see common.prewarm)."""
+
+    def available(self) -> bool:
+        return True
+
+    # ── Leads ────────────────────────────────────────────────
+
+    @abstractmethod
+    async def save_leads(self, leads: list[dict[str, Any]], wait: bool = True) -> list[str]: ...
+
+    @abstractmethod
+    async def find_lead_by_email(self, email: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def update_lead_status(self, place_id: str, new_status: str) -> None: ...
+
+    # ── Meetings ─────────────────────────────────────────────
+
+    @abstractmethod
+    async def save_meeting(self, meeting: dict[str, Any], wait: bool = False) -> list[str]: ...
+
+    @abstractmethod
+    async def list_meetings(self, limit: int = 50) -> list[dict[str, Any]]: ...
+
+    # ── SDR sessions ─────────────────────────────────────────
+
+    @abstractmethod
+    async def save_sdr_session(self, session: dict[str, Any], wait: bool = False) -> list[str]: ...
+
+    @abstractmethod
+    async def list_sdr_sessions(self, limit: int = 50) -> list[dict[str, Any]]: ...
+
+    # ── LLM usage ledger ─────────────────────────────────────
+
+    @abstractmethod
+    async def save_llm_usage(self, rows: list[dict[str, Any]], wait: bool = False) -> list[str]: ...
+
+    @abstractmethod
+    async def list_llm_usage(
+        self, limit: int = 100, session_id: str = "", lead_place_id: str = ""
+    ) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def summarize_llm_usage(self, group_by: str, limit: int = 50) -> list[dict[str, Any]]:
+        """Calls, tokens, cost and latency per USAGE_GROUPS dimension, most expensive first."""
+
+
+# Ledger dimensions → column; "outcome" comes from the SDR session the call belonged to
+USAGE_GROUPS: dict[str, str] = {
+    "lead": "u.lead_place_id",
+    "session": "u.session_id",
+    "city": "u.city",
+    "call_site": "u.call_site",
+    "model": "u.model",
+    "service": "u.service",
+    "outcome": "s.call_outcome",
+}
+
+
+def _usage_summary_sql(usage_table: str, sessions_table: str, group_by: str, limit: str) -> str:
+    """Aggregate query shared by both backends (table names already quoted)."""
+    column = USAGE_GROUPS.get(group_by)
+    if column is None:
+        raise ValueError(f"Unknown usage grouping '{group_by}' (expected one of {', '.join(USAGE_GROUPS)})")
+    join = ""
+    if column.startswith("s."):
+        join = (
+            f" LEFT JOIN (SELECT session_id, MAX(call_outcome) AS call_outcome"
+            f" FROM {sessions_table} GROUP BY session_id) s ON s.session_id = u.session_id"
+        )
+    return f"""
+        SELECT {column} AS group_key,
+               COUNT(*) AS calls,
+               SUM(CASE WHEN u.cached THEN 1 ELSE 0 END) AS cached_calls,
+               SUM(u.input_tokens) AS input_tokens,
+               SUM(u.output_tokens) AS output_tokens,
+               SUM(u.cost_usd) AS cost_usd,
+               AVG(u.latency_ms) AS avg_latency_ms,
+               COUNT(DISTINCT u.session_id) AS sessions
+        FROM {usage_table} u{join}
+        GROUP BY group_key
+        ORDER BY cost_usd DESC
+        LIMIT {limit}
+    """
+
+
+# ── BigQuery backend ─────────────────────────────────────────
+
+class BigQueryStorage(Storage):
+    name = "bigquery"
+
+    async def start(self) -> None:
+        await bq_writer.start()
+
+    async def stop(self) -> None:
+        await bq_writer.stop()
+
+    async def prewarm(self) -> None:
+        def _warm() -> None:
+            if bq.get_client() is None:
+                raise StorageUnavailable("BigQuery unavailable")
+            for table in bq.TABLE_SCHEMAS:
+                bq.ensure_table(table)
+
+        await asyncio.to_thread(_warm)
+
+    def available(self) -> bool:
+        return bq.get_client() is not None
+
+    async def _write(self, table: str, rows: list[dict[str, Any]], wait: bool, what: str) -> list[str]:
+        with span(
+            "bigquery.insert", kind="client", dependency="bigquery", operation="insert",
+            table=table, rows=len(rows), wait=wait,
+        ):
+            future = await bq_writer.write(table, rows)
+            if wait:
+                return await future
+        log_write_errors(future, what)
+        return []
+
+    async def _query(self, sql: str, params: dict[str, tuple[str, Any]] | None = None) -> list[dict[str, Any]]:
+        if not self.available():
+            raise StorageUnavailable("BigQuery unavailable")
+        with span("bigquery.query", kind="client", dependency="bigquery", operation="query"):
+            return await asyncio.to_thread(bq.query, sql, params)
+
+    async def save_leads(self, leads, wait=True):
+        return await self._write(BIGQUERY_LEADS_TABLE, leads, wait, f"Lead upload ({len(leads)} rows)")
+
+    async def find_lead_by_email(self, email):
+        rows = await self._query(
+            f"""
+            SELECT place_id, business_name, lead_status, phone, email, city
+            FROM `{bq.table_ref(BIGQUERY_LEADS_TABLE)}`
+            WHERE email = @sender_email
+            LIMIT 1
+            """,
+            {"sender_email": ("STRING", email)},
+        )
+        return rows[0] if rows else None
+
+    async def update_lead_status(self, place_id, new_status):
+        if not self.available():
+            raise StorageUnavailable("BigQuery unavailable")
+        with span("bigquery.update_lead_status", kind="client", dependency="bigquery", operation="update"):
+            await asyncio.to_thread(bq.update_lead_status, place_id, new_status)
+
+    async def save_meeting(self, meeting, wait=False):
+        return await self._write(
+            BIGQUERY_MEETINGS_TABLE, [meeting], wait, f"Meeting save ({meeting.get('meeting_id', '')})"
+        )
+
+    async def list_meetings(self, limit=50):
+        return await self._query(
+            f"""
+            SELECT * FROM `{bq.table_ref(BIGQUERY_MEETINGS_TABLE)}`
+            ORDER BY created_at DESC
+            LIMIT @limit
+            """,
+            {"limit": ("INT64", limit)},
+        )
+
+    async def save_sdr_session(self, session, wait=False):
+        return await self._write(
+            BIGQUERY_SDR_SESSIONS_TABLE, [session], wait, f"SDR session save ({session.get('session_id')})"
+        )
+
+    async def list_sdr_sessions(self, limit=50):
+        return await self._query(
+            f"""
+            SELECT * FROM `{bq.table_ref(BIGQUERY_SDR_SESSIONS_TABLE)}`
+            ORDER BY created_at DESC
+            LIMIT @limit
+            """,
+            {"limit": ("INT64", limit)},
+        )
+
+
+    async def save_llm_usage(self, rows, wait=False):
+        return await self._write(BIGQUERY_LLM_USAGE_TABLE, rows, wait, f"LLM usage ({len(rows)} rows)")
+
+    async def list_llm_usage(self, limit=100, session_id="", lead_place_id=""):
+        return await self._query(
+            f"""
+            SELECT * FROM `{bq.table_ref(BIGQUERY_LLM_USAGE_TABLE)}`
+            WHERE (@session_id = '' OR session_id = @session_id)
+              AND (@lead_place_id = '' OR lead_place_id = @lead_place_id)
+            ORDER BY created_at DESC
+            LIMIT @limit
+            """,
+            {
+                "session_id": ("STRING", session_id),
+                "lead_place_id": ("STRING", lead_place_id),
+                "limit": ("INT64", limit),
+            },
+        )
+
+    async def summarize_llm_usage(self, group_by, limit=50):
+        sql = _usage_summary_sql(
+            f"`{bq.table_ref(BIGQUERY_LLM_USAGE_TABLE)}`",
+            f"`{bq.table_ref(BIGQUERY_SDR_SESSIONS_TABLE)}`",
+            group_by,
+            "@limit",
+        )
+        return await self._query(sql, {"limit": ("INT64", limit)})
+
+
+# ── SQLite backend ───────────────────────────────────────────
+
+_SQLITE_TYPES = {"STRING": "TEXT", "FLOAT": "REAL", "INTEGER": "INTEGER", "BOOLEAN": "INTEGER", "TIMESTAMP": "TEXT"}
+
+# Per-table primary key; keyed tables are upserted so re-discovery refreshes the row
+_SQLITE_KEYS = {
+    BIGQUERY_LEADS_TABLE: "place_id",
+    BIGQUERY_MEETINGS_TABLE: None,
+    BIGQUERY_SDR_SESSIONS_TABLE: "session_id",
+    BIGQUERY_LLM_USAGE_TABLE: "call_id",
+}
+
+# Columns an upsert leaves alone once set: pipeline state (SDR, lead_manager)
+# that a re-discovered lead must not reset
+_SQLITE_KEEP = {
+    BIGQUERY_LEADS_TABLE: ("lead_status", "email", "notes", "discovered_at"),
+}
+
+
+def _insert_sql(table: str, columns: list[str]) -> str:
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})'
+    key = _SQLITE_KEYS.get(table)
+    if not key:
+        return sql
+    keep = _SQLITE_KEEP.get(table, ())
+    updates = ", ".join(
+        f'"{c}" = COALESCE(NULLIF("{table}"."{c}", \'\'), excluded."{c}")' if c in keep else f'"{c}" = excluded."{c}"'
+        for c in columns
+        if c != key
+    )
+    return f'{sql} ON CONFLICT("{key}") DO UPDATE SET {updates}'
+
+
+def _create_table_sql(table: str, schema: list[dict[str, str]]) -> str:
+    key = _SQLITE_KEYS.get(table)
+    cols = [
+        f'"{f["name"]}" {_SQLITE_TYPES.get(f["type"], "TEXT")}' + (" PRIMARY KEY" if f["name"] == key else "")
+        for f in schema
+    ]
+    return f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(cols)})'
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, schema: list[dict[str, str]]) -> None:
+    """Bring a table created by an older schema up to date (columns are only ever added)."""
+    existing = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+    for f in schema:
+        if f["name"] not in existing:
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{f["name"]}" {_SQLITE_TYPES.get(f["type"], "TEXT")}')
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for table, schema in bq.TABLE_SCHEMAS.items():
+                conn.execute(_create_table_sql(table, schema))
+                _add_missing_columns(conn, table, schema)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_leads_email ON "{BIGQUERY_LEADS_TABLE}" (email)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_meetings_created ON "{BIGQUERY_MEETINGS_TABLE}" (created_at)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_sessions_created ON "{BIGQUERY_SDR_SESSIONS_TABLE}" (created_at)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_llm_usage_session ON "{BIGQUERY_LLM_USAGE_TABLE}" (session_id)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_llm_usage_lead ON "{BIGQUERY_LLM_USAGE_TABLE}" (lead_place_id)')
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple | list = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            cur = self._connect().execute(sql, params)
+            return [dict(r) for r in cur.fetchall()]
+
+    def _insert(self, table: str, rows: list[dict[str, Any]]) -> list[str]:
+        if not rows:
+            return []
+        columns = [f["name"] for f in bq.TABLE_SCHEMAS[table]]
+        sql = _insert_sql(table, columns)
+        values = [tuple(self._to_sql(row.get(c)) for c in columns) for row in rows]
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                conn.executemany(sql, values)
+                conn.execute("COMMIT")
+            return []
+        except Exception as e:
+            logger.error(f"SQLite insert into {table} failed: {e}")
+            with self._lock:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+            return [str(e)] * len(rows)  # the whole transaction was rolled back
+
+    @staticmethod
+    def _to_sql(value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._connect)
+        logger.info(f"SQLite storage ready at {self.path}")
+
+    async def stop(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def save_leads(self, leads, wait=True):
+        return await asyncio.to_thread(self._insert, BIGQUERY_LEADS_TABLE, leads)
+
+    async def find_lead_by_email(self, email):
+        rows = await asyncio.to_thread(
+            self._execute,
+            f'SELECT place_id, business_name, lead_status, phone, email, city '
+            f'FROM "{BIGQUERY_LEADS_TABLE}" WHERE email = ? LIMIT 1',
+            (email,),
+        )
+        return rows[0] if rows else None
+
+    async def update_lead_status(self, place_id, new_status):
+        await asyncio.to_thread(
+            self._execute,
+            f'UPDATE "{BIGQUERY_LEADS_TABLE}" SET lead_status = ? WHERE place_id = ?',
+            (new_status, place_id),
+        )
+
+    async def save_meeting(self, meeting, wait=False):
+        return await asyncio.to_thread(self._insert, BIGQUERY_MEETINGS_TABLE, [meeting])
+
+    async def list_meetings(self, limit=50):
+        return await asyncio.to_thread(
+            self._execute,
+            f'SELECT * FROM "{BIGQUERY_MEETINGS_TABLE}" ORDER BY created_at DESC LIMIT ?',
+            (limit,),
+        )
+
+    async def save_sdr_session(self, session, wait=False):
+        return await asyncio.to_thread(self._insert, BIGQUERY_SDR_SESSIONS_TABLE, [session])
+
+    async def list_sdr_sessions(self, limit=50):
+        rows = await asyncio.to_thread(
+            self._execute,
+            f'SELECT * FROM "{BIGQUERY_SDR_SESSIONS_TABLE}" ORDER BY created_at DESC LIMIT ?',
+            (limit,),
+        )
+        for row in rows:
+            row["email_sent"] = bool(row.get("email_sent"))
+        return rows
+
+    async def save_llm_usage(self, rows, wait=False):
+        return await asyncio.to_thread(self._insert, BIGQUERY_LLM_USAGE_TABLE, rows)
+
+    async def list_llm_usage(self, limit=100, session_id="", lead_place_id=""):
+        rows = await asyncio.to_thread(
+            self._execute,
+            f'SELECT * FROM "{BIGQUERY_LLM_USAGE_TABLE}" '
+            f"WHERE (? = '' OR session_id = ?) AND (? = '' OR lead_place_id = ?) "
+            f"ORDER BY created_at DESC LIMIT ?",
+            (session_id, session_id, lead_place_id, lead_place_id, limit),
+        )
+        for row in rows:
+            row["cached"] = bool(row.get("cached"))
+            row["tokens_estimated"] = bool(row.get("tokens_estimated"))
+        return rows
+
+    async def summarize_llm_usage(self, group_by, limit=50):
+        sql = _usage_summary_sql(
+            f'"{BIGQUERY_LLM_USAGE_TABLE}"', f'"{BIGQUERY_SDR_SESSIONS_TABLE}"', group_by, "?"
+        )
+        return await asyncio.to_thread(self._execute, sql, (limit,))
+
+
+# ── Backend selection ────────────────────────────────────────
+
+_BACKENDS: dict[str, type[Storage]] = {
+    "bigquery": BigQueryStorage,
+    "sqlite": SQLiteStorage,
+}
+
+_storage: Storage | None = None
+
+
+def get_storage() -> Storage:
+    """Return the process-wide storage backend selected by STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        backend = _BACKENDS.get(STORAGE_BACKEND)
+        if backend is None:
+            logger.warning(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}', using bigquery")
+            backend = BigQueryStorage
+        _storage = backend()
+    return _storage
@@ -0,0 +1,507 @@
+"""
+common/tracing.py
+Lightweight cross-service tracing with W3C `traceparent` propagation.
+
+A single click in the dashboard crosses ui_client → sdr → deck_generator →
+Gmail, with callbacks flowing back to ui_client. Each service records spans
+for its inbound requests, tool calls, LLM calls and outbound API calls; the
+trace context rides along in the `traceparent` header on every pooled httpx
+request (see common.http_clients) and as `trace_id` on every AgentCallback.
+
+Finished spans are batched to the UI Client, which keeps the most recent
+traces in memory (TraceStore) and renders them as a waterfall on the
+dashboard's Traces tab. Every span's duration also feeds the latency
+histograms behind /metrics (common.metrics), whether or not it is traced.
+
+Usage:
+    from common import tracing
+    from common.tracing import span, traced
+
+    tracing.instrument_app(app, "sdr")      # server spans + service name
+
+    # In lifespan:
+    await tracing.span_exporter.start()
+    ...
+    await tracing.span_exporter.stop()      # flushes pending spans
+
+    @traced(kind="tool")
+    async def send_email(...): ...
+
+    with span("gmail.messages.send", kind="client"):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+import httpx
+
+from common.config import (
+    TRACE_EXPORT_BATCH_SIZE,
+    TRACE_EXPORT_INTERVAL_MS,
+    TRACE_EXPORT_URL,
+    TRACE_STORE_MAX_TRACES,
+    TRACING_ENABLED,
+)
+from common import metrics
+from common.metrics import observe_span
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+TRACE_ID_HEADER = "x-trace-id"
+
+# Paths that never open a server span (probes, telemetry, static assets,
+# and the callback/trace ingestion endpoints themselves)
+DEFAULT_EXCLUDE = ("/health", "/metrics", "/agent_callback", "/api/traces", "/static", "/ws")
+
+
+@dataclass
+class Span:
+    """One timed operation. Times are epoch milliseconds."""
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    service: str
+    kind: str = "internal"  # server | client | llm | tool | internal
+    start_ms: float = field(default_factory=lambda: time.time() * 1000)
+    duration_ms: float | None = None
+    status: str = "ok"
+    error: str = ""
+    attributes: dict[str, Any] = field(default_factory=dict)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException | str) -> None:
+        self.status = "error"
+        self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def finish(self) -> None:
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "kind": self.kind,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_service = "unknown"
+_sink: Callable[[list[dict[str, Any]]], None] | None = None
+
+
+def configure(service: str, sink: Callable[[list[dict[str, Any]]], None] | None = None) -> None:
+    """
+    Name this process's spans and choose where they go.
+
+    Args:
+        service: Service name stamped on every span.
+        sink: Receives finished spans directly (the UI Client passes its
+              TraceStore); None exports them over HTTP via span_exporter.
+    """
+    global _service, _sink
+    _service = service
+    _sink = sink
+
+
+# ── Context helpers ──────────────────────────────────────────
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def service_name() -> str:
+    """Name this process was configured with (see configure())."""
+    return _service
+
+
+def current_trace_id() -> str:
+    """Trace id of the active span, or "" outside a trace."""
+    s = _current_span.get()
+    return s.trace_id if s else ""
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Attach attributes to the active span, if any."""
+    s = _current_span.get()
+    if s is not None:
+        s.set(**attributes)
+
+
+def parse_traceparent(value: str | bytes | None) -> tuple[str, str] | None:
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or None."""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+def inject(headers: dict[str, str]) -> dict[str, str]:
+    """Add the active span's traceparent to an outgoing header dict."""
+    s = _current_span.get()
+    if s is not None:
+        headers[TRACEPARENT] = s.traceparent
+    return headers
+
+
+# ── Recording spans ──────────────────────────────────────────
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    parent: tuple[str, str] | None = None,
+    root: bool | None = None,
+    **attributes: Any,
+) -> Iterator[Span | None]:
+    """
+    Time the enclosed block as a child of the active span (or of `parent`,
+    an extracted (trace_id, span_id); otherwise a new trace is started).
+    Exceptions mark the span as failed and propagate.
+
+    Outside a trace only server and internal spans start a new one (override
+    with `root`); tool, LLM and client spans are then not recorded, so
+    background polling doesn't fill the store with one-span traces.
+    Yields None when nothing is being recorded. Either way the duration feeds
+    the latency histograms in common.metrics.
+    """
+    current = _current_span.get()
+    if root is None:
+        root = kind in ("server", "internal")
+    if not TRACING_ENABLED or (not root and current is None and parent is None):
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield None
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            observe_span(name, kind, time.perf_counter() - t0, status, attributes)
+        return
+
+    if parent is not None:
+        trace_id, parent_id = parent
+    elif current is not None:
+        trace_id, parent_id = current.trace_id, current.span_id
+    else:
+        trace_id, parent_id = _new_id(16), None
+
+    s = Span(trace_id, _new_id(8), parent_id, name, _service, kind, attributes=attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.fail("cancelled" if isinstance(e, asyncio.CancelledError) else e)
+        raise
+    finally:
+        _current_span.reset(token)
+        s.finish()
+        observe_span(name, kind, s.duration_ms / 1000, s.status, s.attributes)
+        _record(s)
+
+
+def traced(name: str | None = None, kind: str = "internal") -> Callable:
+    """
+    Decorator: run each call of a sync or async function inside a span.
+    The wrapper keeps the original signature, so traced functions can still
+    be handed to the Dedalus runner as tools.
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _record(s: Span) -> None:
+    data = s.to_dict()
+    if _sink is not None:
+        try:
+            _sink([data])
+        except Exception as e:
+            logger.debug(f"Trace sink rejected span '{s.name}': {e}")
+    else:
+        span_exporter.add(data)
+
+
+# ── Export (agents → UI Client) ──────────────────────────────
+
+class SpanExporter:
+    """Buffers finished spans and posts them to the UI Client in batches."""
+
+    def __init__(
+        self,
+        url: str = TRACE_EXPORT_URL,
+        max_batch_size: int = TRACE_EXPORT_BATCH_SIZE,
+        interval: float = TRACE_EXPORT_INTERVAL_MS / 1000,
+        max_buffer: int = TRACE_EXPORT_BATCH_SIZE * 20,
+    ):
+        self.url = url
+        self.max_batch_size = max_batch_size
+        self.interval = interval
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=max_buffer)
+        self._task: asyncio.Task | None = None
+
+    def add(self, span_dict: dict[str, Any]) -> None:
+        """Queue a finished span; the oldest spans are dropped if the buffer is full."""
+        self._buffer.append(span_dict)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def start(self) -> None:
+        if not TRACING_ENABLED or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="span-exporter")
+
+    async def stop(self) -> None:
+        """Stop the flusher, then send whatever is still buffered."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        from common.http_clients import get_client
+        from common.models import dumps
+
+        token = _current_span.set(None)  # the exporter's own requests are never traced
+        try:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.max_batch_size, len(self._buffer)))]
+                try:
+                    resp = await get_client("ui_client").post(
+                        self.url,
+                        content=dumps(batch),
+                        headers={"Content-Type": "application/json"},
+                        timeout=10,
+                    )
+                    resp.raise_for_status()
+                except Exception as e:
+                    logger.debug(f"Span export ({len(batch)} spans) failed: {e}")
+                    return
+        finally:
+            _current_span.reset(token)
+
+
+# Process-wide exporter shared by every service module
+span_exporter = SpanExporter()
+
+metrics.gauge(
+    "rapidreach_span_export_queue_depth", "Finished spans waiting to be exported",
+    fn=lambda: span_exporter.pending,
+)
+
+
+# ── Store (UI Client) ────────────────────────────────────────
+
+class TraceStore:
+    """In-memory store of the most recently active traces (LRU by trace)."""
+
+    def __init__(self, max_traces: int = TRACE_STORE_MAX_TRACES, max_spans_per_trace: int = 2000):
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+    def add(self, spans: Iterable[dict[str, Any]]) -> int:
+        """Insert finished spans; returns how many were stored."""
+        stored = 0
+        for s in spans:
+            trace_id = s.get("trace_id")
+            if not trace_id or not s.get("span_id") or not isinstance(s.get("start_ms"), (int, float)):
+                continue
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                trace = self._traces[trace_id] = []
+            else:
+                self._traces.move_to_end(trace_id)
+            if len(trace) < self.max_spans_per_trace:
+                trace.append(s)
+                stored += 1
+        while len(self._traces) > self.max_traces:
+            self._traces.popitem(last=False)
+        return stored
+
+    def get(self, trace_id: str) -> list[dict[str, Any]] | None:
+        """All spans of a trace ordered by start time, or None if unknown."""
+        trace = self._traces.get(trace_id)
+        if trace is None:
+            return None
+        return sorted(trace, key=lambda s: s["start_ms"])
+
+    def summaries(self, limit: int = 50) -> list[dict[str, Any]]:
+        """Newest-first overview: root span, services, span/error counts, wall time."""
+        out = []
+        for trace_id in reversed(self._traces):
+            out.append(self._summarize(trace_id, self._traces[trace_id]))
+            if len(out) >= limit:
+                break
+        return out
+
+    @staticmethod
+    def _summarize(trace_id: str, spans: list[dict[str, Any]]) -> dict[str, Any]:
+        ids = {s["span_id"] for s in spans}
+        roots = [s for s in spans if s.get("parent_id") not in ids]
+        root = min(roots or spans, key=lambda s: s["start_ms"])
+        start = min(s["start_ms"] for s in spans)
+        end = max(s["start_ms"] + (s.get("duration_ms") or 0) for s in spans)
+        return {
+            "trace_id": trace_id,
+            "name": root["name"],
+            "service": root["service"],
+            "start_ms": start,
+            "duration_ms": round(end - start, 3),
+            "span_count": len(spans),
+            "error_count": sum(1 for s in spans if s.get("status") == "error"),
+            "services": sorted({s["service"] for s in spans}),
+        }
+
+
+# ── Instrumentation ──────────────────────────────────────────
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one server span per inbound request, continuing the
+    caller's trace when a traceparent header is present. The trace id is
+    echoed back in an `x-trace-id` response header.
+    """
+
+    def __init__(self, app, exclude: tuple[str, ...] = DEFAULT_EXCLUDE, methods: tuple[str, ...] = ("POST",)):
+        self.app = app
+        self.exclude = exclude
+        self.methods = methods
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not TRACING_ENABLED
+            or scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or scope["path"].startswith(self.exclude)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                parent = parse_traceparent(value)
+                break
+
+        method, path = scope["method"], scope["path"]
+        with span(f"{method} {path}", kind="server", parent=parent, **{"http.method": method, "http.path": path}) as s:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    s.set(**{"http.status_code": status})
+                    if status >= 500:
+                        s.fail(f"HTTP {status}")
+                    message["headers"] = [*message.get("headers", []), (TRACE_ID_HEADER.encode(), s.trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
+
+
+def instrument_app(app, service: str, **options: Any) -> None:
+    """
+    Configure tracing for a service and add server spans to its FastAPI app.
+    Only POSTs are traced by default — the read-only GETs the dashboard polls
+    would otherwise bury the real workflows.
+    """
+    configure(service, options.pop("sink", None))
+    app.add_middleware(TracingMiddleware, **options)
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport wrapper: inside an active trace, each outbound request
+    gets a client span and a traceparent header; otherwise it is a pass-through.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, dependency: str = "http"):
+        self._transport = transport
+        self.dependency = dependency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = request.url
+        with span(
+            f"{request.method} {url.host}{url.path}",
+            kind="client",
+            dependency=self.dependency,
+            operation=f"{request.method} {url.path}",
+            **{"http.method": request.method, "http.host": url.host, "http.path": url.path},
+        ) as s:
+            if s is None:
+                return await self._transport.handle_async_request(request)
+            request.headers[TRACEPARENT] = s.traceparent
+            response = await self._transport.handle_async_request(request)
+            s.set(**{"http.status_code": response.status_code})
+            if response.status_code >= 500:
+                s.fail(f"HTTP {response.status_code}")
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
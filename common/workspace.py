@@ -0,0 +1,192 @@
+"""
+common/workspace.py
+Async adapter for Gmail + Google Calendar API calls.
+
+googleapiclient's `.execute()` is a blocking HTTP call; made directly inside an
+`async def` handler it freezes the service's whole event loop. Every call here
+runs on a bounded thread pool instead, and each worker thread uses its own
+service object (see common.google_auth — Resources are not thread-safe).
+
+Usage:
+    from common.workspace import workspace, WorkspaceUnavailable
+
+    try:
+        msgs = await workspace.gmail_list_messages(q="is:unread", max_results=10)
+    except WorkspaceUnavailable:
+        ...  # OAuth2 not authorized
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from common.concurrency import get_limiter
+from common.config import PREWARM_STEP_TIMEOUT_SECONDS, WORKSPACE_MAX_WORKERS
+from common.google_auth import credential_manager, get_calendar_service, get_gmail_service
+from common.ratelimit import acquire
+from common.singleflight import Group
+from common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class WorkspaceUnavailable(RuntimeError):
+    """Raised when no valid OAuth2 credentials are available for the API."""
+
+
+_SERVICE_FACTORIES: dict[str, Callable[[], Any]] = {
+    "gmail": get_gmail_service,
+    "calendar": get_calendar_service,
+}
+
+
+def _execute(api: str, build_request: Callable[[Any], Any]) -> Any:
+    """Runs on a worker thread: get this thread's service, build and execute the request."""
+    service = _SERVICE_FACTORIES[api]()
+    if not service:
+        raise WorkspaceUnavailable(f"{api} OAuth2 not authorized")
+    return build_request(service).execute()
+
+
+def _build_services() -> None:
+    """Runs on a worker thread: build (and cache) that thread's services."""
+    for api, factory in _SERVICE_FACTORIES.items():
+        if not factory():
+            raise WorkspaceUnavailable(f"{api} OAuth2 not authorized")
+
+
+class WorkspaceClient:
+    """Awaitable wrappers around the Gmail/Calendar calls the agents make."""
+
+    def __init__(self, max_workers: int = WORKSPACE_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._message_flight = Group("gmail_messages")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="workspace",
+            )
+        return self._executor
+
+    async def call(
+        self,
+        api: str,
+        build_request: Callable[[Any], Any],
+        op: str = "request",
+        quota: str | None = None,
+    ) -> Any:
+        """
+        Execute an arbitrary request off the event loop.
+
+        Args:
+            api: "gmail" or "calendar".
+            build_request: Receives the thread's service object and returns an
+                           unexecuted HttpRequest, e.g. `lambda s: s.users().labels().list(userId="me")`.
+            op: Operation name for the client span, e.g. "labels.list".
+            quota: Rate-limit bucket to draw a token from first (common.ratelimit).
+                   The call then waits for a slot from the api's adaptive
+                   concurrency limiter (common.concurrency).
+        """
+        if quota:
+            await acquire(quota)
+        loop = asyncio.get_running_loop()
+        async with get_limiter(api):
+            with span(f"{api}.{op}", kind="client", dependency=api, operation=op):
+                return await loop.run_in_executor(self._get_executor(), _execute, api, build_request)
+
+    async def prewarm(self) -> None:
+        """
+        Start every worker and build its Gmail/Calendar services (credentials +
+        discovery documents) so no first call pays for it — services are cached
+        per thread. Requires credentials already loaded by
+        credential_manager.start(); prewarming never triggers interactive consent.
+        """
+        if not credential_manager.loaded:
+            raise WorkspaceUnavailable("OAuth2 not authorized")
+        # One job per worker; each waits at the barrier until every worker holds
+        # one, so no thread runs two jobs and leaves another cold
+        barrier = threading.Barrier(self.max_workers, timeout=PREWARM_STEP_TIMEOUT_SECONDS)
+
+        def warm() -> None:
+            try:
+                _build_services()
+            finally:
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError:
+                    pass
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, warm) for _ in range(self.max_workers)))
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (call from lifespan shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ── Gmail ────────────────────────────────────────────────
+
+    async def gmail_list_messages(self, q: str = "", max_results: int = 10) -> list[dict]:
+        result = await self.call(
+            "gmail",
+            lambda s: s.users().messages().list(userId="me", q=q, maxResults=max_results),
+            op="messages.list",
+        )
+        return result.get("messages", [])
+
+    async def gmail_get_message(self, message_id: str, format: str = "full") -> dict:
+        """Concurrent fetches of the same message (listener + /process_emails) share one call."""
+        return await self._message_flight.do(
+            (message_id, format),
+            lambda: self.call(
+                "gmail",
+                lambda s: s.users().messages().get(userId="me", id=message_id, format=format),
+                op="messages.get",
+            ),
+        )
+
+    async def gmail_modify_message(self, message_id: str, body: dict) -> dict:
+        return await self.call(
+            "gmail",
+            lambda s: s.users().messages().modify(userId="me", id=message_id, body=body),
+            op="messages.modify",
+            quota="gmail_modify",
+        )
+
+    async def gmail_send(self, raw: str) -> dict:
+        return await self.call(
+            "gmail",
+            lambda s: s.users().messages().send(userId="me", body={"raw": raw}),
+            op="messages.send",
+            quota="gmail_send",
+        )
+
+    # ── Calendar ─────────────────────────────────────────────
+
+    async def calendar_list_events(self, calendar_id: str, **params: Any) -> dict:
+        return await self.call(
+            "calendar",
+            lambda s: s.events().list(calendarId=calendar_id, **params),
+            op="events.list",
+        )
+
+    async def calendar_insert_event(self, calendar_id: str, body: dict, **params: Any) -> dict:
+        return await self.call(
+            "calendar",
+            lambda s: s.events().insert(calendarId=calendar_id, body=body, **params),
+            op="events.insert",
+            quota="calendar_insert",
+        )
+
+
+# Process-wide adapter shared by every tool module
+workspace = WorkspaceClient()
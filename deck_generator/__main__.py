@@ -7,7 +7,8 @@ Run with: python -m deck_generator
 import asyncio
 import logging
 
-import uvicorn
+from common import serve
+from common.config import DECK_GENERATOR_PORT
 from deck_generator.agent import app
 
 logging.basicConfig(level=logging.INFO)
@@ -17,9 +18,7 @@ logger = logging.getLogger(__name__)
 async def main():
     """Run the Deck Generator agent."""
     logger.info("🎨 Starting RapidReach Deck Generator...")
-    config = uvicorn.Config(app, host="0.0.0.0", port=8086, log_level="info")
-    server = uvicorn.Server(config)
-    await server.serve()
+    await serve.serve(app, "deck_generator", DECK_GENERATOR_PORT, log_level="info")
 
 
 if __name__ == "__main__":
@@ -19,20 +19,22 @@ import uuid
 import base64
 import io
 from contextlib import asynccontextmanager
+from functools import partial
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
 from fastapi import FastAPI, HTTPException
-from dedalus_labs import AsyncDedalus, DedalusRunner
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
-import httpx
 from dotenv import load_dotenv
 
-from common.config import DEFAULT_MODEL, DRAFT_MODEL, UI_CLIENT_URL
+from common.config import DEFAULT_MODEL, UI_CLIENT_URL, DECK_GENERATOR_PORT
+from common import deadline, idempotency, llm, metrics, tracing
+from common.llm import gateway
+from common.prompts import Prompt
+from common.callbacks import callback_emitter
+from common.http_clients import close_clients, open_clients
+from common.prewarm import Prewarmer, warm_client
+from common.tracing import traced
 from common.models import AgentCallback, AgentType
 
 load_dotenv()
@@ -55,13 +57,39 @@ DECK_REQUEST_SCHEMA = {
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🎨 Deck Generator agent starting up...")
+    open_clients("ui_client")
+    await callback_emitter.start()
+    await tracing.span_exporter.start()
+    await prewarm.start()
     yield
+    await prewarm.stop()
+    await tracing.span_exporter.stop()
+    await callback_emitter.stop()
+    await llm.gateway.aclose()
+    await close_clients()
     logger.info("🎨 Deck Generator agent shutting down...")
 
 
 app = FastAPI(title="RapidReach Deck Generator", lifespan=lifespan)
+idempotency.instrument_app(app, "/generate-deck")
+tracing.instrument_app(app, "deck_generator")
+metrics.instrument_app(app)
+deadline.instrument_app(app)
 
 
+def _prewarm_pptx() -> None:
+    """Import python-pptx and parse its default template once."""
+    from pptx import Presentation
+    Presentation()
+
+
+prewarm = Prewarmer("deck_generator")
+prewarm.add("dedalus", llm.prewarm)
+prewarm.add("pptx", _prewarm_pptx)
+prewarm.add("ui_client", partial(warm_client, "ui_client", "/health"))
+
+
+@traced(kind="tool")
 async def generate_deck_content(
     business_name: str,
     research_summary: str,
@@ -80,14 +108,8 @@ async def generate_deck_content(
     Returns:
         Dictionary with structured deck content
     """
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-    
-    content_prompt = f"""Based on the following business information, create a professional business solution deck outline:
+    content_prompt = f"""Based on the business information above, create a professional business solution deck outline.
 
-BUSINESS: {business_name}
-RESEARCH SUMMARY: {research_summary}
-CALL TRANSCRIPT: {call_transcript}
 CALL OUTCOME: {call_outcome}
 
 Generate a structured deck with the following sections. Provide specific, tailored content for each:
@@ -158,10 +180,16 @@ Format your response as a JSON object with this exact structure:
 }}"""
 
     try:
-        result = await runner.run(
-            input=content_prompt,
-            model=DRAFT_MODEL,
+        result = await gateway.run(
+            prompt=Prompt(
+                content_prompt,
+                business=business_name,
+                research=research_summary,
+                transcript=call_transcript,
+            ),
+            route="draft",
             max_steps=3,
+            cache="deck_content",
         )
         
         # Parse the JSON response
@@ -228,6 +256,7 @@ Format your response as a JSON object with this exact structure:
         }
 
 
+@traced()
 def create_professional_deck(content: Dict[str, Any], business_name: str, template_style: str = "professional") -> bytes:
     """
     Create a professional PowerPoint presentation using the generated content.
@@ -240,6 +269,11 @@ def create_professional_deck(content: Dict[str, Any], business_name: str, templa
     Returns:
         Bytes of the PowerPoint file
     """
+    # python-pptx (and lxml behind it) is imported on first deck, not at startup
+    from pptx import Presentation
+    from pptx.dml.color import RGBColor
+    from pptx.util import Pt
+
     prs = Presentation()
     
     # Define color schemes based on template style
@@ -440,24 +474,19 @@ async def generate_deck(request: dict):
         # Callback for progress updates
         session_id = request.get("session_id", str(uuid.uuid4()))
         
-        async def send_callback(message: str, step: str = ""):
-            try:
-                callback = AgentCallback(
-                    agent_type=AgentType.DECK_GENERATOR,
-                    session_id=session_id,
-                    message=message,
-                    step=step,
-                    timestamp=datetime.now()
-                )
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    await client.post(f"{UI_CLIENT_URL}/callback", json=callback.dict())
-            except Exception as e:
-                logger.warning(f"Callback failed: {e}")
+        def send_callback(message: str, step: str = ""):
+            callback_emitter.emit(f"{UI_CLIENT_URL}/agent_callback", AgentCallback(
+                agent_type=AgentType.DECK_GENERATOR,
+                event=step or "deck_progress",
+                business_name=request["business_name"],
+                message=message,
+                data={"session_id": session_id},
+            ))
         
-        await send_callback("🎨 Starting deck generation...", "deck_generation")
+        send_callback("🎨 Starting deck generation...", "deck_generation")
         
         # Generate deck content
-        await send_callback("🧠 Generating deck content with AI...", "content_generation")
+        send_callback("🧠 Generating deck content with AI...", "content_generation")
         content = await generate_deck_content(
             business_name=request["business_name"],
             research_summary=request["research_summary"],
@@ -466,14 +495,14 @@ async def generate_deck(request: dict):
         )
         
         # Create PowerPoint presentation
-        await send_callback("📊 Creating professional presentation...", "deck_creation")
+        send_callback("📊 Creating professional presentation...", "deck_creation")
         template_style = request.get("template_style", "professional")
         deck_bytes = create_professional_deck(content, request["business_name"], template_style)
         
         # Encode as base64 for transmission
         deck_b64 = base64.b64encode(deck_bytes).decode('utf-8')
         
-        await send_callback("✅ Deck generation completed successfully!", "completed")
+        send_callback("✅ Deck generation completed successfully!", "completed")
         
         return {
             "success": True,
@@ -494,8 +523,8 @@ async def generate_deck(request: dict):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "service": "deck-generator"}
+    """Health check endpoint — 503 until the prewarm phase has finished."""
+    return prewarm.health_response()
 
 
 @app.get("/")
@@ -510,5 +539,5 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8086)
\ No newline at end of file
+    from common import serve
+    serve.run(app, "deck_generator", DECK_GENERATOR_PORT)
\ No newline at end of file
@@ -17,7 +17,6 @@ import sys
 from datetime import datetime
 from email.utils import parseaddr
 
-import httpx
 from dotenv import load_dotenv
 
 from common.config import (
@@ -29,7 +28,11 @@ from common.config import (
     CRON_INTERVAL,
     UI_CLIENT_URL,
 )
-from common.google_auth import get_gmail_service
+from common import metrics, serve, tracing
+from common.google_auth import credential_manager, get_gmail_service
+from common.http_clients import close_clients, get_client
+from common.tracing import traced
+from common.workspace import WorkspaceUnavailable, workspace
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -66,42 +69,43 @@ def _get_header(headers: list[dict], name: str) -> str:
     return ""
 
 
-def fetch_message(service, message_id: str) -> dict | None:
-    """Fetch a full Gmail message by ID."""
+def _parse_message(msg: dict) -> dict:
+    """Flatten a full Gmail message into the email_data dict Lead Manager expects."""
+    headers = msg.get("payload", {}).get("headers", [])
+    sender_raw = _get_header(headers, "From")
+    _, sender_email = parseaddr(sender_raw)
+
+    return {
+        "message_id": msg["id"],
+        "thread_id": msg.get("threadId", ""),
+        "sender": sender_email or sender_raw,
+        "subject": _get_header(headers, "Subject"),
+        "body": _extract_body(msg.get("payload", {}))[:3000],
+        "received_at": _get_header(headers, "Date"),
+    }
+
+
+async def fetch_message_async(message_id: str) -> dict | None:
+    """Fetch a full Gmail message by ID without blocking the event loop."""
     try:
-        msg = service.users().messages().get(
-            userId="me", id=message_id, format="full"
-        ).execute()
-
-        headers = msg.get("payload", {}).get("headers", [])
-        sender_raw = _get_header(headers, "From")
-        _, sender_email = parseaddr(sender_raw)
-
-        return {
-            "message_id": msg["id"],
-            "thread_id": msg.get("threadId", ""),
-            "sender": sender_email or sender_raw,
-            "subject": _get_header(headers, "Subject"),
-            "body": _extract_body(msg.get("payload", {}))[:3000],
-            "received_at": _get_header(headers, "Date"),
-        }
+        return _parse_message(await workspace.gmail_get_message(message_id))
     except Exception as e:
         logger.error(f"Failed to fetch message {message_id}: {e}")
         return None
 
 
+@traced("forward_email")
 async def forward_to_lead_manager(email_data: dict):
-    """Forward email data to Lead Manager's /process_single_email endpoint."""
+    """Forward email data to Lead Manager's /process_single_email endpoint (starts a trace)."""
     url = f"{LEAD_MANAGER_SERVICE_URL}/process_single_email"
     email_data["callback_url"] = f"{UI_CLIENT_URL}/agent_callback"
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(url, json=email_data)
-            resp.raise_for_status()
-            result = resp.json()
-            logger.info(f"Lead Manager response for {email_data.get('message_id')}: {result.get('status')}")
-            return result
+        resp = await get_client("lead_manager").post(url, json=email_data, timeout=30)
+        resp.raise_for_status()
+        result = resp.json()
+        logger.info(f"Lead Manager response for {email_data.get('message_id')}: {result.get('status')}")
+        return result
     except Exception as e:
         logger.error(f"Failed to forward to Lead Manager: {e}")
         return None
@@ -119,15 +123,17 @@ async def pubsub_listener():
             PUBSUB_PROJECT_ID, PUBSUB_SUBSCRIPTION_NAME
         )
 
-        gmail_service = _get_gmail_service()
-        if not gmail_service:
+        if not _get_gmail_service():
             logger.error("Gmail service unavailable, falling back to polling")
             return False
 
         logger.info(f"Listening on {subscription_path}")
+        loop = asyncio.get_running_loop()
 
         def callback(message):
+            # Runs on a subscriber worker thread: use that thread's own Gmail service
             try:
+                gmail_service = _get_gmail_service()
                 data = json.loads(message.data.decode("utf-8"))
                 history_id = data.get("historyId")
                 logger.info(f"Pub/Sub notification: historyId={history_id}")
@@ -143,11 +149,14 @@ async def pubsub_listener():
                         continue
 
                     _processed_ids.add(msg_id)
-                    email_data = fetch_message(gmail_service, msg_id)
+                    # Fetch on the event loop so it shares the workspace singleflight
+                    email_data = asyncio.run_coroutine_threadsafe(
+                        fetch_message_async(msg_id), loop
+                    ).result()
                     if email_data:
-                        # Run async forward in sync callback
-                        asyncio.get_event_loop().create_task(
-                            forward_to_lead_manager(email_data)
+                        # Hand the async forward back to the service's event loop
+                        asyncio.run_coroutine_threadsafe(
+                            forward_to_lead_manager(email_data), loop
                         )
 
                 message.ack()
@@ -160,7 +169,8 @@ async def pubsub_listener():
         logger.info("Pub/Sub listener started successfully")
 
         try:
-            future.result()
+            # StreamingPullFuture.result() blocks — wait on it off the event loop
+            await asyncio.to_thread(future.result)
         except Exception as e:
             logger.error(f"Pub/Sub listener stopped: {e}")
             future.cancel()
@@ -182,31 +192,15 @@ async def polling_loop():
     """Poll Gmail for unread emails on a regular interval."""
     logger.info(f"Starting polling fallback (interval={CRON_INTERVAL}s)")
 
-    gmail_service = _get_gmail_service()
-
     while True:
         try:
-            if not gmail_service:
-                gmail_service = _get_gmail_service()
-                if not gmail_service:
-                    logger.warning("Gmail service still unavailable, retrying...")
-                    await asyncio.sleep(CRON_INTERVAL)
-                    continue
-
-            results = gmail_service.users().messages().list(
-                userId="me", q="is:unread", maxResults=10
-            ).execute()
+            messages = await workspace.gmail_list_messages(q="is:unread", max_results=10)
+            new_ids = [m["id"] for m in messages if m["id"] not in _processed_ids]
+            _processed_ids.update(new_ids)
 
-            messages = results.get("messages", [])
+            fetched = await asyncio.gather(*(fetch_message_async(mid) for mid in new_ids))
             new_count = 0
-
-            for msg_stub in messages:
-                msg_id = msg_stub["id"]
-                if msg_id in _processed_ids:
-                    continue
-
-                _processed_ids.add(msg_id)
-                email_data = fetch_message(gmail_service, msg_id)
+            for email_data in fetched:
                 if email_data:
                     await forward_to_lead_manager(email_data)
                     new_count += 1
@@ -214,6 +208,8 @@ async def polling_loop():
             if new_count > 0:
                 logger.info(f"Processed {new_count} new emails via polling")
 
+        except WorkspaceUnavailable:
+            logger.warning("Gmail service still unavailable, retrying...")
         except Exception as e:
             logger.error(f"Polling error: {e}")
 
@@ -223,9 +219,10 @@ async def polling_loop():
 # ── FastAPI app (for health checks) ─────────────────────────
 
 from fastapi import FastAPI
-import uvicorn
 
 app = FastAPI(title="SalesShortcut Gmail Listener")
+tracing.configure("gmail_listener")
+metrics.instrument_app(app)
 
 
 @app.get("/health")
@@ -241,6 +238,8 @@ async def health():
 @app.on_event("startup")
 async def startup():
     """Try Pub/Sub first, fall back to polling."""
+    await credential_manager.start()
+    await tracing.span_exporter.start()
     if PUBSUB_PROJECT_ID and PUBSUB_SUBSCRIPTION_NAME:
         # Try Pub/Sub in background task
         asyncio.create_task(_start_pubsub_or_poll())
@@ -249,6 +248,15 @@ async def startup():
         asyncio.create_task(polling_loop())
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the OAuth refresher and release pooled HTTP connections."""
+    await credential_manager.stop()
+    workspace.shutdown()
+    await tracing.span_exporter.stop()
+    await close_clients()
+
+
 async def _start_pubsub_or_poll():
     """Attempt Pub/Sub, fall back to polling."""
     success = await pubsub_listener()
@@ -258,4 +266,4 @@ async def _start_pubsub_or_poll():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=GMAIL_LISTENER_PORT)
+    serve.run(app, "gmail_listener", GMAIL_LISTENER_PORT)
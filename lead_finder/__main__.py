@@ -3,13 +3,13 @@ lead_finder/__main__.py
 Entrypoint: run the Lead Finder HTTP service.
 """
 
-import uvicorn
+from common import serve
 from common.config import LEAD_FINDER_PORT
 
 if __name__ == "__main__":
-    uvicorn.run(
+    serve.run(
         "lead_finder.agent:app",
-        host="0.0.0.0",
-        port=LEAD_FINDER_PORT,
+        "lead_finder",
+        LEAD_FINDER_PORT,
         reload=True,
     )
@@ -6,6 +6,8 @@ Architecture:
   Coordinator agent (cheap model) delegates to two specialist tools:
     1. search_google_maps — discovers businesses via Google Maps
     2. store_leads_bigquery — persists validated leads to BigQuery
+  The leads stay server-side: the search returns a short handle and a
+  summary, and storage takes the handle (common.handles).
   A dedup + merge step runs in Python between tool calls.
   Callbacks stream progress to the UI Client.
 """
@@ -15,20 +17,30 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from collections import Counter
 from contextlib import asynccontextmanager
-from datetime import datetime
+from functools import partial
 
-import httpx
 from fastapi import FastAPI
-from dedalus_labs import AsyncDedalus, DedalusRunner
 from dotenv import load_dotenv
 
 from common.config import DEFAULT_MODEL, UI_CLIENT_URL
+from common import deadline, handles, idempotency, ledger, llm, metrics, tracing
+from common.llm import gateway
+from common.prewarm import Prewarmer, warm_client
+from common.storage import get_storage
+from common.tracing import traced
+from common.callbacks import callback_emitter
+from common.http_clients import close_clients, open_clients
 from common.models import (
     AgentCallback,
     AgentType,
     FindLeadsRequest,
     Lead,
+    ToolResult,
+    dump_leads,
+    trusted,
+    validate_leads,
 )
 from lead_finder.tools.maps_search import search_google_maps
 from lead_finder.tools.bigquery_utils import upload_leads
@@ -43,23 +55,39 @@ discovered_leads: dict[str, Lead] = {}
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Lead Finder service starting")
+    open_clients("ui_client", "google_maps")
+    await callback_emitter.start()
+    await tracing.span_exporter.start()
+    await get_storage().start()
+    await prewarm.start()
     yield
+    await prewarm.stop()
+    await get_storage().stop()
+    await tracing.span_exporter.stop()
+    await callback_emitter.stop()
+    await llm.gateway.aclose()
+    await close_clients()
     logger.info("Lead Finder service shutting down")
 
 
 app = FastAPI(title="SalesShortcut Lead Finder", lifespan=lifespan)
+idempotency.instrument_app(app, "/find_leads")
+tracing.instrument_app(app, "lead_finder")
+metrics.instrument_app(app)
+deadline.instrument_app(app)
+
+prewarm = Prewarmer("lead_finder")
+prewarm.add("dedalus", llm.prewarm)
+prewarm.add("google_maps", partial(warm_client, "google_maps"))
+prewarm.add("ui_client", partial(warm_client, "ui_client", "/health"))
+prewarm.add("storage", get_storage().prewarm)
 
 
 # ── Helper: send callback to UI ─────────────────────────────
 
-async def notify_ui(callback_url: str, payload: AgentCallback):
-    """POST an event to the UI Client callback endpoint."""
-    url = callback_url or f"{UI_CLIENT_URL}/agent_callback"
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(url, json=payload.model_dump())
-    except Exception as e:
-        logger.warning(f"UI callback failed: {e}")
+def notify_ui(callback_url: str, payload: AgentCallback):
+    """Queue an event for the UI Client callback endpoint (non-blocking)."""
+    callback_emitter.emit(callback_url or f"{UI_CLIENT_URL}/agent_callback", payload)
 
 
 # ── Helper: dedup + merge ────────────────────────────────────
@@ -67,22 +95,19 @@ async def notify_ui(callback_url: str, payload: AgentCallback):
 def dedup_leads(raw_leads: list[dict]) -> list[Lead]:
     """Deduplicate by place_id, merge into Lead models."""
     seen: set[str] = set()
-    unique: list[Lead] = []
+    unique: list[dict] = []
     for ld in raw_leads:
         pid = ld.get("place_id", "")
         if pid and pid in seen:
             continue
         seen.add(pid)
-        try:
-            lead = Lead(**ld)
-            unique.append(lead)
-        except Exception:
-            continue
-    return unique
+        unique.append(ld)
+    return validate_leads(unique)
 
 
 # ── Tools exposed to the agent ───────────────────────────────
 
+@traced(kind="tool")
 async def find_businesses(
     city: str,
     business_types: list[str] | None = None,
@@ -90,10 +115,11 @@ async def find_businesses(
     max_results: int = 20,
     exclude_chains: bool = True,
     min_rating: float = 0.0,
-) -> str:
+) -> ToolResult:
     """
     Search Google Maps for local businesses without websites in a given city.
-    Returns JSON with discovered leads.
+    Returns a summary of the leads found and a `result_ref` handle for them;
+    pass the handle to store_leads.
     """
     result = await search_google_maps(
         city=city,
@@ -104,29 +130,35 @@ async def find_businesses(
         min_rating=min_rating,
         only_without_website=True,
     )
-    return result
+    leads = result.get("leads", [])
+    summary = {k: v for k, v in result.items() if k != "leads"}
+    summary.update(
+        result_ref=handles.put(leads, prefix="r"),
+        total=len(leads),
+        by_type=dict(Counter(ld.get("business_type", "") for ld in leads)),
+        businesses=[ld.get("business_name", "") for ld in leads],
+    )
+    return ToolResult(summary)
 
 
-def store_leads(leads_json: str) -> str:
+@traced(kind="tool")
+async def store_leads(result_ref: str) -> ToolResult:
     """
-    Persist a JSON list of leads to BigQuery.
-    Input should be a JSON string of lead objects.
+    Persist the leads behind a find_businesses result_ref (e.g. "r1") to BigQuery.
     Returns upload result summary.
     """
     try:
-        leads = json.loads(leads_json)
-        if isinstance(leads, dict):
-            leads = leads.get("leads", [leads])
-        return upload_leads(leads)
+        return await upload_leads(handles.get(result_ref))
     except Exception as e:
-        return json.dumps({"error": str(e), "uploaded": 0})
+        return ToolResult({"error": str(e), "uploaded": 0})
 
 
 # ── API Endpoints ────────────────────────────────────────────
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "service": "lead_finder", "timestamp": datetime.utcnow().isoformat()}
+    """Readiness: 503 until the prewarm phase has finished."""
+    return prewarm.health_response()
 
 
 @app.post("/find_leads")
@@ -136,9 +168,10 @@ async def find_leads_endpoint(req: FindLeadsRequest):
     Uses Dedalus DedalusRunner to orchestrate Maps search + storage.
     """
     callback_url = req.callback_url
+    ledger.attribute(city=req.city)
 
     # Notify UI: started
-    await notify_ui(callback_url, AgentCallback(
+    notify_ui(callback_url, AgentCallback(
         agent_type=AgentType.LEAD_FINDER,
         event="search_started",
         message=f"Starting lead search in {req.city}",
@@ -146,80 +179,73 @@ async def find_leads_endpoint(req: FindLeadsRequest):
     ))
 
     try:
-        client = AsyncDedalus()
-        runner = DedalusRunner(client)
-
         instructions = f"""You are a lead discovery specialist. Your job is to find local businesses
 in {req.city} that do NOT have websites — these are potential customers for web development services.
 
 Steps:
 1. Call find_businesses with city="{req.city}", business_types={json.dumps(req.business_types or ['restaurant', 'salon', 'plumber', 'dentist', 'auto repair'])},
    radius_km={req.radius_km}, max_results={req.max_results}, exclude_chains={req.exclude_chains}, min_rating={req.min_rating}.
-2. Review the results — count how many leads were found.
-3. Call store_leads with the leads JSON to persist them to the database.
+2. Review the summary — count how many leads were found.
+3. Call store_leads with the result_ref that find_businesses returned (e.g. "r1") to persist them
+   to the database. Never pass lead data itself; call it once per result_ref.
 4. Provide a final summary: how many leads found, what types, and any notable patterns.
 
 Be thorough. If few results come back, try broader search terms."""
 
-        result = await runner.run(
-            input=instructions,
-            model=DEFAULT_MODEL,
-            tools=[find_businesses, store_leads],
-            max_steps=8,
-        )
-
-        # Parse leads from the tool results and dedup
-        leads_found: list[dict] = []
-        if result.tool_results:
-            for tr in result.tool_results:
-                try:
-                    parsed = json.loads(tr.get("result", "{}"))
-                    if "leads" in parsed:
-                        leads_found.extend(parsed["leads"])
-                except Exception:
-                    pass
+        with handles.scope() as results:
+            result = await gateway.run(
+                input=instructions,
+                model=DEFAULT_MODEL,
+                tools=[find_businesses, store_leads],
+                max_steps=8,
+            )
+            # Every search's leads, straight from the handle store, then dedup
+            leads_found: list[dict] = [ld for batch in results.values("r") for ld in batch]
 
         unique_leads = dedup_leads(leads_found)
 
+        lead_dicts = dump_leads(unique_leads)
+
         # Store in memory
         for lead in unique_leads:
             discovered_leads[lead.place_id] = lead
 
         # Notify UI: completed
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.LEAD_FINDER,
             event="search_completed",
             message=f"Found {len(unique_leads)} leads in {req.city}",
             data={
                 "city": req.city,
                 "total_leads": len(unique_leads),
-                "leads": [ld.model_dump() for ld in unique_leads],
+                "leads": lead_dicts,
             },
         ))
 
         # Stream individual leads to UI
-        for lead in unique_leads:
-            await notify_ui(callback_url, AgentCallback(
+        # (built from already-validated leads, so skip re-validation)
+        for lead, lead_dict in zip(unique_leads, lead_dicts):
+            notify_ui(callback_url, trusted(AgentCallback, dict(
                 agent_type=AgentType.LEAD_FINDER,
                 event="lead_found",
                 business_id=lead.place_id,
                 business_name=lead.business_name,
                 status=lead.lead_status.value,
                 message=f"Discovered: {lead.business_name} — {lead.address}",
-                data=lead.model_dump(),
-            ))
+                data=lead_dict,
+            )))
 
         return {
             "status": "success",
             "city": req.city,
             "total_leads": len(unique_leads),
-            "leads": [ld.model_dump() for ld in unique_leads],
+            "leads": lead_dicts,
             "agent_summary": result.final_output,
         }
 
     except Exception as e:
         logger.error(f"Lead finding failed: {e}")
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.LEAD_FINDER,
             event="error",
             message=f"Lead search failed: {str(e)}",
@@ -230,4 +256,4 @@ Be thorough. If few results come back, try broader search terms."""
 @app.get("/api/leads")
 async def get_leads():
     """Return all discovered leads from memory."""
-    return {"leads": [ld.model_dump() for ld in discovered_leads.values()]}
+    return {"leads": dump_leads(list(discovered_leads.values()))}
@@ -6,19 +6,27 @@ and returns structured lead data.
 """
 
 from __future__ import annotations
-import json
 import logging
 from typing import Any
 
 import httpx
 
+from common.concurrency import get_limiter
 from common.config import GOOGLE_MAPS_API_KEY
+from common.http_clients import get_client
+from common.models import ToolResult
+from common.ratelimit import acquire
+from common.singleflight import Group
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 PLACES_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
 
+# Concurrent searches (overlapping cities/types) share in-flight detail lookups
+_details_flight = Group("place_details")
+
 # Common chain names to exclude
 CHAIN_KEYWORDS = {
     "starbucks", "mcdonald", "subway", "walmart", "target", "costco",
@@ -32,6 +40,7 @@ def _is_chain(name: str) -> bool:
     return any(kw in lower for kw in CHAIN_KEYWORDS)
 
 
+@traced(kind="tool")
 async def search_google_maps(
     city: str,
     business_types: list[str] | None = None,
@@ -40,7 +49,7 @@ async def search_google_maps(
     exclude_chains: bool = True,
     min_rating: float = 0.0,
     only_without_website: bool = True,
-) -> str:
+) -> ToolResult:
     """
     Search Google Maps for businesses in a city.
 
@@ -55,88 +64,96 @@ async def search_google_maps(
         only_without_website: If True, only return businesses without a website.
 
     Returns:
-        JSON string with a list of business leads.
+        ToolResult with a list of business leads.
     """
     if not GOOGLE_MAPS_API_KEY:
-        return json.dumps({"error": "GOOGLE_MAPS_API_KEY not set", "leads": []})
+        return ToolResult({"error": "GOOGLE_MAPS_API_KEY not set", "leads": []})
 
     search_types = business_types if business_types else ["local business"]
     all_leads: list[dict[str, Any]] = []
     seen_place_ids: set[str] = set()
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        for btype in search_types:
-            query = f"{btype} in {city}"
-            params = {
-                "query": query,
-                "radius": radius_km * 1000,
-                "key": GOOGLE_MAPS_API_KEY,
-            }
-
-            try:
+    client = get_client("google_maps")
+    for btype in search_types:
+        query = f"{btype} in {city}"
+        params = {
+            "query": query,
+            "radius": radius_km * 1000,
+            "key": GOOGLE_MAPS_API_KEY,
+        }
+
+        try:
+            await acquire("places")
+            async with get_limiter("places"):
                 resp = await client.get(PLACES_SEARCH_URL, params=params)
                 resp.raise_for_status()
-                data = resp.json()
-            except Exception as e:
-                logger.error(f"Maps search failed for '{query}': {e}")
+            data = resp.json()
+        except Exception as e:
+            logger.error(f"Maps search failed for '{query}': {e}")
+            continue
+
+        results = data.get("results", [])
+        for place in results:
+            if len(all_leads) >= max_results:
+                break
+
+            place_id = place.get("place_id", "")
+            if place_id in seen_place_ids:
                 continue
+            seen_place_ids.add(place_id)
 
-            results = data.get("results", [])
-            for place in results:
-                if len(all_leads) >= max_results:
-                    break
-
-                place_id = place.get("place_id", "")
-                if place_id in seen_place_ids:
-                    continue
-                seen_place_ids.add(place_id)
+            name = place.get("name", "")
+            rating = place.get("rating", 0)
 
-                name = place.get("name", "")
-                rating = place.get("rating", 0)
+            if exclude_chains and _is_chain(name):
+                continue
+            if rating < min_rating:
+                continue
 
-                if exclude_chains and _is_chain(name):
-                    continue
-                if rating < min_rating:
-                    continue
+            # Fetch details to check for website
+            detail = await _get_place_details(client, place_id)
 
-                # Fetch details to check for website
-                detail = await _get_place_details(client, place_id)
+            has_website = bool(detail.get("website"))
+            if only_without_website and has_website:
+                continue
 
-                has_website = bool(detail.get("website"))
-                if only_without_website and has_website:
-                    continue
+            lead = {
+                "place_id": place_id,
+                "business_name": name,
+                "address": place.get("formatted_address", ""),
+                "city": city,
+                "phone": detail.get("formatted_phone_number", ""),
+                "email": "",
+                "website": detail.get("website", ""),
+                "rating": rating,
+                "total_ratings": place.get("user_ratings_total", 0),
+                "business_type": btype,
+                "has_website": has_website,
+                "lead_status": "new",
+            }
+            all_leads.append(lead)
 
-                lead = {
-                    "place_id": place_id,
-                    "business_name": name,
-                    "address": place.get("formatted_address", ""),
-                    "city": city,
-                    "phone": detail.get("formatted_phone_number", ""),
-                    "email": "",
-                    "website": detail.get("website", ""),
-                    "rating": rating,
-                    "total_ratings": place.get("user_ratings_total", 0),
-                    "business_type": btype,
-                    "has_website": has_website,
-                    "lead_status": "new",
-                }
-                all_leads.append(lead)
-
-    return json.dumps({"leads": all_leads, "total": len(all_leads), "city": city})
+    return ToolResult({"leads": all_leads, "total": len(all_leads), "city": city})
 
 
 async def _get_place_details(client: httpx.AsyncClient, place_id: str) -> dict:
-    """Fetch detailed info for a single place."""
+    """Fetch detailed info for a single place (concurrent lookups of one place are shared)."""
+    return await _details_flight.do(place_id, lambda: _fetch_place_details(client, place_id))
+
+
+async def _fetch_place_details(client: httpx.AsyncClient, place_id: str) -> dict:
     try:
-        resp = await client.get(
-            PLACE_DETAILS_URL,
-            params={
-                "place_id": place_id,
-                "fields": "formatted_phone_number,website,opening_hours,url",
-                "key": GOOGLE_MAPS_API_KEY,
-            },
-        )
-        resp.raise_for_status()
+        await acquire("places")
+        async with get_limiter("places"):
+            resp = await client.get(
+                PLACE_DETAILS_URL,
+                params={
+                    "place_id": place_id,
+                    "fields": "formatted_phone_number,website,opening_hours,url",
+                    "key": GOOGLE_MAPS_API_KEY,
+                },
+            )
+            resp.raise_for_status()
         return resp.json().get("result", {})
     except Exception as e:
         logger.warning(f"Place details failed for {place_id}: {e}")
@@ -3,13 +3,13 @@ lead_manager/__main__.py
 Entrypoint: run the Lead Manager HTTP service.
 """
 
-import uvicorn
+from common import serve
 from common.config import LEAD_MANAGER_PORT
 
 if __name__ == "__main__":
-    uvicorn.run(
+    serve.run(
         "lead_manager.agent:app",
-        host="0.0.0.0",
-        port=LEAD_MANAGER_PORT,
+        "lead_manager",
+        LEAD_MANAGER_PORT,
         reload=True,
     )
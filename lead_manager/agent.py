@@ -10,28 +10,38 @@ Architecture:
     4. check_availability — finds open calendar slots
     5. create_meeting — books meeting with Google Meet link
     6. mark_email_as_read — marks processed emails
+  Email bodies stay server-side: the coordinator sees sender, subject and a
+  snippet, and passes an email_ref handle to the analysis (common.handles).
   Callbacks stream events to UI Client.
 """
 
 from __future__ import annotations
 
-import json
 import logging
 from contextlib import asynccontextmanager
-from datetime import datetime
+from functools import partial
 
-import httpx
 from fastapi import FastAPI
-from dedalus_labs import AsyncDedalus, DedalusRunner
 from dotenv import load_dotenv
 
-from common.config import DEFAULT_MODEL, CLASSIFIER_MODEL, UI_CLIENT_URL
+from common.config import DEFAULT_MODEL, UI_CLIENT_URL
+from common import deadline, handles, idempotency, llm, metrics, tracing
+from common.llm import gateway
+from common.prewarm import Prewarmer, warm_client
+from common.storage import get_storage
+from common.tracing import traced
+from common.callbacks import callback_emitter
+from common.google_auth import credential_manager
+from common.http_clients import close_clients, open_clients
+from common.workspace import workspace
 from common.models import (
     AgentCallback,
     AgentType,
     EmailAnalysis,
     Meeting,
     ProcessEmailsRequest,
+    ToolResult,
+    as_result,
 )
 from lead_manager.tools.check_email import fetch_unread_emails, mark_email_as_read
 from lead_manager.tools.calendar_utils import check_availability, create_meeting
@@ -44,6 +54,9 @@ from lead_manager.tools.bigquery_utils import (
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Characters of each email body the coordinator sees (the rest stays behind its email_ref)
+_SNIPPET_CHARS = 200
+
 # In-memory stores
 processed_emails: dict[str, dict] = {}
 scheduled_meetings: list[Meeting] = []
@@ -52,33 +65,53 @@ scheduled_meetings: list[Meeting] = []
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Lead Manager service starting")
+    open_clients("ui_client")
+    await callback_emitter.start()
+    await tracing.span_exporter.start()
+    await get_storage().start()
+    await credential_manager.start()
+    await prewarm.start()
     yield
+    await prewarm.stop()
+    await get_storage().stop()
+    await credential_manager.stop()
+    workspace.shutdown()
+    await tracing.span_exporter.stop()
+    await callback_emitter.stop()
+    await llm.gateway.aclose()
+    await close_clients()
     logger.info("Lead Manager service shutting down")
 
 
 app = FastAPI(title="SalesShortcut Lead Manager", lifespan=lifespan)
+idempotency.instrument_app(app, "/process_emails")
+tracing.instrument_app(app, "lead_manager")
+metrics.instrument_app(app)
+deadline.instrument_app(app)
+
+prewarm = Prewarmer("lead_manager")
+prewarm.add("dedalus", llm.prewarm)
+prewarm.add("workspace", workspace.prewarm)
+prewarm.add("ui_client", partial(warm_client, "ui_client", "/health"))
+prewarm.add("storage", get_storage().prewarm)
 
 
 # ── Helper: send callback to UI ─────────────────────────────
 
-async def notify_ui(callback_url: str, payload: AgentCallback):
-    url = callback_url or f"{UI_CLIENT_URL}/agent_callback"
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(url, json=payload.model_dump())
-    except Exception as e:
-        logger.warning(f"UI callback failed: {e}")
+def notify_ui(callback_url: str, payload: AgentCallback):
+    callback_emitter.emit(callback_url or f"{UI_CLIENT_URL}/agent_callback", payload)
 
 
 # ── Specialist: email analysis (agent-as-tool) ──────────────
 
+@traced(kind="tool")
 async def analyze_email(
     sender: str,
     subject: str,
     body: str,
     is_known_lead: bool = False,
     lead_info: str = "",
-) -> str:
+) -> ToolResult:
     """
     Analyze an email to determine if it's a meeting request, hot lead signal,
     or routine message. Returns structured analysis.
@@ -91,12 +124,9 @@ async def analyze_email(
         lead_info: JSON string of lead info if known.
 
     Returns:
-        JSON analysis with meeting request detection, confidence, and recommendations.
+        ToolResult with meeting request detection, confidence, and recommendations.
     """
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-
-    result = await runner.run(
+    result = await gateway.run(
         input=f"""Analyze this inbound email for sales-relevant signals.
 
 FROM: {sender}
@@ -129,22 +159,26 @@ Return a JSON object:
 }}
 
 Return ONLY the JSON.""",
-        model=CLASSIFIER_MODEL,
+        route="classify",
         response_format=EmailAnalysis,
         max_steps=2,
+        cache="analyze_email",
     )
 
     output = result.final_output
-    if hasattr(output, "model_dump"):
-        return json.dumps(output.model_dump())
-    return output if isinstance(output, str) else json.dumps(output)
+    try:
+        return ToolResult(as_result(output))
+    except ValueError:
+        logger.warning("Email analysis was not valid JSON; treating as summary only")
+        return ToolResult(summary=str(output))
 
 
 # ── API Endpoints ────────────────────────────────────────────
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "service": "lead_manager", "timestamp": datetime.utcnow().isoformat()}
+    """Readiness: 503 until the prewarm phase has finished."""
+    return prewarm.health_response()
 
 
 @app.post("/process_emails")
@@ -155,16 +189,13 @@ async def process_emails_endpoint(req: ProcessEmailsRequest):
     """
     callback_url = req.callback_url
 
-    await notify_ui(callback_url, AgentCallback(
+    notify_ui(callback_url, AgentCallback(
         agent_type=AgentType.LEAD_MANAGER,
         event="processing_started",
         message="Scanning inbox for new emails",
     ))
 
     try:
-        client = AsyncDedalus()
-        runner = DedalusRunner(client)
-
         instructions = f"""You are a Lead Manager. Your job is to process incoming emails
 from the sales inbox and take appropriate action.
 
@@ -172,7 +203,8 @@ Steps:
 1. Call fetch_emails to get unread emails (max {req.max_emails}).
 2. For each email:
    a. Call check_lead to see if the sender is a known lead.
-   b. Call analyze_email with the email content and lead info.
+   b. Call analyze_message with the email's email_ref (e.g. "e1") and the lead info.
+      Never copy the email text into a tool call — the email_ref is enough.
    c. If the analysis says it's a meeting request with confidence > 0.6:
       - Call check_calendar to find available slots.
       - Call schedule_meeting with the first available slot and attendee email.
@@ -186,15 +218,39 @@ Steps:
 Be thorough and handle each email."""
 
         # Build tool functions
-        async def fetch_emails(max_count: int = 10) -> str:
-            """Fetch unread emails from the sales inbox."""
-            return await fetch_unread_emails(max_emails=max_count)
-
-        async def check_lead(sender_email: str) -> str:
+        async def fetch_emails(max_count: int = 10) -> ToolResult:
+            """Fetch unread emails from the sales inbox (bodies are referenced by email_ref)."""
+            result = await fetch_unread_emails(max_emails=max_count)
+            emails = []
+            for email in result.get("emails", []):
+                body = email.get("body", "")
+                emails.append({
+                    **{k: v for k, v in email.items() if k != "body"},
+                    "email_ref": handles.put(email, prefix="e"),
+                    "snippet": body[:_SNIPPET_CHARS],
+                    "body_chars": len(body),
+                })
+            return ToolResult({**result, "emails": emails})
+
+        async def check_lead(sender_email: str) -> ToolResult:
             """Check if an email sender is a known lead."""
             return await check_if_known_lead(sender_email)
 
-        async def check_calendar(preferred_date: str = "", preferred_time: str = "") -> str:
+        async def analyze_message(email_ref: str, is_known_lead: bool = False, lead_info: str = "") -> ToolResult:
+            """Analyze a fetched email (by its email_ref) for meeting requests and hot-lead signals."""
+            try:
+                email = handles.get(email_ref)
+            except handles.HandleError as e:
+                return ToolResult({"error": str(e)})
+            return await analyze_email(
+                sender=email.get("sender", ""),
+                subject=email.get("subject", ""),
+                body=email.get("body", ""),
+                is_known_lead=is_known_lead,
+                lead_info=lead_info,
+            )
+
+        async def check_calendar(preferred_date: str = "", preferred_time: str = "") -> ToolResult:
             """Check available meeting slots."""
             return await check_availability(preferred_date, preferred_time)
 
@@ -203,17 +259,16 @@ Be thorough and handle each email."""
             start_time: str,
             business_name: str = "Prospect",
             description: str = "",
-        ) -> str:
+        ) -> ToolResult:
             """Create a calendar meeting with Google Meet link."""
-            result_json = await create_meeting(
+            result_data = await create_meeting(
                 attendee_email=attendee_email,
                 start_time=start_time,
                 business_name=business_name,
                 description=description,
             )
-            # Parse and store
+            # Store
             try:
-                result_data = json.loads(result_json)
                 if result_data.get("success"):
                     meeting = Meeting(
                         meeting_id=result_data.get("event_id", ""),
@@ -226,41 +281,41 @@ Be thorough and handle each email."""
                     )
                     scheduled_meetings.append(meeting)
 
-                    # Save to BQ
-                    save_meeting(meeting.model_dump())
+                    # Persist
+                    await save_meeting(meeting.model_dump())
 
                     # Notify UI
-                    import asyncio
-                    asyncio.create_task(notify_ui(callback_url, AgentCallback(
+                    notify_ui(callback_url, AgentCallback(
                         agent_type=AgentType.CALENDAR,
                         event="meeting_scheduled",
                         business_name=business_name,
                         message=f"Meeting scheduled with {attendee_email}",
                         data=result_data,
-                    )))
+                    ))
             except Exception:
                 pass
-            return result_json
+            return result_data
 
-        async def mark_read(message_id: str) -> str:
+        async def mark_read(message_id: str) -> ToolResult:
             """Mark an email as read."""
             return await mark_email_as_read(message_id)
 
-        result = await runner.run(
-            input=instructions,
-            model=DEFAULT_MODEL,
-            tools=[
-                fetch_emails,
-                check_lead,
-                analyze_email,
-                check_calendar,
-                schedule_meeting,
-                mark_read,
-            ],
-            max_steps=20,
-        )
+        with handles.scope():
+            result = await gateway.run(
+                input=instructions,
+                model=DEFAULT_MODEL,
+                tools=[
+                    fetch_emails,
+                    check_lead,
+                    analyze_message,
+                    check_calendar,
+                    schedule_meeting,
+                    mark_read,
+                ],
+                max_steps=20,
+            )
 
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.LEAD_MANAGER,
             event="processing_completed",
             message="Email processing complete",
@@ -275,7 +330,7 @@ Be thorough and handle each email."""
 
     except Exception as e:
         logger.error(f"Email processing failed: {e}")
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.LEAD_MANAGER,
             event="error",
             message=f"Processing failed: {str(e)}",
@@ -299,21 +354,18 @@ async def process_single_email(email_data: dict):
 
     try:
         # Check if known lead
-        lead_result = await check_if_known_lead(sender)
-        lead_data = json.loads(lead_result)
+        lead_data = await check_if_known_lead(sender)
         is_known = lead_data.get("is_known", False)
 
         # Analyze
-        analysis_result = await analyze_email(
+        analysis = await analyze_email(
             sender=sender,
             subject=subject,
             body=body,
             is_known_lead=is_known,
-            lead_info=lead_result if is_known else "",
+            lead_info=str(lead_data) if is_known else "",
         )
 
-        analysis = json.loads(analysis_result) if isinstance(analysis_result, str) else analysis_result
-
         result_data = {
             "message_id": message_id,
             "sender": sender,
@@ -326,7 +378,7 @@ async def process_single_email(email_data: dict):
             avail = await check_availability(
                 preferred_date=analysis.get("preferred_meeting_time", "") or "",
             )
-            slots = json.loads(avail).get("slots", [])
+            slots = avail.get("slots", [])
 
             if slots:
                 meeting_result = await create_meeting(
@@ -335,9 +387,9 @@ async def process_single_email(email_data: dict):
                     business_name=analysis.get("business_name", "Prospect"),
                 )
                 result_data["action_taken"] = "meeting_scheduled"
-                result_data["meeting"] = json.loads(meeting_result)
+                result_data["meeting"] = meeting_result
 
-                await notify_ui(callback_url, AgentCallback(
+                notify_ui(callback_url, AgentCallback(
                     agent_type=AgentType.CALENDAR,
                     event="meeting_scheduled",
                     business_name=analysis.get("business_name", ""),
@@ -348,9 +400,9 @@ async def process_single_email(email_data: dict):
         elif analysis.get("is_hot_lead"):
             result_data["action_taken"] = "hot_lead_flagged"
             if is_known and lead_data.get("place_id"):
-                update_lead_status(lead_data["place_id"], "hot_lead")
+                await update_lead_status(lead_data["place_id"], "hot_lead")
 
-            await notify_ui(callback_url, AgentCallback(
+            notify_ui(callback_url, AgentCallback(
                 agent_type=AgentType.LEAD_MANAGER,
                 event="hot_lead_detected",
                 business_name=analysis.get("business_name", ""),
@@ -372,4 +424,18 @@ async def process_single_email(email_data: dict):
 
 @app.get("/api/meetings")
 async def get_meetings():
-    return {"meetings": [m.model_dump() for m in scheduled_meetings]}
+    """Return meetings — stored history overlaid with this process's in-memory ones."""
+    meetings: dict[str, dict] = {}
+    try:
+        for row in await get_storage().list_meetings(limit=50):
+            for k, v in row.items():
+                if hasattr(v, "isoformat"):
+                    row[k] = v.isoformat()
+            meetings[row.get("meeting_id", "")] = row
+    except Exception as e:
+        logger.warning(f"Meeting history fetch failed: {e}")
+
+    for m in scheduled_meetings:
+        meetings[m.meeting_id] = m.model_dump()
+
+    return {"meetings": list(meetings.values())}
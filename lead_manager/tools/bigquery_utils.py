@@ -1,68 +1,43 @@
 """
 lead_manager/tools/bigquery_utils.py
-BigQuery helpers for Lead Manager:
+Persistence helpers for Lead Manager:
   - Check if a sender is a known/hot lead
   - Persist meeting records
   - Update lead status
+Thin wrapper over common.storage (BigQuery or SQLite, per STORAGE_BACKEND).
 """
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-from common.config import (
-    GOOGLE_CLOUD_PROJECT,
-    BIGQUERY_DATASET,
-    BIGQUERY_LEADS_TABLE,
-    BIGQUERY_MEETINGS_TABLE,
-)
+from common.storage import get_storage
+from common.models import ToolResult
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def _get_client():
-    try:
-        from google.cloud import bigquery
-        return bigquery.Client(project=GOOGLE_CLOUD_PROJECT)
-    except Exception as e:
-        logger.error(f"BigQuery client init failed: {e}")
-        return None
-
-
-async def check_if_known_lead(sender_email: str) -> str:
+@traced(kind="tool")
+async def check_if_known_lead(sender_email: str) -> ToolResult:
     """
-    Check if an email sender matches a known lead in BigQuery.
+    Check if an email sender matches a known lead.
 
     Args:
         sender_email: The sender's email address.
 
     Returns:
-        JSON with lead info if found, or indication of unknown sender.
-    """
-    client = _get_client()
-    if not client:
-        return json.dumps({"is_known": False, "error": "BigQuery unavailable"})
-
-    table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_LEADS_TABLE}"
-    query = f"""
-        SELECT place_id, business_name, lead_status, phone, email, city
-        FROM `{table_ref}`
-        WHERE email = @sender_email
-        LIMIT 1
+        ToolResult with lead info if found, or indication of unknown sender.
     """
+    storage = get_storage()
+    if not storage.available():
+        return ToolResult({"is_known": False, "error": f"{storage.name} unavailable"})
+
     try:
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter("sender_email", "STRING", sender_email),
-            ]
-        )
-        rows = list(client.query(query, job_config=job_config).result())
-        if rows:
-            row = dict(rows[0])
-            return json.dumps({
+        row = await storage.find_lead_by_email(sender_email)
+        if row:
+            return ToolResult({
                 "is_known": True,
                 "place_id": row.get("place_id", ""),
                 "business_name": row.get("business_name", ""),
@@ -71,57 +46,42 @@ async def check_if_known_lead(sender_email: str) -> str:
                 "email": row.get("email", ""),
                 "city": row.get("city", ""),
             })
-        return json.dumps({"is_known": False})
+        return ToolResult({"is_known": False})
     except Exception as e:
         logger.warning(f"Lead lookup failed: {e}")
-        return json.dumps({"is_known": False, "error": str(e)})
+        return ToolResult({"is_known": False, "error": str(e)})
 
 
-def save_meeting(meeting_data: dict[str, Any]) -> str:
+@traced(kind="tool")
+async def save_meeting(meeting_data: dict[str, Any]) -> ToolResult:
     """
-    Persist a meeting record to BigQuery.
+    Persist a meeting record (queued on BigQuery, immediate on SQLite).
 
     Args:
         meeting_data: Meeting dict with fields matching meetings schema.
 
     Returns:
-        JSON result.
+        ToolResult. Queued insert errors are logged when the batch flushes.
     """
-    client = _get_client()
-    if not client:
-        return json.dumps({"success": False, "error": "BigQuery unavailable"})
+    storage = get_storage()
+    if not storage.available():
+        return ToolResult({"success": False, "error": f"{storage.name} unavailable"})
 
-    table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_MEETINGS_TABLE}"
-    try:
-        errors = client.insert_rows_json(table_ref, [meeting_data])
-        if errors:
-            return json.dumps({"success": False, "errors": [str(e) for e in errors]})
-        return json.dumps({"success": True})
-    except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+    errors = await storage.save_meeting(meeting_data)
+    if errors:
+        return ToolResult({"success": False, "error": errors})
+    return ToolResult({"success": True, "queued": storage.name == "bigquery"})
 
 
-def update_lead_status(place_id: str, new_status: str) -> str:
-    """Update a lead's status in BigQuery."""
-    client = _get_client()
-    if not client:
-        return json.dumps({"success": False, "error": "BigQuery unavailable"})
+@traced(kind="tool")
+async def update_lead_status(place_id: str, new_status: str) -> ToolResult:
+    """Update a lead's status."""
+    storage = get_storage()
+    if not storage.available():
+        return ToolResult({"success": False, "error": f"{storage.name} unavailable"})
 
-    table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_LEADS_TABLE}"
-    query = f"""
-        UPDATE `{table_ref}`
-        SET lead_status = @new_status
-        WHERE place_id = @place_id
-    """
     try:
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter("new_status", "STRING", new_status),
-                bq.ScalarQueryParameter("place_id", "STRING", place_id),
-            ]
-        )
-        client.query(query, job_config=job_config).result()
-        return json.dumps({"success": True})
+        await storage.update_lead_status(place_id, new_status)
+        return ToolResult({"success": True})
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return ToolResult({"success": False, "error": str(e)})
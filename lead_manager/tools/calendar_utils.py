@@ -5,7 +5,6 @@ Google Calendar API helpers — check availability, create meetings with Google
 
 from __future__ import annotations
 
-import json
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -18,12 +17,15 @@ from common.config import (
     SCHEDULING_DAYS_AHEAD,
     SALES_EMAIL,
 )
-from common.google_auth import get_calendar_service
+from common.workspace import WorkspaceUnavailable, workspace
+from common.models import ToolResult
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-async def check_availability(preferred_date: str = "", preferred_time: str = "") -> str:
+@traced(kind="tool")
+async def check_availability(preferred_date: str = "", preferred_time: str = "") -> ToolResult:
     """
     Check available meeting slots within business hours for the next N days.
 
@@ -32,23 +34,19 @@ async def check_availability(preferred_date: str = "", preferred_time: str = "")
         preferred_time: Optional preferred time in HH:MM format.
 
     Returns:
-        JSON with available time slots.
+        ToolResult with available time slots.
     """
-    service = get_calendar_service()
-    if not service:
-        return json.dumps({"slots": [], "error": "Calendar OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
-
     now = datetime.now(timezone.utc)
     end = now + timedelta(days=SCHEDULING_DAYS_AHEAD)
 
     try:
-        events_result = service.events().list(
-            calendarId=CALENDAR_ID,
+        events_result = await workspace.calendar_list_events(
+            CALENDAR_ID,
             timeMin=now.isoformat(),
             timeMax=end.isoformat(),
             singleEvents=True,
             orderBy="startTime",
-        ).execute()
+        )
 
         busy_times = []
         for event in events_result.get("items", []):
@@ -93,20 +91,23 @@ async def check_availability(preferred_date: str = "", preferred_time: str = "")
 
             check_date += timedelta(days=1)
 
-        return json.dumps({"slots": available_slots[:10], "total_available": len(available_slots)})
+        return ToolResult({"slots": available_slots[:10], "total_available": len(available_slots)})
 
+    except WorkspaceUnavailable:
+        return ToolResult({"slots": [], "error": "Calendar OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
     except Exception as e:
         logger.error(f"Availability check failed: {e}")
-        return json.dumps({"slots": [], "error": str(e)})
+        return ToolResult({"slots": [], "error": str(e)})
 
 
+@traced(kind="tool")
 async def create_meeting(
     attendee_email: str,
     start_time: str,
     business_name: str,
     summary: str = "",
     description: str = "",
-) -> str:
+) -> ToolResult:
     """
     Create a Google Calendar meeting with Google Meet link.
 
@@ -118,12 +119,8 @@ async def create_meeting(
         description: Meeting description/agenda.
 
     Returns:
-        JSON with meeting details including Google Meet link.
+        ToolResult with meeting details including Google Meet link.
     """
-    service = get_calendar_service()
-    if not service:
-        return json.dumps({"success": False, "error": "Calendar OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
-
     if not summary:
         summary = f"Website Proposal Discussion — {business_name}"
 
@@ -155,12 +152,12 @@ async def create_meeting(
             },
         }
 
-        created = service.events().insert(
-            calendarId=CALENDAR_ID,
-            body=event,
+        created = await workspace.calendar_insert_event(
+            CALENDAR_ID,
+            event,
             conferenceDataVersion=1,
             sendNotifications=True,
-        ).execute()
+        )
 
         meet_link = ""
         conf = created.get("conferenceData", {})
@@ -169,7 +166,7 @@ async def create_meeting(
                 meet_link = ep.get("uri", "")
                 break
 
-        return json.dumps({
+        return ToolResult({
             "success": True,
             "event_id": created.get("id", ""),
             "html_link": created.get("htmlLink", ""),
@@ -180,6 +177,8 @@ async def create_meeting(
             "summary": summary,
         })
 
+    except WorkspaceUnavailable:
+        return ToolResult({"success": False, "error": "Calendar OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
     except Exception as e:
         logger.error(f"Create meeting failed: {e}")
-        return json.dumps({"success": False, "error": str(e)})
+        return ToolResult({"success": False, "error": str(e)})
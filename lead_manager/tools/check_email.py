@@ -6,13 +6,15 @@ Uses OAuth2 for personal Gmail access.
 
 from __future__ import annotations
 
+import asyncio
 import base64
-import json
 import logging
 from email.utils import parseaddr
 
 from common.config import SALES_EMAIL
-from common.google_auth import get_gmail_service
+from common.workspace import WorkspaceUnavailable, workspace
+from common.models import ToolResult
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,8 @@ def _get_header(headers: list[dict], name: str) -> str:
     return ""
 
 
-async def fetch_unread_emails(max_emails: int = 10) -> str:
+@traced(kind="tool")
+async def fetch_unread_emails(max_emails: int = 10) -> ToolResult:
     """
     Fetch unread emails from the sales inbox.
 
@@ -48,30 +51,21 @@ async def fetch_unread_emails(max_emails: int = 10) -> str:
         max_emails: Maximum number of emails to fetch.
 
     Returns:
-        JSON string with list of email records.
+        ToolResult with list of email records.
     """
     if not SALES_EMAIL:
-        return json.dumps({"emails": [], "error": "SALES_EMAIL not configured in .env"})
-
-    service = get_gmail_service()
-    if not service:
-        return json.dumps({"emails": [], "error": "Gmail OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
+        return ToolResult({"emails": [], "error": "SALES_EMAIL not configured in .env"})
 
     try:
-        results = service.users().messages().list(
-            userId="me",
-            q="is:unread",
-            maxResults=max_emails,
-        ).execute()
+        messages = await workspace.gmail_list_messages(q="is:unread", max_results=max_emails)
 
-        messages = results.get("messages", [])
+        # Fetch full messages concurrently (bounded by the workspace executor)
+        full_messages = await asyncio.gather(*(
+            workspace.gmail_get_message(msg_stub["id"]) for msg_stub in messages
+        ))
         emails = []
 
-        for msg_stub in messages:
-            msg = service.users().messages().get(
-                userId="me", id=msg_stub["id"], format="full"
-            ).execute()
-
+        for msg in full_messages:
             headers = msg.get("payload", {}).get("headers", [])
             sender_raw = _get_header(headers, "From")
             _, sender_email = parseaddr(sender_raw)
@@ -87,14 +81,17 @@ async def fetch_unread_emails(max_emails: int = 10) -> str:
             }
             emails.append(email_record)
 
-        return json.dumps({"emails": emails, "total": len(emails)})
+        return ToolResult({"emails": emails, "total": len(emails)})
 
+    except WorkspaceUnavailable:
+        return ToolResult({"emails": [], "error": "Gmail OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
     except Exception as e:
         logger.error(f"Fetch emails failed: {e}")
-        return json.dumps({"emails": [], "error": str(e)})
+        return ToolResult({"emails": [], "error": str(e)})
 
 
-async def mark_email_as_read(message_id: str) -> str:
+@traced(kind="tool")
+async def mark_email_as_read(message_id: str) -> ToolResult:
     """
     Mark an email as read in Gmail.
 
@@ -102,18 +99,12 @@ async def mark_email_as_read(message_id: str) -> str:
         message_id: Gmail message ID.
 
     Returns:
-        JSON result.
+        ToolResult.
     """
-    service = get_gmail_service()
-    if not service:
-        return json.dumps({"success": False, "error": "Gmail OAuth2 not authorized"})
-
     try:
-        service.users().messages().modify(
-            userId="me",
-            id=message_id,
-            body={"removeLabelIds": ["UNREAD"]},
-        ).execute()
-        return json.dumps({"success": True, "message_id": message_id})
+        await workspace.gmail_modify_message(message_id, {"removeLabelIds": ["UNREAD"]})
+        return ToolResult({"success": True, "message_id": message_id})
+    except WorkspaceUnavailable:
+        return ToolResult({"success": False, "error": "Gmail OAuth2 not authorized"})
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return ToolResult({"success": False, "error": str(e)})
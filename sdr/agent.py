@@ -22,20 +22,31 @@ import os
 import re
 import uuid
 from contextlib import asynccontextmanager
+from functools import partial
 from datetime import datetime, timedelta
 
-import httpx
-from fastapi import FastAPI
-from dedalus_labs import AsyncDedalus, DedalusRunner
+from fastapi import FastAPI, HTTPException
 from dotenv import load_dotenv
 
 from common.config import (
     DEFAULT_MODEL,
     RESEARCH_MODEL,
-    DRAFT_MODEL,
     CLASSIFIER_MODEL,
+    SDR_DEADLINE_SECONDS,
+    SDR_RESERVE_SECONDS,
+    SDR_STEP_BUDGETS,
     UI_CLIENT_URL,
 )
+from common import deadline, idempotency, ledger, llm, metrics, tracing
+from common.llm import gateway
+from common.prompts import Prompt
+from common.prewarm import Prewarmer, warm_client
+from common.storage import USAGE_GROUPS, get_storage
+from common.tracing import set_attributes, traced
+from common.callbacks import callback_emitter
+from common.google_auth import credential_manager
+from common.http_clients import close_clients, get_client, open_clients
+from common.workspace import workspace
 from common.models import (
     AgentCallback,
     AgentType,
@@ -44,10 +55,13 @@ from common.models import (
     ProposalDraft,
     SDRRequest,
     SDRResult,
+    ToolResult,
+    as_result,
 )
+from sdr.tools import phone_call
 from sdr.tools.phone_call import make_phone_call
 from sdr.tools.email_tool import send_email
-from sdr.tools.bigquery_utils import save_sdr_session, update_lead_status
+from sdr.tools.bigquery_utils import list_sdr_sessions, save_sdr_session, update_lead_status
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -288,34 +302,73 @@ def generate_ics(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("SDR Agent service starting")
+    open_clients("ui_client", "deck_generator")
+    await callback_emitter.start()
+    await tracing.span_exporter.start()
+    await get_storage().start()
+    await credential_manager.start()
+    await prewarm.start()
     yield
+    await prewarm.stop()
+    await get_storage().stop()
+    await credential_manager.stop()
+    workspace.shutdown()
+    await tracing.span_exporter.stop()
+    await callback_emitter.stop()
+    await llm.gateway.aclose()
+    await close_clients()
     logger.info("SDR Agent service shutting down")
 
 
 app = FastAPI(title="SalesShortcut SDR Agent", lifespan=lifespan)
+idempotency.instrument_app(app, "/run_sdr")
+tracing.instrument_app(app, "sdr")
+metrics.instrument_app(app)
+deadline.instrument_app(app)
+
+prewarm = Prewarmer("sdr")
+prewarm.add("dedalus", llm.prewarm)
+prewarm.add("elevenlabs", phone_call.prewarm)
+prewarm.add("workspace", workspace.prewarm)
+prewarm.add("deck_generator", partial(warm_client, "deck_generator", "/health"))
+prewarm.add("ui_client", partial(warm_client, "ui_client", "/health"))
+prewarm.add("storage", get_storage().prewarm)
 
 
 # ── Helper: send callback to UI ─────────────────────────────
 
-async def notify_ui(callback_url: str, payload: AgentCallback):
-    url = callback_url or f"{UI_CLIENT_URL}/agent_callback"
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(url, json=payload.model_dump())
-    except Exception as e:
-        logger.warning(f"UI callback failed: {e}")
+def notify_ui(callback_url: str, payload: AgentCallback):
+    callback_emitter.emit(callback_url or f"{UI_CLIENT_URL}/agent_callback", payload)
+
+
+# ── Helper: time budget ─────────────────────────────────────
+
+def budget_left() -> float:
+    """Seconds the pipeline may still spend before the reserve kept for email + save."""
+    return deadline.remaining() - SDR_RESERVE_SECONDS
+
+
+def fits(step: str) -> bool:
+    """Whether a step's full path fits in what is left of the deadline."""
+    return budget_left() >= SDR_STEP_BUDGETS[step]
+
+
+def completed_status(step: str, degraded: dict[str, str]) -> str:
+    return f"completed (degraded: {degraded[step]})" if step in degraded else "completed"
 
 
 # ── Specialist Tools (Agent-as-Tool pattern) ─────────────────
 
-async def research_business(business_name: str, city: str, address: str = "") -> str:
+@traced(kind="tool")
+async def research_business(business_name: str, city: str, address: str = "", web_search: bool = True) -> str:
     """
     Deep research on a business using web search.
     Examines competitors, reviews, web presence gaps, and market opportunities.
-    Returns a detailed research summary.
+    Returns a detailed research summary. With web_search=False (not enough
+    time left) it skips straight to knowledge-based research.
     """
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
+    if not web_search:
+        return await _knowledge_research(business_name, city, address)
 
     research_prompt = f"""Research this business thoroughly:
 Business: {business_name}
@@ -336,11 +389,13 @@ Provide a detailed research report."""
     # Tier 1: Try Brave Search MCP (single attempt — fail fast to Google)
     try:
         print("🔍 Attempting research with Brave Search MCP...")
-        result = await runner.run(
+        result = await gateway.run(
             input=research_prompt,
             model=RESEARCH_MODEL,
             mcp_servers=["windsor/brave-search-mcp"],
             max_steps=1,
+            retries=0,
+            cache="research",
         )
         print(f"✅ Research result (Brave Search MCP): {result.final_output}")
         return result.final_output
@@ -351,11 +406,13 @@ Provide a detailed research report."""
         
         # Tier 2: Try Google Search MCP (single attempt — fail fast to knowledge)
         try:
-            result = await runner.run(
+            result = await gateway.run(
                 input=research_prompt,
                 model=RESEARCH_MODEL,
                 mcp_servers=["google-search"],
                 max_steps=1,
+                retries=0,
+                cache="research",
             )
             print(f"✅ Research result (Google Search MCP): {result.final_output}")
             return result.final_output
@@ -365,9 +422,14 @@ Provide a detailed research report."""
             print("🧠 Falling back to knowledge-based research...")
             
             # Tier 3: Knowledge-based fallback
-            try:
-                fallback_result = await runner.run(
-                    input=f"""Generate a comprehensive research report for this business without web search:
+            return await _knowledge_research(business_name, city, address)
+
+
+async def _knowledge_research(business_name: str, city: str, address: str = "") -> str:
+    """Research tier 3: model knowledge only, no web search. Falls back to the template."""
+    try:
+        fallback_result = await gateway.run(
+            input=f"""Generate a comprehensive research report for this business without web search:
 Business: {business_name}
 City: {city}
 Address: {address}
@@ -381,16 +443,21 @@ Based on the business name and type, provide insights on:
 
 Use your knowledge of business patterns, local market dynamics, and industry standards.
 Be specific and actionable. Format as a detailed research report.""",
-                    model=RESEARCH_MODEL,
-                    max_steps=3,
-                )
-                print(f"✅ Research result (Knowledge-based fallback): {fallback_result.final_output}")
-                return fallback_result.final_output
-                
-            except Exception as e3:
-                print(f"❌ All research methods failed. Brave: {e}, Google: {e2}, Knowledge: {e3}")
-                # Last resort: return a basic template
-                return f"""Research Report for {business_name} (Generated from limited data)
+            route="research",
+            max_steps=3,
+            cache="research",
+        )
+        print(f"✅ Research result (Knowledge-based fallback): {fallback_result.final_output}")
+        return fallback_result.final_output
+
+    except Exception as e:
+        print(f"❌ Knowledge-based research failed: {e}")
+        return research_template(business_name, city, address)
+
+
+def research_template(business_name: str, city: str, address: str = "") -> str:
+    """Last resort: a basic research report built without any LLM call."""
+    return f"""Research Report for {business_name} (Generated from limited data)
 
 BUSINESS OVERVIEW:
 - Name: {business_name}
@@ -418,19 +485,14 @@ Note: This report was generated with limited research capabilities.
 A more detailed analysis would be available with full web access."""
 
 
+@traced(kind="tool")
 async def draft_proposal(business_name: str, research_summary: str) -> str:
     """
     Write a tailored website proposal for a business based on research.
     Returns a structured proposal with value proposition, sections, and pricing.
     """
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-
-    result = await runner.run(
-        input=f"""Write a compelling, tailored website proposal for {business_name}.
-
-Research findings:
-{research_summary}
+    prompt = Prompt(
+        f"""Write a compelling, tailored website proposal for {business_name}, based on the research findings above.
 
 Create a proposal with:
 1. **Value Proposition**: Why they need a website (use specific data from research)
@@ -442,30 +504,31 @@ Create a proposal with:
 
 Make it persuasive, specific to their business, and professional.
 Return the full proposal text.""",
-        model=DRAFT_MODEL,
+        business=business_name,
+        research=research_summary,
+    )
+    result = await gateway.run(
+        prompt=prompt,
+        route="draft",
         max_steps=3,
+        cache="draft_proposal",
     )
     return result.final_output
 
 
+@traced(kind="tool")
 async def fact_check_proposal(proposal_text: str, business_name: str, research_summary: str) -> str:
     """
     Validate and refine a website proposal for accuracy and persuasiveness.
     Acts as a critic — checks claims, improves weak points, ensures professionalism.
     Returns the refined proposal.
     """
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-
-    result = await runner.run(
-        input=f"""You are a proposal reviewer and fact-checker. Review this website proposal for {business_name}:
+    prompt = Prompt(
+        f"""You are a proposal reviewer and fact-checker. Review this website proposal for {business_name} against the research findings above:
 
 PROPOSAL:
 {proposal_text}
 
-ORIGINAL RESEARCH:
-{research_summary}
-
 Check for:
 1. Accuracy — are all claims supported by the research?
 2. Persuasiveness — is the value proposition compelling?
@@ -474,16 +537,23 @@ Check for:
 5. Pricing — is it realistic for a small business?
 
 Return the improved, fact-checked version of the full proposal.""",
-        model=CLASSIFIER_MODEL,
+        business=business_name,
+        research=research_summary,
+    )
+    result = await gateway.run(
+        prompt=prompt,
+        route="review",
         max_steps=3,
+        cache="fact_check",
     )
     return result.final_output
 
 
-async def classify_call_outcome(transcript: str, business_name: str) -> str:
+@traced(kind="tool")
+async def classify_call_outcome(transcript: str, business_name: str) -> ToolResult:
     """
     Classify the outcome of a phone call based on its transcript.
-    Returns JSON with outcome, confidence, key points, and recommended next action.
+    Returns outcome, confidence, key points, and recommended next action.
     """
     print(f"\\n=== CLASSIFICATION START ===")
     print(f"Business: {business_name}")
@@ -493,12 +563,9 @@ async def classify_call_outcome(transcript: str, business_name: str) -> str:
     print("============================\\n")
     
     try:
-        client = AsyncDedalus()
-        runner = DedalusRunner(client)
-        
         print("Starting classification with DedalusRunner...")
         
-        result = await runner.run(
+        result = await gateway.run(
             input=f"""Classify this phone call transcript with {business_name}.
 
 TRANSCRIPT:
@@ -522,16 +589,23 @@ Return a JSON object with these exact keys:
 }}
 
 Return ONLY the JSON, no other text.""",
-            model=CLASSIFIER_MODEL,
+            route="classify",
             max_steps=3,
         )
         
         print(f"Classification result type: {type(result.final_output)}")
         print(f"Classification result: {result.final_output}")
         
-        final_result = result.final_output if isinstance(result.final_output, str) else json.dumps(result.final_output)
+        output = result.final_output
+        if isinstance(output, str):
+            # Handle the LLM returning markdown-wrapped JSON
+            output = output.strip()
+            if output.startswith("```"):
+                output = re.sub(r"^```(?:json)?\s*", "", output)
+                output = re.sub(r"\s*```$", "", output)
+        final_result = ToolResult(as_result(output))
         print(f"Final classification: {final_result}")
-        
+
         return final_result
         
     except Exception as e:
@@ -548,14 +622,15 @@ Return ONLY the JSON, no other text.""",
             "next_action": "Manual review needed",
             "summary": f"Classification error: {str(e)}"
         }
-        return json.dumps(fallback_result)
+        return ToolResult(fallback_result)
 
 
 # ── API Endpoints ────────────────────────────────────────────
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "service": "sdr", "timestamp": datetime.utcnow().isoformat()}
+    """Readiness: 503 until the prewarm phase has finished."""
+    return prewarm.health_response()
 
 
 @app.post("/run_sdr")
@@ -566,20 +641,29 @@ async def run_sdr_endpoint(req: SDRRequest):
     Each step is called directly from Python, guaranteeing execution.
 
     Pipeline: Research → Proposal → Fact-check → Call → Classify → Deck → Email → Save
+
+    The run has SDR_DEADLINE_SECONDS (or less, if the caller sent a deadline).
+    A step whose full path doesn't fit in the time left takes a cheaper one —
+    knowledge-only research, no fact-check, a shorter or skipped call, no
+    deck — and is listed in `degraded_steps`. Email and save always run.
     """
+    deadline.start(SDR_DEADLINE_SECONDS)
     session_id = str(uuid.uuid4())
     callback_url = req.callback_url
+    set_attributes(session_id=session_id, business_name=req.business_name)
+    ledger.attribute(session_id=session_id, lead_place_id=req.place_id, city=req.city)
 
     # Accumulate step summaries for the final output
     step_results: dict[str, str] = {}
+    degraded: dict[str, str] = {}  # step → cheaper path taken for lack of time
     call_transcript = ""
     call_outcome = "other"
     research_summary = ""
     proposal_content = ""
-    email_result = ""
+    email_result: ToolResult | None = None
     email_subject = ""
 
-    await notify_ui(callback_url, AgentCallback(
+    notify_ui(callback_url, AgentCallback(
         agent_type=AgentType.SDR,
         event="sdr_started",
         business_name=req.business_name,
@@ -592,18 +676,27 @@ async def run_sdr_endpoint(req: SDRRequest):
         print("\n" + "=" * 60)
         print("📋 STEP 1/8 — RESEARCH")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="step_progress",
             business_name=req.business_name,
             message="Step 1/8 — Researching business...",
         ))
         try:
-            research_summary = await research_business(
-                req.business_name, req.city, req.address or ""
-            )
+            if fits("web_research"):
+                research_summary = await research_business(
+                    req.business_name, req.city, req.address or ""
+                )
+            elif fits("research"):
+                degraded["research"] = "knowledge-only research"
+                research_summary = await research_business(
+                    req.business_name, req.city, req.address or "", web_search=False
+                )
+            else:
+                degraded["research"] = "template research"
+                research_summary = research_template(req.business_name, req.city, req.address or "")
             print(f"✅ STEP 1/8 COMPLETED — Research ({len(research_summary)} chars)")
-            step_results["research"] = "completed"
+            step_results["research"] = completed_status("research", degraded)
         except Exception as e:
             print(f"❌ STEP 1/8 FAILED — {e}")
             research_summary = f"Research unavailable for {req.business_name} in {req.city}."
@@ -613,18 +706,22 @@ async def run_sdr_endpoint(req: SDRRequest):
         print("\n" + "=" * 60)
         print("📋 STEP 2/8 — DRAFT PROPOSAL")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="step_progress",
             business_name=req.business_name,
             message="Step 2/8 — Drafting website proposal...",
         ))
         try:
-            proposal_content = await draft_proposal(
-                req.business_name, research_summary
-            )
+            if fits("proposal"):
+                proposal_content = await draft_proposal(
+                    req.business_name, research_summary
+                )
+            else:
+                degraded["proposal"] = "template proposal"
+                proposal_content = f"Website proposal for {req.business_name} — details to follow."
             print(f"✅ STEP 2/8 COMPLETED — Proposal ({len(proposal_content)} chars)")
-            step_results["proposal"] = "completed"
+            step_results["proposal"] = completed_status("proposal", degraded)
         except Exception as e:
             print(f"❌ STEP 2/8 FAILED — {e}")
             proposal_content = f"Website proposal for {req.business_name} — details to follow."
@@ -634,45 +731,58 @@ async def run_sdr_endpoint(req: SDRRequest):
         print("\n" + "=" * 60)
         print("📋 STEP 3/8 — FACT-CHECK PROPOSAL")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
-            agent_type=AgentType.SDR,
-            event="step_progress",
-            business_name=req.business_name,
-            message="Step 3/8 — Fact-checking proposal...",
-        ))
-        try:
-            proposal_content = await fact_check_proposal(
-                proposal_content, req.business_name, research_summary
-            )
-            print(f"✅ STEP 3/8 COMPLETED — Fact-checked ({len(proposal_content)} chars)")
-            step_results["fact_check"] = "completed"
-        except Exception as e:
-            print(f"❌ STEP 3/8 FAILED — {e}")
-            step_results["fact_check"] = f"failed: {e}"
+        if not fits("fact_check"):
+            print(f"⏭️  STEP 3/8 SKIPPED — {budget_left():.0f}s left")
+            degraded["fact_check"] = "skipped"
+            step_results["fact_check"] = "skipped (deadline)"
+        else:
+            notify_ui(callback_url, AgentCallback(
+                agent_type=AgentType.SDR,
+                event="step_progress",
+                business_name=req.business_name,
+                message="Step 3/8 — Fact-checking proposal...",
+            ))
+            try:
+                proposal_content = await fact_check_proposal(
+                    proposal_content, req.business_name, research_summary
+                )
+                print(f"✅ STEP 3/8 COMPLETED — Fact-checked ({len(proposal_content)} chars)")
+                step_results["fact_check"] = "completed"
+            except Exception as e:
+                print(f"❌ STEP 3/8 FAILED — {e}")
+                step_results["fact_check"] = f"failed: {e}"
 
         # ── STEP 4/8: PHONE CALL ─────────────────────────────────
         print("\n" + "=" * 60)
         print("📋 STEP 4/8 — PHONE CALL")
         print("=" * 60)
+        # The call may use whatever is left once classify and deck are provided for
+        call_window = budget_left() - SDR_STEP_BUDGETS["classify"] - SDR_STEP_BUDGETS["deck"]
         if req.skip_call:
             print("⏭️  STEP 4/8 SKIPPED — skip_call=True")
             step_results["phone_call"] = "skipped"
+        elif call_window < SDR_STEP_BUDGETS["phone_call"]:
+            print(f"⏭️  STEP 4/8 SKIPPED — {budget_left():.0f}s left")
+            degraded["phone_call"] = "skipped"
+            step_results["phone_call"] = "skipped (deadline)"
         else:
-            await notify_ui(callback_url, AgentCallback(
+            notify_ui(callback_url, AgentCallback(
                 agent_type=AgentType.SDR,
                 event="step_progress",
                 business_name=req.business_name,
                 message=f"Step 4/8 — Calling {req.phone}...",
             ))
             try:
-                call_result_json = await make_phone_call(
+                call_result = await make_phone_call(
                     phone_number=req.phone,
                     business_name=req.business_name,
                     context=research_summary,
                     proposal_summary=proposal_content,
+                    max_wait=call_window,
                 )
-                print(f"📞 Raw call result: {call_result_json[:300]}...")
-                call_result = json.loads(call_result_json)
+                print(f"📞 Call result: success={call_result.get('success')} status={call_result.get('status', '')}")
+                if call_result.get("status") == "initiated":
+                    degraded["phone_call"] = f"stopped waiting after {call_window:.0f}s"
                 call_transcript = call_result.get("transcript", "")
                 print(f"✅ STEP 4/8 COMPLETED — Call done, transcript {len(call_transcript)} chars")
                 # Extract email from transcript immediately
@@ -680,7 +790,7 @@ async def run_sdr_endpoint(req: SDRRequest):
                     found_emails = extract_emails_from_transcript(call_transcript)
                     if found_emails:
                         print(f"📧 Extracted email from transcript: {found_emails[0]}")
-                step_results["phone_call"] = "completed"
+                step_results["phone_call"] = completed_status("phone_call", degraded)
             except Exception as e:
                 print(f"❌ STEP 4/8 FAILED — {e}")
                 import traceback
@@ -696,24 +806,22 @@ async def run_sdr_endpoint(req: SDRRequest):
             print(f"⏭️  STEP 5/8 SKIPPED — {reason}")
             call_outcome = "other"
             step_results["classify"] = f"skipped ({reason})"
+        elif not fits("classify"):
+            print(f"⏭️  STEP 5/8 SKIPPED — {budget_left():.0f}s left")
+            call_outcome = "other"
+            degraded["classify"] = "skipped"
+            step_results["classify"] = "skipped (deadline)"
         else:
-            await notify_ui(callback_url, AgentCallback(
+            notify_ui(callback_url, AgentCallback(
                 agent_type=AgentType.SDR,
                 event="step_progress",
                 business_name=req.business_name,
                 message="Step 5/8 — Classifying call outcome...",
             ))
             try:
-                classification_json = await classify_call_outcome(
+                classification = await classify_call_outcome(
                     call_transcript, req.business_name
                 )
-                print(f"📊 Classification raw: {classification_json[:300]}...")
-                # Parse the classification — handle LLM returning markdown-wrapped JSON
-                clean_json = classification_json.strip()
-                if clean_json.startswith("```"):
-                    clean_json = re.sub(r"^```(?:json)?\s*", "", clean_json)
-                    clean_json = re.sub(r"\s*```$", "", clean_json)
-                classification = json.loads(clean_json)
                 call_outcome = classification.get("outcome", "other")
                 print(f"✅ STEP 5/8 COMPLETED — Outcome: {call_outcome}")
                 step_results["classify"] = f"completed ({call_outcome})"
@@ -727,52 +835,59 @@ async def run_sdr_endpoint(req: SDRRequest):
         print("\n" + "=" * 60)
         print("📋 STEP 6/8 — GENERATE BUSINESS DECK")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
-            agent_type=AgentType.SDR,
-            event="step_progress",
-            business_name=req.business_name,
-            message="Step 6/8 — Generating business deck...",
-        ))
         deck_info = None
-        try:
-            deck_request = {
-                "session_id": session_id,
-                "business_name": req.business_name,
-                "research_summary": research_summary,
-                "call_transcript": call_transcript,
-                "call_outcome": call_outcome,
-                "contact_email": req.email or FALLBACK_EMAIL,
-                "meeting_date": datetime.now().isoformat(),
-                "template_style": req.deck_template,
-            }
-            async with httpx.AsyncClient(timeout=60.0) as http_client:
-                resp = await http_client.post(
-                    "http://localhost:8086/generate-deck",
-                    json=deck_request,
-                )
+        if not fits("deck"):
+            print(f"⏭️  STEP 6/8 SKIPPED — {budget_left():.0f}s left")
+            degraded["deck"] = "skipped"
+            step_results["deck"] = "skipped (deadline)"
+        else:
+            notify_ui(callback_url, AgentCallback(
+                agent_type=AgentType.SDR,
+                event="step_progress",
+                business_name=req.business_name,
+                message="Step 6/8 — Generating business deck...",
+            ))
+            try:
+                deck_request = {
+                    "session_id": session_id,
+                    "business_name": req.business_name,
+                    "research_summary": research_summary,
+                    "call_transcript": call_transcript,
+                    "call_outcome": call_outcome,
+                    "contact_email": req.email or FALLBACK_EMAIL,
+                    "meeting_date": datetime.now().isoformat(),
+                    "template_style": req.deck_template,
+                }
+                # The deck generator gets our deadline minus the email/save reserve
+                with deadline.scope(budget_left()):
+                    resp = await get_client("deck_generator").post(
+                        "/generate-deck",
+                        json=deck_request,
+                        timeout=60.0,
+                    )
                 resp.raise_for_status()
                 deck_result = resp.json()
 
-            if deck_result.get("success"):
-                deck_info = {
-                    "filename": deck_result.get("filename", f"{req.business_name}_Business_Solution.pptx"),
-                    "content": deck_result.get("deck_content", {}),
-                    "file_data": deck_result.get("deck_file_b64", ""),
-                }
-                print(f"✅ STEP 6/8 COMPLETED — Deck: {deck_info['filename']}")
-                step_results["deck"] = "completed"
-            else:
-                print(f"❌ STEP 6/8 — Deck generator returned failure: {deck_result.get('error')}")
-                step_results["deck"] = f"failed: {deck_result.get('error')}"
-        except Exception as e:
-            print(f"❌ STEP 6/8 FAILED — {e}")
-            step_results["deck"] = f"failed: {e}"
+                if deck_result.get("success"):
+                    deck_info = {
+                        "filename": deck_result.get("filename", f"{req.business_name}_Business_Solution.pptx"),
+                        "content": deck_result.get("deck_content", {}),
+                        "file_data": deck_result.get("deck_file_b64", ""),
+                    }
+                    print(f"✅ STEP 6/8 COMPLETED — Deck: {deck_info['filename']}")
+                    step_results["deck"] = "completed"
+                else:
+                    print(f"❌ STEP 6/8 — Deck generator returned failure: {deck_result.get('error')}")
+                    step_results["deck"] = f"failed: {deck_result.get('error')}"
+            except Exception as e:
+                print(f"❌ STEP 6/8 FAILED — {e}")
+                step_results["deck"] = f"failed: {e}"
 
         # ── STEP 7/8: SEND EMAIL ─────────────────────────────────
         print("\n" + "=" * 60)
         print("📋 STEP 7/8 — SEND EMAIL")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="step_progress",
             business_name=req.business_name,
@@ -896,27 +1011,21 @@ async def run_sdr_endpoint(req: SDRRequest):
             print(f"❌ STEP 7/8 FAILED — {e}")
             import traceback
             traceback.print_exc()
-            email_result = json.dumps({"success": False, "error": str(e)})
+            email_result = ToolResult({"success": False, "error": str(e)})
             step_results["email"] = f"failed: {e}"
 
         # ── STEP 8/8: SAVE SESSION ───────────────────────────────
         print("\n" + "=" * 60)
         print("📋 STEP 8/8 — SAVE SESSION")
         print("=" * 60)
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="step_progress",
             business_name=req.business_name,
             message="Step 8/8 — Saving session to database...",
         ))
         try:
-            email_sent = False
-            if email_result:
-                try:
-                    email_data = json.loads(email_result)
-                    email_sent = email_data.get("success", False)
-                except Exception:
-                    email_sent = "success" in email_result.lower()
+            email_sent = bool(email_result and email_result.get("success", False))
 
             session_data = {
                 "session_id": session_id,
@@ -928,15 +1037,16 @@ async def run_sdr_endpoint(req: SDRRequest):
                 "call_outcome": call_outcome,
                 "email_sent": email_sent,
                 "email_subject": email_subject,
+                "degraded_steps": json.dumps(degraded),
                 "created_at": datetime.utcnow().isoformat(),
             }
-            sdr_sessions[session_id] = SDRResult(**session_data)
+            sdr_sessions[session_id] = SDRResult(**{**session_data, "degraded_steps": degraded})
             if deck_info:
                 sd = sdr_sessions[session_id].dict()
                 sd["deck_info"] = deck_info
                 sdr_sessions[session_id] = SDRResult(**sd)
 
-            save_result = save_sdr_session(session_data)
+            save_result = await save_sdr_session(session_data)
             print(f"✅ STEP 8/8 COMPLETED — Session saved ({save_result})")
             step_results["save"] = "completed"
         except Exception as e:
@@ -952,6 +1062,8 @@ async def run_sdr_endpoint(req: SDRRequest):
         for step_name, status in step_results.items():
             icon = "✅" if "completed" in status else ("⏭️" if "skipped" in status else "❌")
             print(f"  {icon} {step_name}: {status}")
+        if degraded:
+            print(f"  ⏳ degraded for time: {', '.join(f'{k} ({v})' for k, v in degraded.items())}")
         print("=" * 60 + "\n")
 
         final_output = f"""SDR Pipeline completed for {req.business_name}
@@ -963,7 +1075,7 @@ Step Results:
         )
 
         # Notify UI: completed
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="sdr_completed",
             business_name=req.business_name,
@@ -973,24 +1085,26 @@ Step Results:
                 "session_id": session_id,
                 "summary": final_output[:1000] if final_output else "",
                 "step_results": step_results,
+                "degraded_steps": degraded,
             },
         ))
 
-        # Update lead status in BQ
+        # Update lead status in storage
         if req.place_id:
-            update_lead_status(req.place_id, "contacted")
+            await update_lead_status(req.place_id, "contacted")
 
         return {
             "status": "success",
             "session_id": session_id,
             "business_name": req.business_name,
             "step_results": step_results,
+            "degraded_steps": degraded,
             "summary": final_output,
         }
 
     except Exception as e:
         logger.error(f"SDR pipeline failed for {req.business_name}: {e}")
-        await notify_ui(callback_url, AgentCallback(
+        notify_ui(callback_url, AgentCallback(
             agent_type=AgentType.SDR,
             event="error",
             business_name=req.business_name,
@@ -999,30 +1113,54 @@ Step Results:
         return {"status": "error", "message": str(e)}
 
 
+@app.get("/api/llm_usage")
+async def get_llm_usage(limit: int = 100, session_id: str = "", lead_place_id: str = ""):
+    """Raw LLM ledger rows, newest first, optionally for one session or lead."""
+    try:
+        rows = await get_storage().list_llm_usage(limit, session_id=session_id, lead_place_id=lead_place_id)
+    except Exception as e:
+        logger.warning(f"LLM usage fetch failed: {e}")
+        return {"calls": [], "error": str(e)}
+    return {"calls": [_jsonable(row) for row in rows]}
+
+
+@app.get("/api/llm_usage/summary")
+async def get_llm_usage_summary(by: str = "call_site", limit: int = 50):
+    """LLM calls, tokens, cost and latency per lead, session, city, call_site, model, service or outcome."""
+    if by not in USAGE_GROUPS:
+        raise HTTPException(status_code=400, detail=f"'by' must be one of: {', '.join(USAGE_GROUPS)}")
+    try:
+        rows = await get_storage().summarize_llm_usage(by, limit)
+    except Exception as e:
+        logger.warning(f"LLM usage summary failed: {e}")
+        return {"by": by, "groups": [], "error": str(e)}
+    return {"by": by, "groups": [_jsonable(row) for row in rows]}
+
+
+def _jsonable(row: dict) -> dict:
+    return {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in row.items()}
+
+
 @app.get("/api/sessions")
 async def get_sessions():
-    """Return ALL SDR sessions — merged from BigQuery history + in-memory."""
+    """Return ALL SDR sessions — merged from stored history + in-memory."""
     sessions = {}
 
-    # 1) Load historical sessions from BigQuery first
+    # 1) Load historical sessions from storage first
     try:
-        from sdr.tools.bigquery_utils import _get_client
-        from common.config import GOOGLE_CLOUD_PROJECT, BIGQUERY_DATASET, BIGQUERY_SDR_SESSIONS_TABLE
-        client = _get_client()
-        if client:
-            table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_SDR_SESSIONS_TABLE}"
-            query = f"SELECT * FROM `{table_ref}` ORDER BY created_at DESC LIMIT 50"
-            rows = client.query(query).result()
-            for row in rows:
-                row_dict = dict(row)
-                sid = row_dict.get("session_id", "")
-                # Convert any non-serializable types
-                for k, v in row_dict.items():
-                    if hasattr(v, 'isoformat'):
-                        row_dict[k] = v.isoformat()
-                sessions[sid] = row_dict
+        for row_dict in await list_sdr_sessions(limit=50):
+            sid = row_dict.get("session_id", "")
+            # Convert any non-serializable types
+            for k, v in row_dict.items():
+                if hasattr(v, 'isoformat'):
+                    row_dict[k] = v.isoformat()
+            try:
+                row_dict["degraded_steps"] = json.loads(row_dict.get("degraded_steps") or "{}")
+            except ValueError:
+                row_dict["degraded_steps"] = {}
+            sessions[sid] = row_dict
     except Exception as e:
-        logger.warning(f"BigQuery session fetch failed: {e}")
+        logger.warning(f"Session history fetch failed: {e}")
 
     # 2) Overlay in-memory sessions (freshest state wins)
     for k, v in sdr_sessions.items():
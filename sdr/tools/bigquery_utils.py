@@ -1,131 +1,78 @@
 """
 sdr/tools/bigquery_utils.py
-BigQuery helpers for persisting SDR session data.
+Persistence helpers for SDR session data.
+Thin wrapper over common.storage (BigQuery or SQLite, per STORAGE_BACKEND).
 """
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-from common.config import (
-    GOOGLE_CLOUD_PROJECT,
-    BIGQUERY_DATASET,
-    BIGQUERY_SDR_SESSIONS_TABLE,
-    BIGQUERY_LEADS_TABLE,
-)
+from common.config import BIGQUERY_SDR_SESSIONS_TABLE
+from common import bigquery_utils as bq
+from common.bigquery_utils import SDR_SCHEMA  # noqa: F401  (re-exported)
+from common.storage import get_storage
+from common.models import ToolResult
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
-SDR_SCHEMA = [
-    {"name": "session_id", "type": "STRING", "mode": "REQUIRED"},
-    {"name": "lead_place_id", "type": "STRING"},
-    {"name": "business_name", "type": "STRING"},
-    {"name": "research_summary", "type": "STRING"},
-    {"name": "proposal_summary", "type": "STRING"},
-    {"name": "call_transcript", "type": "STRING"},
-    {"name": "call_outcome", "type": "STRING"},
-    {"name": "email_sent", "type": "BOOLEAN"},
-    {"name": "email_subject", "type": "STRING"},
-    {"name": "created_at", "type": "TIMESTAMP"},
-]
-
-
-def _get_client():
-    try:
-        from google.cloud import bigquery
-        return bigquery.Client(project=GOOGLE_CLOUD_PROJECT)
-    except Exception as e:
-        logger.error(f"BigQuery client init failed: {e}")
-        return None
-
 
 def ensure_table_exists() -> bool:
-    """Create dataset and sdr_sessions table if they don't exist."""
-    client = _get_client()
-    if not client:
-        return False
-    try:
-        from google.cloud import bigquery
-
-        dataset_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}"
-        dataset = bigquery.Dataset(dataset_ref)
-        dataset.location = "US"
-        client.create_dataset(dataset, exists_ok=True)
-
-        table_ref = f"{dataset_ref}.{BIGQUERY_SDR_SESSIONS_TABLE}"
-        schema = [
-            bigquery.SchemaField(f["name"], f["type"], mode=f.get("mode", "NULLABLE"))
-            for f in SDR_SCHEMA
-        ]
-        table = bigquery.Table(table_ref, schema=schema)
-        client.create_table(table, exists_ok=True)
-        logger.info(f"Table {table_ref} ready")
-        return True
-    except Exception as e:
-        logger.error(f"ensure_table_exists failed: {e}")
-        return False
+    """Create dataset and sdr_sessions table if they don't exist (once per process)."""
+    return bq.ensure_table(BIGQUERY_SDR_SESSIONS_TABLE)
 
 
-def save_sdr_session(session_data: dict[str, Any]) -> str:
+@traced(kind="tool")
+async def save_sdr_session(session_data: dict[str, Any]) -> ToolResult:
     """
-    Persist an SDR session record to BigQuery.
+    Persist an SDR session record (queued on BigQuery, immediate on SQLite).
 
     Args:
         session_data: Dict matching SDR_SCHEMA fields.
 
     Returns:
-        JSON string with result.
+        ToolResult with result. Queued insert errors are logged when the batch flushes.
     """
-    client = _get_client()
-    if not client:
-        return json.dumps({"success": False, "error": "BigQuery unavailable"})
+    storage = get_storage()
+    if not storage.available():
+        return ToolResult({"success": False, "error": f"{storage.name} unavailable"})
 
-    # Auto-create table if it doesn't exist
-    ensure_table_exists()
+    errors = await storage.save_sdr_session(session_data)
+    if errors:
+        return ToolResult({"success": False, "error": errors})
+    return ToolResult({
+        "success": True,
+        "queued": storage.name == "bigquery",
+        "session_id": session_data.get("session_id"),
+    })
 
-    table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_SDR_SESSIONS_TABLE}"
-    try:
-        errors = client.insert_rows_json(table_ref, [session_data])
-        if errors:
-            return json.dumps({"success": False, "errors": [str(e) for e in errors]})
-        return json.dumps({"success": True, "session_id": session_data.get("session_id")})
-    except Exception as e:
-        logger.error(f"SDR session save failed: {e}")
-        return json.dumps({"success": False, "error": str(e)})
+
+@traced(kind="tool")
+async def list_sdr_sessions(limit: int = 50) -> list[dict[str, Any]]:
+    """Return the most recent SDR sessions, newest first."""
+    return await get_storage().list_sdr_sessions(limit)
 
 
-def update_lead_status(place_id: str, new_status: str) -> str:
+@traced(kind="tool")
+async def update_lead_status(place_id: str, new_status: str) -> ToolResult:
     """
-    Update a lead's status in BigQuery.
+    Update a lead's status.
 
     Args:
         place_id: The lead's place_id.
         new_status: New status value.
 
     Returns:
-        JSON result.
-    """
-    client = _get_client()
-    if not client:
-        return json.dumps({"success": False, "error": "BigQuery unavailable"})
-
-    table_ref = f"{GOOGLE_CLOUD_PROJECT}.{BIGQUERY_DATASET}.{BIGQUERY_LEADS_TABLE}"
-    query = f"""
-        UPDATE `{table_ref}`
-        SET lead_status = @new_status
-        WHERE place_id = @place_id
+        ToolResult.
     """
+    storage = get_storage()
+    if not storage.available():
+        return ToolResult({"success": False, "error": f"{storage.name} unavailable"})
+
     try:
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter("new_status", "STRING", new_status),
-                bq.ScalarQueryParameter("place_id", "STRING", place_id),
-            ]
-        )
-        client.query(query, job_config=job_config).result()
-        return json.dumps({"success": True, "place_id": place_id, "new_status": new_status})
+        await storage.update_lead_status(place_id, new_status)
+        return ToolResult({"success": True, "place_id": place_id, "new_status": new_status})
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return ToolResult({"success": False, "error": str(e)})
@@ -7,7 +7,6 @@ Supports attachments and tracking metadata.
 from __future__ import annotations
 
 import base64
-import json
 import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -15,11 +14,14 @@ from email.mime.application import MIMEApplication
 from typing import Optional, Dict, Any
 
 from common.config import SALES_EMAIL
-from common.google_auth import get_gmail_service
+from common.workspace import WorkspaceUnavailable, workspace
+from common.models import ToolResult
+from common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced(kind="tool")
 async def send_email(
     to_email: str,
     subject: str,
@@ -27,7 +29,7 @@ async def send_email(
     business_name: str = "",
     attachment_data: Optional[Dict[str, Any]] = None,
     calendar_ics: Optional[str] = None,
-) -> str:
+) -> ToolResult:
     """
     Send an HTML email from the sales account.
 
@@ -40,10 +42,10 @@ async def send_email(
         calendar_ics: Optional iCalendar (.ics) string to attach as a calendar invite.
 
     Returns:
-        JSON string with send result.
+        ToolResult with send result.
     """
     if not SALES_EMAIL:
-        return json.dumps({
+        return ToolResult({
             "success": False,
             "error": "SALES_EMAIL not configured in .env",
         })
@@ -57,10 +59,6 @@ async def send_email(
         print(f"Attachment: {attachment_data.get('filename', 'unnamed')}")
     print("============================\n")
 
-    service = get_gmail_service()
-    if not service:
-        return json.dumps({"success": False, "error": "Gmail OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
-    
     print(f"Preparing to send email to {to_email} for {business_name} with subject '{subject}'")
     try:
         message = MIMEMultipart("mixed")
@@ -105,12 +103,10 @@ async def send_email(
                 print(f"⚠️ Calendar attachment failed: {e}")
 
         raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        result = service.users().messages().send(
-            userId="me", body={"raw": raw}
-        ).execute()
+        result = await workspace.gmail_send(raw)
 
         logger.info(f"Email sent to {to_email} for {business_name}: {result.get('id')}")
-        return json.dumps({
+        return ToolResult({
             "success": True,
             "message_id": result.get("id", ""),
             "to": to_email,
@@ -119,6 +115,8 @@ async def send_email(
             "calendar_invite_included": bool(calendar_ics),
         })
 
+    except WorkspaceUnavailable:
+        return ToolResult({"success": False, "error": "Gmail OAuth2 not authorized. Run: PYTHONPATH=. python -m common.google_auth"})
     except Exception as e:
         logger.error(f"Email send failed for {to_email}: {e}")
-        return json.dumps({"success": False, "error": str(e)})
+        return ToolResult({"success": False, "error": str(e)})
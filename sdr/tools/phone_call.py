@@ -8,12 +8,14 @@ Includes cooldown to prevent repeated calls to the same lead.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
 from datetime import datetime
 
 from common.config import ELEVENLABS_API_KEY, ELEVENLABS_AGENT_ID, ELEVENLABS_PHONE_NUMBER_ID
+from common.models import ToolResult
+from common.ratelimit import acquire
+from common.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,31 @@ CALL_TIMEOUT = 300  # 5 minutes
 POLL_INTERVAL = 5   # check every 5 seconds
 
 
+_el_client = None
+
+
+def get_elevenlabs_client():
+    """Process-wide ElevenLabs client (lazy; keeps its HTTP connection pool warm)."""
+    global _el_client
+    if _el_client is None:
+        from elevenlabs.client import ElevenLabs
+        _el_client = ElevenLabs(api_key=ELEVENLABS_API_KEY)
+    return _el_client
+
+
+def prewarm() -> None:
+    """Import the ElevenLabs SDK and build the client (prewarm step; blocking)."""
+    if not ELEVENLABS_API_KEY:
+        raise RuntimeError("ELEVENLABS_API_KEY not set")
+    import elevenlabs.types  # noqa: F401
+    get_elevenlabs_client()
+
+
+def _api_span(operation: str):
+    """Client span (and dependency latency metric) around one ElevenLabs API call."""
+    return span(f"elevenlabs.{operation}", kind="client", dependency="elevenlabs", operation=operation)
+
+
 def _validate_phone(phone: str) -> str | None:
     """Basic phone validation — strip non-digits, check length."""
     digits = "".join(c for c in phone if c.isdigit())
@@ -36,12 +63,14 @@ def _validate_phone(phone: str) -> str | None:
     return f"+{digits}"
 
 
+@traced(kind="tool")
 async def make_phone_call(
     phone_number: str,
     business_name: str,
     context: str = "",
     proposal_summary: str = "",
-) -> str:
+    max_wait: float = CALL_TIMEOUT,
+) -> ToolResult:
     """
     Place an AI-powered phone call to a business using ElevenLabs.
 
@@ -50,12 +79,14 @@ async def make_phone_call(
         business_name: Name of the business being called.
         context: Background research and context about the business.
         proposal_summary: Summary of the proposal to present.
+        max_wait: Seconds to wait for the call to finish (at most CALL_TIMEOUT);
+                  the caller's deadline may allow less.
 
     Returns:
-        JSON string with call result including transcript and outcome.
+        ToolResult with call result including transcript and outcome.
     """
     if not ELEVENLABS_API_KEY or not ELEVENLABS_AGENT_ID:
-        return json.dumps({
+        return ToolResult({
             "success": False,
             "error": "ElevenLabs API key or Agent ID not configured",
             "transcript": "",
@@ -64,7 +95,7 @@ async def make_phone_call(
     print(f"Initiating call to {business_name} at {phone_number}")
     validated = _validate_phone(phone_number)
     if not validated:
-        return json.dumps({
+        return ToolResult({
             "success": False,
             "error": f"Invalid phone number: {phone_number}",
             "transcript": "",
@@ -75,7 +106,7 @@ async def make_phone_call(
     last_call = _recent_calls.get(validated, 0)
     if time.time() - last_call < CALL_COOLDOWN_SECONDS:
         mins_ago = int((time.time() - last_call) / 60)
-        return json.dumps({
+        return ToolResult({
             "success": False,
             "error": f"Called {validated} {mins_ago} min ago. Cooldown active.",
             "transcript": "",
@@ -83,13 +114,12 @@ async def make_phone_call(
         })
     print("Placing call")
     try:
-        from elevenlabs.client import ElevenLabs
         from elevenlabs.types import OutboundCallRecipient
         from elevenlabs.types.conversation_initiation_client_data_request_input import (
             ConversationInitiationClientDataRequestInput,
         )
 
-        el_client = ElevenLabs(api_key=ELEVENLABS_API_KEY)
+        el_client = get_elevenlabs_client()
         print("ElevenLabs client initialized, business_name:", business_name, "phone:", validated, "context:", context)
         # Build recipient with dynamic variables for the agent
         recipient = OutboundCallRecipient(
@@ -104,12 +134,14 @@ async def make_phone_call(
         )
 
         # Create a batch call (works for single calls too)
-        batch = el_client.conversational_ai.batch_calls.create(
-            call_name=f"SDR Call — {business_name}",
-            agent_id=ELEVENLABS_AGENT_ID,
-            agent_phone_number_id=ELEVENLABS_PHONE_NUMBER_ID,
-            recipients=[recipient],
-        )
+        await acquire("elevenlabs_calls")
+        with _api_span("batch_calls.create"):
+            batch = el_client.conversational_ai.batch_calls.create(
+                call_name=f"SDR Call — {business_name}",
+                agent_id=ELEVENLABS_AGENT_ID,
+                agent_phone_number_id=ELEVENLABS_PHONE_NUMBER_ID,
+                recipients=[recipient],
+            )
 
         batch_id = batch.id
         logger.info(f"Batch call created: {batch_id} for {business_name}")
@@ -122,12 +154,14 @@ async def make_phone_call(
         call_status = "initiated"
         elapsed = 0
 
-        while elapsed < CALL_TIMEOUT:
+        max_wait = min(max_wait, CALL_TIMEOUT)
+        while elapsed < max_wait:
             await asyncio.sleep(POLL_INTERVAL)
             elapsed += POLL_INTERVAL
 
             try:
-                details = el_client.conversational_ai.batch_calls.get(batch_id=batch_id)
+                with _api_span("batch_calls.get"):
+                    details = el_client.conversational_ai.batch_calls.get(batch_id=batch_id)
                 # Check if all calls are finished
                 if details.total_calls_finished >= details.total_calls_dispatched and details.total_calls_dispatched > 0:
                     call_status = "completed"
@@ -151,9 +185,10 @@ async def make_phone_call(
         # Fetch transcript if we have a conversation ID
         if conversation_id:
             try:
-                convo = el_client.conversational_ai.conversations.get(
-                    conversation_id=conversation_id
-                )
+                with _api_span("conversations.get"):
+                    convo = el_client.conversational_ai.conversations.get(
+                        conversation_id=conversation_id
+                    )
                 # Build transcript from the conversation
                 if hasattr(convo, "transcript") and convo.transcript:
                     lines = []
@@ -170,19 +205,7 @@ async def make_phone_call(
             except Exception as t_err:
                 logger.warning(f"Failed to fetch transcript: {t_err}")
 
-        
-        print(json.dumps({
-            "success": True,
-            "phone_number": validated,
-            "business_name": business_name,
-            "transcript": transcript or "(call completed, transcript unavailable)",
-            "conversation_id": conversation_id,
-            "batch_id": batch_id,
-            "status": call_status,
-            "called_at": datetime.utcnow().isoformat(),
-        }))
-
-        return json.dumps({
+        result = ToolResult({
             "success": True,
             "phone_number": validated,
             "business_name": business_name,
@@ -192,10 +215,12 @@ async def make_phone_call(
             "status": call_status,
             "called_at": datetime.utcnow().isoformat(),
         })
+        print(result)
+        return result
 
     except Exception as e:
         logger.error(f"Phone call failed for {business_name}: {e}")
-        return json.dumps({
+        return ToolResult({
             "success": False,
             "error": str(e),
             "transcript": "",
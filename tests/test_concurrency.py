@@ -0,0 +1,120 @@
+"""AIMD adaptive concurrency limits (common.concurrency)."""
+
+import asyncio
+
+import pytest
+
+from common import concurrency
+from common.concurrency import AdaptiveLimiter, get_limiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _saturated_sample(limiter: AdaptiveLimiter, latency: float, ok: bool = True) -> None:
+    limiter.in_flight = int(limiter.limit)
+    limiter.release(latency, ok=ok)
+
+
+def test_additive_increase_only_when_saturated():
+    limiter = AdaptiveLimiter("t", initial=4, min_limit=1, max_limit=32)
+    limiter.in_flight = 1
+    limiter.release(1.0)
+    assert limiter.limit == 4  # not saturated: no evidence more slots are needed
+
+    for _ in range(4):
+        _saturated_sample(limiter, 1.0)
+    assert 4.9 < limiter.limit < 5.0  # ~1 per window of `limit` calls
+
+
+def test_increase_stops_at_max():
+    limiter = AdaptiveLimiter("t", initial=4, min_limit=1, max_limit=5)
+    for _ in range(100):
+        _saturated_sample(limiter, 1.0)
+    assert limiter.limit == 5
+
+
+def test_error_decreases_multiplicatively_once_per_baseline(clock):
+    limiter = AdaptiveLimiter("t", initial=10, min_limit=1, max_limit=32, backoff=0.5)
+    _saturated_sample(limiter, 2.0)  # baseline 2 s
+    limit = limiter.limit
+
+    _saturated_sample(limiter, 2.0, ok=False)
+    assert limiter.limit == limit * 0.5
+    _saturated_sample(limiter, 2.0, ok=False)  # same overload episode
+    assert limiter.limit == limit * 0.5
+
+    clock[0] += 2.5
+    _saturated_sample(limiter, 2.0, ok=False)
+    assert limiter.limit == limit * 0.25
+
+
+def test_decrease_stops_at_min(clock):
+    limiter = AdaptiveLimiter("t", initial=2, min_limit=1, max_limit=32, backoff=0.5)
+    for _ in range(10):
+        clock[0] += 100
+        _saturated_sample(limiter, 1.0, ok=False)
+    assert limiter.limit == 1
+
+
+def test_slow_successes_move_the_baseline_up(clock):
+    # A fast first sample must not pin the limiter to its minimum forever
+    limiter = AdaptiveLimiter("t", initial=16, min_limit=1, max_limit=16, tolerance=2.0, backoff=0.9)
+    _saturated_sample(limiter, 2.0)
+    lowest = limiter.limit
+    for _ in range(300):
+        clock[0] += 30
+        _saturated_sample(limiter, 30.0)
+        lowest = min(lowest, limiter.limit)
+    assert lowest < 16  # backed off while the baseline caught up ...
+    assert limiter.baseline > 15  # ... which is now within tolerance of the real latency
+    assert limiter.limit == 16  # and the limit has grown back
+
+
+def test_cancelled_call_leaves_limit_and_baseline_alone():
+    limiter = AdaptiveLimiter("t", initial=4)
+    limiter.in_flight = 4
+    limiter.release(None)
+    assert limiter.limit == 4
+    assert limiter.baseline is None
+    assert limiter.in_flight == 3
+
+
+def test_waiters_are_served_in_order_and_cancellation_returns_the_slot():
+    async def main():
+        limiter = AdaptiveLimiter("t", initial=1, min_limit=1, max_limit=1)
+        order = []
+
+        async def call(name):
+            async with concurrency._Slot(limiter):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(call("a"))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(call("cancelled"))
+        rest = [asyncio.create_task(call(n)) for n in ("b", "c")]
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(first, *rest)
+        assert order == ["a", "b", "c"]
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+    asyncio.run(main())
+
+
+def test_keys_split_a_dependency_into_independent_limiters(monkeypatch):
+    monkeypatch.setattr(concurrency, "_limiters", {})
+    classify = get_limiter("dedalus", key="openai/gpt-4.1/classify_reply")._limiter
+    research = get_limiter("dedalus", key="openai/gpt-4.1/research_business")._limiter
+    assert classify is not research
+    assert get_limiter("dedalus", key="openai/gpt-4.1/classify_reply")._limiter is classify
+    assert set(concurrency.snapshot()) == {
+        "dedalus:openai/gpt-4.1/classify_reply",
+        "dedalus:openai/gpt-4.1/research_business",
+    }
@@ -0,0 +1,46 @@
+"""Unix-socket routing of the pooled clients (common.http_clients.LocalSocketTransport)."""
+
+import asyncio
+import os
+import socket
+
+import httpx
+
+from common.http_clients import LocalSocketTransport
+
+
+async def _answer(name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """A one-shot HTTP/1.1 server that replies with its own name."""
+    await reader.readuntil(b"\r\n\r\n")
+    body = name.encode()
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+    await writer.drain()
+    writer.close()
+
+
+def test_socket_is_picked_up_after_the_client_is_built(tmp_path):
+    path = str(tmp_path / "deck_generator.sock")
+
+    async def main():
+        tcp = await asyncio.start_server(lambda r, w: _answer("tcp", r, w), "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        limits = httpx.Limits(max_connections=4, max_keepalive_connections=0)
+        async with httpx.AsyncClient(transport=LocalSocketTransport(path, limits, http2=False)) as client:
+            url = f"http://127.0.0.1:{port}/"
+
+            # Target not up on its socket yet (started after us)
+            assert (await client.get(url)).text == "tcp"
+
+            uds = await asyncio.start_unix_server(lambda r, w: _answer("unix", r, w), path)
+            assert (await client.get(url)).text == "unix"
+
+            # Stopped without removing its socket file: fall back to TCP
+            uds.close()
+            await uds.wait_closed()
+            if not os.path.exists(path):
+                socket.socket(socket.AF_UNIX).bind(path)
+            assert (await client.get(url)).text == "tcp"
+        tcp.close()
+        await tcp.wait_closed()
+
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""Idempotency-Key handling on trigger endpoints (common.idempotency)."""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from common import idempotency
+
+
+def _app():
+    app = FastAPI()
+    idempotency.instrument_app(app, "/run")
+    app.state.runs = 0
+    app.state.release = asyncio.Event()
+    app.state.outcome = {"status": "success"}
+
+    @app.post("/run")
+    async def run(body: dict):
+        app.state.runs += 1
+        await app.state.release.wait()
+        if app.state.outcome == "crash":
+            raise RuntimeError("boom")
+        return {**app.state.outcome, "run": app.state.runs}
+
+    @app.post("/other")
+    async def other(body: dict):
+        app.state.runs += 1
+        return {"run": app.state.runs}
+
+    return app
+
+
+def _client(app):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def _post(client, key="k1", body=None, path="/run"):
+    headers = {"Idempotency-Key": key} if key else {}
+    return client.post(path, json=body or {"place_id": "p1"}, headers=headers)
+
+
+def test_finished_run_is_replayed():
+    async def main():
+        app = _app()
+        app.state.release.set()
+        async with _client(app) as client:
+            first = await _post(client)
+            again = await _post(client)
+        assert first.json() == again.json() == {"status": "success", "run": 1}
+        assert "idempotent-replayed" not in first.headers
+        assert again.headers["idempotent-replayed"] == "true"
+        assert app.state.runs == 1
+
+    asyncio.run(main())
+
+
+def test_retry_attaches_to_the_run_in_flight():
+    async def main():
+        app = _app()
+        async with _client(app) as client:
+            first = asyncio.create_task(_post(client))
+            await asyncio.sleep(0.01)
+            retry = asyncio.create_task(_post(client))
+            await asyncio.sleep(0.01)
+            app.state.release.set()
+            responses = await asyncio.gather(first, retry)
+        assert [r.json()["run"] for r in responses] == [1, 1]
+        assert responses[1].headers["idempotent-replayed"] == "true"
+
+    asyncio.run(main())
+
+
+def test_run_outlives_the_caller_that_started_it():
+    async def main():
+        app = _app()
+        async with _client(app) as client:
+            first = asyncio.create_task(_post(client))
+            await asyncio.sleep(0.01)
+            first.cancel()  # the caller gave up
+            await asyncio.sleep(0.01)
+            app.state.release.set()
+            retry = await _post(client)
+        assert retry.json()["run"] == 1
+        assert app.state.runs == 1
+
+    asyncio.run(main())
+
+
+def test_same_key_with_a_different_body_is_rejected():
+    async def main():
+        app = _app()
+        app.state.release.set()
+        async with _client(app) as client:
+            await _post(client)
+            conflict = await _post(client, body={"place_id": "p2"})
+        assert conflict.status_code == 422
+        assert app.state.runs == 1
+
+    asyncio.run(main())
+
+
+def test_requests_without_a_key_or_on_other_paths_always_run():
+    async def main():
+        app = _app()
+        app.state.release.set()
+        async with _client(app) as client:
+            await _post(client, key="")
+            await _post(client, key="")
+            await _post(client, path="/other")
+            await _post(client, path="/other")
+        assert app.state.runs == 4
+
+    asyncio.run(main())
+
+
+def test_failed_runs_are_not_replayed():
+    async def main():
+        app = _app()
+        app.state.release.set()
+        async with _client(app) as client:
+            app.state.outcome = "crash"
+            assert (await _post(client)).status_code == 500
+
+            app.state.outcome = {"status": "error", "message": "Places API down"}
+            reported = await _post(client)
+            assert reported.status_code == 200
+            assert "idempotent-replayed" not in reported.headers
+
+            app.state.outcome = {"status": "success"}
+            ok = await _post(client)
+            assert ok.json() == {"status": "success", "run": 3}
+            assert "idempotent-replayed" not in ok.headers
+
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""LLM response cache: keys, TTL and LRU eviction (common.llm_cache)."""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from common import llm_cache as llm_cache_module
+from common.llm_cache import LLMCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def _stored(cache: LLMCache) -> int:
+    return cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+
+def test_key_changes_with_the_response_format_schema():
+    class Analysis(BaseModel):
+        intent: str
+
+    before = cache_key({"model": "m", "input": "x", "response_format": Analysis})
+
+    class Analysis(BaseModel):  # noqa: F811 — same name, new field
+        intent: str
+        urgency: int
+
+    after = cache_key({"model": "m", "input": "x", "response_format": Analysis})
+    assert before != after
+
+
+def test_key_names_functions_by_qualname():
+    def lookup(x):
+        return x
+
+    a = cache_key({"model": "m", "tools": [lookup]})
+    assert a == cache_key({"model": "m", "tools": [lookup]})
+    assert a != cache_key({"model": "m", "tools": [print]})
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LLMCache(":memory:")
+    cache._put("k", "draft_proposal", {"text": "hi"}, ttl=60)
+    assert cache._get("k") == (True, {"text": "hi"})
+
+    clock[0] += 61
+    assert cache._get("k") == (False, None)
+    assert cache.bytes == 0 == _stored(cache)
+
+
+def test_bytes_are_tracked_across_puts_and_replacements(clock):
+    cache = LLMCache(":memory:")
+    cache._put("a", "s", "x" * 100, ttl=60)
+    cache._put("b", "s", "y" * 50, ttl=60)
+    cache._put("a", "s", "z" * 10, ttl=60)  # replaces a
+    assert cache.bytes == _stored(cache)
+
+
+def test_lru_eviction_keeps_recently_used_entries(clock):
+    cache = LLMCache(":memory:", max_bytes=1000)
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        cache._put(key, "s", "x" * 250, ttl=3600)
+
+    clock[0] += 1
+    assert cache._get("a")[0]  # a is now the most recently used
+
+    clock[0] += 1
+    cache._put("d", "s", "x" * 250, ttl=3600)  # over the bound: evict down to 90%
+    assert cache._get("b") == (False, None)
+    assert cache._get("a")[0] and cache._get("c")[0] and cache._get("d")[0]
+    assert cache.bytes == _stored(cache) <= 900
+
+
+def test_eviction_drops_expired_entries_first(clock):
+    cache = LLMCache(":memory:", max_bytes=1000)
+    cache._put("old", "s", "x" * 250, ttl=10)
+    clock[0] += 1
+    cache._put("b", "s", "x" * 250, ttl=3600)
+    cache._put("c", "s", "x" * 250, ttl=3600)
+
+    clock[0] += 20  # "old" expired but was never read
+    cache._put("d", "s", "x" * 250, ttl=3600)
+    assert [cache._get(k)[0] for k in ("old", "b", "c", "d")] == [False, True, True, True]
+
+
+def test_zero_ttl_site_is_not_stored(monkeypatch):
+    monkeypatch.setitem(llm_cache_module.LLM_CACHE_TTLS, "classify_reply", 0)
+    cache = LLMCache(":memory:")
+    asyncio.run(cache.put("classify_reply", "k", "out"))
+    assert asyncio.run(cache.get("classify_reply", "k")) == (False, None)
@@ -0,0 +1,90 @@
+"""Token-bucket reservation (common.ratelimit)."""
+
+import asyncio
+
+import pytest
+
+from common import ratelimit
+from common.ratelimit import FileBucket, MemoryBucket, RateLimiter, _reserve
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "time", clock)
+    return clock
+
+
+def test_reserve_refills_up_to_burst():
+    # 10 s idle at 2/s would be 20 tokens, capped at the burst of 5
+    tokens, wait = _reserve(0.0, 0.0, 10.0, rate=2.0, burst=5.0, n=1)
+    assert tokens == 4.0
+    assert wait == 0.0
+
+
+def test_reserve_goes_into_debt_and_reports_wait():
+    tokens, wait = _reserve(0.0, 10.0, 10.0, rate=2.0, burst=5.0, n=1)
+    assert tokens == -1.0
+    assert wait == 0.5
+
+
+def test_memory_bucket_serves_burst_then_queues_in_arrival_order(clock):
+    bucket = MemoryBucket(rate=2.0, burst=3.0)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Empty: each later caller reserves the next token, 1/rate apart
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+    clock.now += 1.5  # the debt is paid off exactly
+    assert bucket.reserve() == 0.5
+
+
+def test_file_bucket_is_shared_between_instances(tmp_path, clock):
+    path = tmp_path / "places.bucket"
+    a = FileBucket(path, rate=1.0, burst=2.0)
+    b = FileBucket(path, rate=1.0, burst=2.0)  # another process on the host
+    try:
+        assert a.reserve() == 0.0
+        assert b.reserve() == 0.0
+        assert a.reserve() == 1.0
+        assert b.reserve() == 2.0
+    finally:
+        a.close()
+        b.close()
+
+
+def test_acquire_sleeps_for_the_reserved_wait(monkeypatch, clock):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter({"places": (4.0, 1.0)}, directory="")
+
+    async def main():
+        return [await limiter.acquire("places") for _ in range(3)]
+
+    assert asyncio.run(main()) == [0.0, 0.25, 0.5]
+    assert slept == [0.25, 0.5]
+
+
+def test_unknown_or_disabled_api_is_not_limited():
+    limiter = RateLimiter({"gmail_send": (0.0, 5.0)}, directory="")
+    assert asyncio.run(limiter.acquire("gmail_send")) == 0.0
+    assert asyncio.run(limiter.acquire("nope")) == 0.0
+
+
+def test_unusable_shared_bucket_falls_back_to_memory(tmp_path, clock):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    limiter = RateLimiter({"places": (1.0, 1.0)}, directory=str(blocker))  # a file, not a directory
+    assert asyncio.run(limiter.acquire("places")) == 0.0
+    assert isinstance(limiter._buckets["places"], MemoryBucket)
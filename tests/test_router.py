@@ -0,0 +1,105 @@
+"""Model routing: candidate ordering (common.router) and gateway failover (common.llm)."""
+
+import asyncio
+
+import pytest
+
+from common import llm as llm_module
+from common import router as router_module
+from common.router import ModelRouter
+
+ROUTES = {
+    "draft": {"models": "big, mid, small", "latency_budget_s": 10.0, "failover_timeout_s": 5.0, "max_cost": None},
+    "classify": {"models": "big,mid,small", "max_cost": 2.0, "requires": {"structured_output"}},
+}
+PROFILES = {
+    "big": {"cost": 5.0, "capabilities": {"structured_output"}},
+    "mid": {"cost": 1.0, "capabilities": {"structured_output"}},
+    "small": {"cost": 0.1, "capabilities": set()},
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(router_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _router() -> ModelRouter:
+    return ModelRouter(routes=ROUTES, profiles=PROFILES)
+
+
+def test_candidates_follow_preference_order():
+    assert _router().candidates("draft") == ["big", "mid", "small"]
+
+
+def test_cost_ceiling_and_capabilities_filter_candidates():
+    assert _router().candidates("classify") == ["mid"]
+
+
+def test_unknown_route_is_an_error():
+    with pytest.raises(ValueError):
+        _router().candidates("nope")
+
+
+def test_failing_model_moves_behind_healthy_ones(clock):
+    router = _router()
+    for _ in range(3):
+        router.record("big", 1.0, ok=False)
+    assert router.candidates("draft") == ["mid", "small", "big"]
+
+
+def test_slow_model_is_degraded_past_the_latency_budget(clock):
+    router = _router()
+    for _ in range(3):
+        router.record("mid", 20.0, ok=True)
+    router.record("big", 1.0, ok=True)  # too few samples to judge
+    assert router.candidates("draft") == ["big", "small", "mid"]
+
+
+def test_old_samples_age_out(clock):
+    router = _router()
+    for _ in range(3):
+        router.record("big", 1.0, ok=False)
+    clock[0] += router.stats("big").max_age + 1
+    assert router.candidates("draft") == ["big", "mid", "small"]
+
+
+def _gateway(monkeypatch, outcomes):
+    """A gateway whose tool-less runs return or raise `outcomes[model]`, logging each attempt."""
+    monkeypatch.setattr(llm_module, "router", _router())
+    gateway = llm_module.LLMGateway(timeout=30.0, retries=2)
+    attempts = []
+
+    async def complete(key, cache, kwargs, timeout, retries):
+        attempts.append((kwargs["model"], timeout, retries))
+        outcome = outcomes[kwargs["model"]]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(gateway, "_complete", complete)
+    return gateway, attempts
+
+
+def test_transient_failure_fails_over_to_the_next_candidate(monkeypatch):
+    gateway, attempts = _gateway(monkeypatch, {"big": asyncio.TimeoutError(), "mid": "from mid", "small": "x"})
+    assert asyncio.run(gateway.run(route="draft", input="hi")) == "from mid"
+    # Non-last candidates get one attempt bounded by the failover timeout
+    assert attempts == [("big", 5.0, 0), ("mid", 5.0, 0)]
+
+
+def test_last_candidate_gets_normal_timeout_and_retries(monkeypatch):
+    timeout = asyncio.TimeoutError()
+    gateway, attempts = _gateway(monkeypatch, {"big": timeout, "mid": timeout, "small": timeout})
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(gateway.run(route="draft", input="hi"))
+    assert attempts[-1] == ("small", 30.0, 2)
+
+
+def test_non_transient_error_does_not_fail_over(monkeypatch):
+    gateway, attempts = _gateway(monkeypatch, {"big": ValueError("bad request"), "mid": "x", "small": "x"})
+    with pytest.raises(ValueError):
+        asyncio.run(gateway.run(route="draft", input="hi"))
+    assert [model for model, _, _ in attempts] == ["big"]
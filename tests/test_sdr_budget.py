@@ -0,0 +1,48 @@
+"""SDR pipeline time budget: which steps fit and how degraded steps are reported (sdr.agent)."""
+
+import asyncio
+import json
+
+from common import deadline
+from sdr import agent
+from sdr.agent import budget_left, completed_status, fits
+
+
+def test_without_a_deadline_every_step_fits():
+    assert budget_left() == float("inf")
+    assert all(fits(step) for step in agent.SDR_STEP_BUDGETS)
+
+
+def test_budget_keeps_the_reserve_for_email_and_save():
+    with deadline.scope(agent.SDR_RESERVE_SECONDS + 100):
+        assert 99 < budget_left() <= 100
+
+
+def test_steps_that_no_longer_fit_take_the_cheaper_path(monkeypatch):
+    monkeypatch.setitem(agent.SDR_STEP_BUDGETS, "web_research", 150.0)
+    monkeypatch.setitem(agent.SDR_STEP_BUDGETS, "research", 30.0)
+    with deadline.scope(agent.SDR_RESERVE_SECONDS + 100):
+        assert not fits("web_research")
+        assert fits("research")
+    with deadline.scope(agent.SDR_RESERVE_SECONDS + 10):
+        assert not fits("research")
+
+
+def test_completed_status_names_the_degradation():
+    degraded = {"research": "knowledge-only (no web search)"}
+    assert completed_status("research", degraded) == "completed (degraded: knowledge-only (no web search))"
+    assert completed_status("proposal", degraded) == "completed"
+
+
+def test_stored_sessions_report_degraded_steps(monkeypatch):
+    async def list_sdr_sessions(limit=50):
+        return [
+            {"session_id": "s1", "degraded_steps": json.dumps({"deck": "skipped"})},
+            {"session_id": "s2", "degraded_steps": None},  # saved before the column existed
+        ]
+
+    monkeypatch.setattr(agent, "list_sdr_sessions", list_sdr_sessions)
+    monkeypatch.setattr(agent, "sdr_sessions", {})
+    sessions = asyncio.run(agent.get_sessions())["sessions"]
+    assert sessions["s1"]["degraded_steps"] == {"deck": "skipped"}
+    assert sessions["s2"]["degraded_steps"] == {}
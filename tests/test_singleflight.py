@@ -0,0 +1,137 @@
+"""Coalescing identical in-flight calls (common.singleflight) and the gateway's use of it."""
+
+import asyncio
+
+import pytest
+
+from common import deadline
+from common import llm as llm_module
+from common.singleflight import Group
+
+
+def test_concurrent_callers_share_one_call():
+    async def main():
+        group = Group("t")
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(group.do("k", fetch) for _ in range(3)))
+        assert results == ["result"] * 3
+        assert len(calls) == 1
+        assert "k" not in group  # forgotten once finished: not a cache
+
+        assert await group.do("k", fetch) == "result"
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_exception_is_shared():
+    async def main():
+        group = Group("t")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(group.do("k", fail), group.do("k", fail), return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+
+    asyncio.run(main())
+
+
+def test_cancelling_one_waiter_leaves_the_call_running_for_the_others():
+    async def main():
+        group = Group("t")
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "result"
+
+        first = asyncio.create_task(group.do("k", fetch))
+        second = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "result"
+        assert first.cancelled()
+
+    asyncio.run(main())
+
+
+def test_call_is_cancelled_when_every_waiter_has_gone():
+    async def main():
+        group = Group("t")
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(group.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert "k" not in group
+
+    asyncio.run(main())
+
+
+def test_call_outlives_the_first_callers_deadline():
+    async def main():
+        group = Group("t")
+        seen = []
+
+        async def fetch():
+            seen.append(deadline.remaining())
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def caller(budget):
+            with deadline.scope(budget):
+                return await group.do("k", fetch)
+
+        short = asyncio.create_task(caller(0.01))
+        await asyncio.sleep(0)
+        long = asyncio.create_task(caller(5.0))
+
+        with pytest.raises(deadline.DeadlineExceeded):
+            await short  # stops waiting at its own deadline ...
+        assert await long == "result"  # ... but the call goes on for the other caller
+        assert seen == [float("inf")]  # and never ran under the first caller's deadline
+
+    asyncio.run(main())
+
+
+def test_gateway_records_a_ledger_row_for_each_joined_caller(monkeypatch):
+    rows = []
+
+    async def record(model, kwargs, seconds, status, usage=None, output=None, cached=False, call_site=""):
+        rows.append((model, status, cached))
+
+    monkeypatch.setattr(llm_module.ledger, "record", record)
+    gateway = llm_module.LLMGateway()
+    calls = []
+
+    async def complete(key, cache, kwargs, timeout, retries):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    monkeypatch.setattr(gateway, "_complete", complete)
+
+    async def main():
+        return await asyncio.gather(*(gateway.run(model="m", input="same prompt") for _ in range(3)))
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert len(calls) == 1
+    # The shared call's own rows come from its attempts (stubbed out here)
+    assert rows == [("m", "ok", True), ("m", "ok", True)]
@@ -0,0 +1,103 @@
+"""Round-trips through the SQLite storage backend."""
+
+import asyncio
+import sqlite3
+
+from common.config import BIGQUERY_SDR_SESSIONS_TABLE
+from common.storage import SQLiteStorage
+
+
+def _lead(**overrides):
+    lead = {
+        "place_id": "place-1",
+        "business_name": "Joe's Pizza",
+        "address": "1 Main St",
+        "city": "Austin",
+        "phone": "+1 512 555 0100",
+        "email": "",
+        "rating": 4.2,
+        "total_ratings": 87,
+        "business_type": "restaurant",
+        "has_website": False,
+        "lead_status": "new",
+        "discovered_at": "2026-01-01T00:00:00",
+        "notes": "",
+    }
+    lead.update(overrides)
+    return lead
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_save_and_find_lead_by_email():
+    storage = SQLiteStorage(":memory:")
+    assert _run(storage.save_leads([_lead(email="joe@pizza.com")])) == []
+
+    row = _run(storage.find_lead_by_email("joe@pizza.com"))
+    assert row["place_id"] == "place-1"
+    assert row["business_name"] == "Joe's Pizza"
+    assert row["lead_status"] == "new"
+    assert _run(storage.find_lead_by_email("nobody@example.com")) is None
+
+
+def test_rediscovery_keeps_pipeline_state():
+    storage = SQLiteStorage(":memory:")
+    _run(storage.save_leads([_lead()]))
+    _run(storage.update_lead_status("place-1", "contacted"))
+    storage._execute('UPDATE "leads" SET email = ?, notes = ? WHERE place_id = ?', ("a@b.c", "called", "place-1"))
+
+    # Found again by a later search: fresh discovery data, default pipeline fields
+    _run(storage.save_leads([_lead(rating=4.6, total_ratings=120, discovered_at="2026-02-01T00:00:00")]))
+
+    row = _run(storage.find_lead_by_email("a@b.c"))
+    assert row is not None
+    assert row["lead_status"] == "contacted"
+    full = storage._execute('SELECT * FROM "leads" WHERE place_id = ?', ("place-1",))[0]
+    assert full["notes"] == "called"
+    assert full["discovered_at"] == "2026-01-01T00:00:00"
+    assert full["rating"] == 4.6
+    assert full["total_ratings"] == 120
+
+
+def test_rediscovery_fills_empty_email():
+    storage = SQLiteStorage(":memory:")
+    _run(storage.save_leads([_lead()]))
+    _run(storage.save_leads([_lead(email="joe@pizza.com")]))
+
+    assert _run(storage.find_lead_by_email("joe@pizza.com"))["place_id"] == "place-1"
+
+
+def test_sdr_session_upsert_replaces_row():
+    storage = SQLiteStorage(":memory:")
+    session = {"session_id": "s1", "lead_place_id": "place-1", "call_outcome": "", "email_sent": False}
+    _run(storage.save_sdr_session(session))
+    _run(storage.save_sdr_session({**session, "call_outcome": "interested", "email_sent": True}))
+
+    rows = _run(storage.list_sdr_sessions())
+    assert len(rows) == 1
+    assert rows[0]["call_outcome"] == "interested"
+    assert rows[0]["email_sent"] is True
+
+
+def test_sdr_session_keeps_degraded_steps():
+    storage = SQLiteStorage(":memory:")
+    _run(storage.save_sdr_session({"session_id": "s1", "degraded_steps": '{"deck": "skipped"}'}))
+    assert _run(storage.list_sdr_sessions())[0]["degraded_steps"] == '{"deck": "skipped"}'
+
+
+def test_tables_from_an_older_schema_gain_new_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(f'CREATE TABLE "{BIGQUERY_SDR_SESSIONS_TABLE}" ("session_id" TEXT PRIMARY KEY, "call_outcome" TEXT)')
+    conn.execute(f'INSERT INTO "{BIGQUERY_SDR_SESSIONS_TABLE}" VALUES (\'old\', \'interested\')')
+    conn.commit()
+    conn.close()
+
+    storage = SQLiteStorage(path)
+    _run(storage.save_sdr_session({"session_id": "new", "degraded_steps": "{}"}))
+    rows = {r["session_id"]: r for r in _run(storage.list_sdr_sessions())}
+    assert rows["old"]["call_outcome"] == "interested"
+    assert rows["new"]["degraded_steps"] == "{}"
+    _run(storage.stop())
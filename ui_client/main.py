@@ -6,11 +6,14 @@ Provides:
   - HTML dashboard at / and /dashboard
   - WebSocket at /ws for real-time event streaming
   - /agent_callback endpoint for agents to POST status updates
+  - /agent_callback/batch endpoint for batched status updates
   - /start_lead_finding to trigger Lead Finder
   - /start_sdr to trigger SDR Agent
   - /start_email_processing to trigger Lead Manager
   - /api/businesses, /api/events for frontend data
   - /api/human-input for human-in-the-loop feedback
+  - /api/traces for the trace store behind the dashboard's waterfall view
+  - /metrics in Prometheus text format
 """
 
 from __future__ import annotations
@@ -18,30 +21,39 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 
-import httpx
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
+from pydantic import ValidationError
 
 from common.config import (
     LEAD_FINDER_SERVICE_URL,
     LEAD_MANAGER_SERVICE_URL,
+    SDR_DEADLINE_SECONDS,
     SDR_SERVICE_URL,
     UI_CLIENT_URL,
     UI_CLIENT_PORT,
 )
+from common import deadline, metrics, tracing
+from common.idempotency import IDEMPOTENCY_HEADER
+from common.http_clients import close_clients, get_client, open_clients
 from common.models import (
     AgentCallback,
     FindLeadsRequest,
     SDRRequest,
     ProcessEmailsRequest,
+    dumps,
+    loads,
+    parse_callbacks,
 )
+from common.tracing import TraceStore, current_trace_id
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -56,16 +68,23 @@ connected_clients: list[WebSocket] = []
 event_log: list[dict] = []
 businesses: dict[str, dict] = {}
 human_input_requests: dict[str, dict] = {}  # request_id → {prompt, response, resolved}
+trace_store = TraceStore()  # spans from every service (see common.tracing)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"UI Client starting at http://localhost:{UI_CLIENT_PORT}")
+    open_clients("lead_finder", "lead_manager", "sdr")
     yield
+    await close_clients()
     logger.info("UI Client shutting down")
 
 
 app = FastAPI(title="RapidReach Dashboard", lifespan=lifespan)
+tracing.instrument_app(app, "ui_client", sink=trace_store.add)
+metrics.instrument_app(app)
+metrics.gauge("rapidreach_websocket_clients", "Connected dashboard WebSocket clients", fn=lambda: len(connected_clients))
+metrics.gauge("rapidreach_traces_stored", "Traces held in the dashboard trace store", fn=lambda: len(trace_store))
 
 # Mount static files
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
@@ -79,11 +98,12 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 # ── WebSocket broadcasting ───────────────────────────────────
 
 async def broadcast(event: dict):
-    """Send an event to all connected WebSocket clients."""
+    """Send an event to all connected WebSocket clients (serialized once)."""
+    text = dumps(event).decode()
     dead = []
     for ws in connected_clients:
         try:
-            await ws.send_json(event)
+            await ws.send_text(text)
         except Exception:
             dead.append(ws)
     for ws in dead:
@@ -145,12 +165,8 @@ async def websocket_endpoint(websocket: WebSocket):
 
 # ── Agent Callback endpoint ─────────────────────────────────
 
-@app.post("/agent_callback")
-async def agent_callback(callback: AgentCallback):
-    """
-    Receive status updates from any agent service.
-    Stores the event and broadcasts to all WebSocket clients.
-    """
+def _ingest_callback(callback: AgentCallback) -> dict:
+    """Store a callback event and update the business index. Returns the event dict."""
     event = callback.model_dump()
     event_log.append(event)
 
@@ -167,6 +183,17 @@ async def agent_callback(callback: AgentCallback):
             if pid:
                 businesses[pid] = lead
 
+    return event
+
+
+@app.post("/agent_callback")
+async def agent_callback(callback: AgentCallback):
+    """
+    Receive status updates from any agent service.
+    Stores the event and broadcasts to all WebSocket clients.
+    """
+    event = _ingest_callback(callback)
+
     # Broadcast to all connected WebSocket clients
     await broadcast({
         "type": "agent_event",
@@ -176,10 +203,41 @@ async def agent_callback(callback: AgentCallback):
     return {"status": "received"}
 
 
+@app.post("/agent_callback/batch")
+async def agent_callback_batch(request: Request):
+    """
+    Receive a batch of status updates (see common.callbacks.CallbackEmitter).
+    Ingests every event, then broadcasts them in a single WebSocket frame per client.
+    The body is validated straight from bytes in one pass (common.models.parse_callbacks).
+    """
+    try:
+        callbacks = parse_callbacks(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    events = [_ingest_callback(cb) for cb in callbacks]
+    if events:
+        await broadcast({
+            "type": "agent_event_batch",
+            "events": [{"type": "agent_event", **ev} for ev in events],
+        })
+    return {"status": "received", "count": len(events)}
+
+
 # ── Workflow triggers ────────────────────────────────────────
 
+def _idempotency_headers(key: str | None, response: Response) -> dict[str, str]:
+    """
+    Idempotency-Key for the downstream trigger: the caller's (the dashboard
+    sends one per action and reuses it on retry), or a fresh one. It is echoed
+    back on the response so any caller can retry into the same run.
+    """
+    key = key or uuid.uuid4().hex
+    response.headers[IDEMPOTENCY_HEADER] = key
+    return {IDEMPOTENCY_HEADER: key}
+
+
 @app.post("/start_lead_finding")
-async def start_lead_finding(req: FindLeadsRequest):
+async def start_lead_finding(req: FindLeadsRequest, response: Response, idempotency_key: str | None = Header(default=None)):
     """Trigger Lead Finder service for a city."""
     req.callback_url = req.callback_url or f"{UI_CLIENT_URL}/agent_callback"
 
@@ -189,15 +247,17 @@ async def start_lead_finding(req: FindLeadsRequest):
         "event": "user_started",
         "message": f"Starting lead search in {req.city}...",
         "timestamp": datetime.utcnow().isoformat(),
+        "trace_id": current_trace_id(),
     })
 
     try:
-        async with httpx.AsyncClient(timeout=120) as client:
-            resp = await client.post(
-                f"{LEAD_FINDER_SERVICE_URL}/find_leads",
-                json=req.model_dump(),
-            )
-            return resp.json()
+        resp = await get_client("lead_finder").post(
+            f"{LEAD_FINDER_SERVICE_URL}/find_leads",
+            json=req.model_dump(),
+            headers=_idempotency_headers(idempotency_key, response),
+            timeout=120,
+        )
+        return resp.json()
     except Exception as e:
         error_msg = f"Lead Finder unavailable: {str(e)}"
         await broadcast({
@@ -211,7 +271,7 @@ async def start_lead_finding(req: FindLeadsRequest):
 
 
 @app.post("/start_sdr")
-async def start_sdr(req: SDRRequest):
+async def start_sdr(req: SDRRequest, response: Response, idempotency_key: str | None = Header(default=None)):
     """Trigger SDR Agent for a business."""
     req.callback_url = req.callback_url or f"{UI_CLIENT_URL}/agent_callback"
 
@@ -221,31 +281,36 @@ async def start_sdr(req: SDRRequest):
         "event": "user_started",
         "message": f"Starting SDR outreach for {req.business_name}...",
         "timestamp": datetime.utcnow().isoformat(),
+        "trace_id": current_trace_id(),
     })
 
     try:
-        async with httpx.AsyncClient(timeout=300) as client:
-            resp = await client.post(
+        # The SDR pipeline plans its steps around the time we are prepared to wait
+        with deadline.scope(SDR_DEADLINE_SECONDS):
+            resp = await get_client("sdr").post(
                 f"{SDR_SERVICE_URL}/run_sdr",
                 json=req.model_dump(),
+                headers=_idempotency_headers(idempotency_key, response),
+                timeout=SDR_DEADLINE_SECONDS,
             )
-            return resp.json()
+        return resp.json()
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @app.post("/start_email_processing")
-async def start_email_processing(req: ProcessEmailsRequest):
+async def start_email_processing(req: ProcessEmailsRequest, response: Response, idempotency_key: str | None = Header(default=None)):
     """Trigger Lead Manager to process inbox."""
     req.callback_url = req.callback_url or f"{UI_CLIENT_URL}/agent_callback"
 
     try:
-        async with httpx.AsyncClient(timeout=120) as client:
-            resp = await client.post(
-                f"{LEAD_MANAGER_SERVICE_URL}/process_emails",
-                json=req.model_dump(),
-            )
-            return resp.json()
+        resp = await get_client("lead_manager").post(
+            f"{LEAD_MANAGER_SERVICE_URL}/process_emails",
+            json=req.model_dump(),
+            headers=_idempotency_headers(idempotency_key, response),
+            timeout=120,
+        )
+        return resp.json()
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -266,9 +331,8 @@ async def get_events(limit: int = 50):
 async def get_sdr_sessions():
     """Fetch SDR session data from SDR service."""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(f"{SDR_SERVICE_URL}/api/sessions")
-            return resp.json()
+        resp = await get_client("sdr").get(f"{SDR_SERVICE_URL}/api/sessions", timeout=30)
+        return resp.json()
     except Exception as e:
         logger.error(f"Failed to fetch SDR sessions: {e}")
         return {"sessions": {}, "error": str(e)}
@@ -278,14 +342,68 @@ async def get_sdr_sessions():
 async def get_meetings():
     """Fetch meetings data from Lead Manager service."""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(f"{LEAD_MANAGER_SERVICE_URL}/api/meetings")
-            return resp.json()
+        resp = await get_client("lead_manager").get(f"{LEAD_MANAGER_SERVICE_URL}/api/meetings", timeout=30)
+        return resp.json()
     except Exception as e:
         logger.error(f"Failed to fetch meetings: {e}")
         return {"meetings": [], "error": str(e)}
 
 
+@app.get("/api/llm_usage")
+async def get_llm_usage(request: Request):
+    """LLM ledger rows from the SDR service (?session_id=, ?lead_place_id=, ?limit=)."""
+    try:
+        resp = await get_client("sdr").get(
+            f"{SDR_SERVICE_URL}/api/llm_usage", params=dict(request.query_params), timeout=30
+        )
+        return resp.json()
+    except Exception as e:
+        logger.error(f"Failed to fetch LLM usage: {e}")
+        return {"calls": [], "error": str(e)}
+
+
+@app.get("/api/llm_usage/summary")
+async def get_llm_usage_summary(request: Request):
+    """LLM cost/latency aggregates from the SDR service (?by=lead|session|city|call_site|model|service|outcome)."""
+    try:
+        resp = await get_client("sdr").get(
+            f"{SDR_SERVICE_URL}/api/llm_usage/summary", params=dict(request.query_params), timeout=30
+        )
+        return JSONResponse(resp.json(), status_code=resp.status_code)
+    except Exception as e:
+        logger.error(f"Failed to fetch LLM usage summary: {e}")
+        return {"groups": [], "error": str(e)}
+
+
+# ── Traces ───────────────────────────────────────────────────
+
+@app.post("/api/traces/spans")
+async def ingest_spans(request: Request):
+    """Receive a batch of finished spans from an agent (common.tracing.SpanExporter)."""
+    try:
+        spans = loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON list of spans")
+    if not isinstance(spans, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON list of spans")
+    return {"status": "received", "stored": trace_store.add(s for s in spans if isinstance(s, dict))}
+
+
+@app.get("/api/traces")
+async def list_traces(limit: int = 50):
+    """Most recently active traces, newest first."""
+    return {"traces": trace_store.summaries(limit), "total": len(trace_store)}
+
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Every span of one trace, ordered by start time (for the waterfall view)."""
+    spans = trace_store.get(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"trace_id": trace_id, "spans": spans}
+
+
 # ── Human-in-the-loop ───────────────────────────────────────
 
 @app.post("/api/human-input/request")
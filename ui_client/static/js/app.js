@@ -12,6 +12,8 @@ const state = {
     events: [],
     sdrSessions: [],      // populated from /api/sdr_sessions
     meetingsData: [],      // populated from /api/meetings + SDR invites
+    traces: [],            // trace summaries from /api/traces
+    selectedTrace: null,
     stats: {
         totalLeads: 0,
         contacted: 0,
@@ -88,6 +90,11 @@ function handleMessage(data) {
     } else if (data.type === 'agent_event') {
         addEventToLog(data);
         handleAgentEvent(data);
+    } else if (data.type === 'agent_event_batch') {
+        (data.events || []).forEach(evt => {
+            addEventToLog(evt);
+            handleAgentEvent(evt);
+        });
     } else if (data.type === 'human_input_request') {
         showHumanInputModal(data);
     } else if (data.type === 'heartbeat') {
@@ -202,6 +209,14 @@ function addEventToLog(evt) {
         <span class="event-badge badge-${agentType}">${agentType.replace('_', ' ')}</span>
         <span class="event-message">${escapeHtml(message)}</span>
     `;
+    if (evt.trace_id) {
+        const link = document.createElement('a');
+        link.className = 'event-trace';
+        link.textContent = 'trace';
+        link.title = evt.trace_id;
+        link.addEventListener('click', () => openTrace(evt.trace_id));
+        item.appendChild(link);
+    }
 
     // Prepend (newest first)
     log.insertBefore(item, log.firstChild);
@@ -248,6 +263,35 @@ function renderLeadsTable() {
 
 // ── Actions ──────────────────────────────────────────────────
 
+// Idempotency-Key per user action (endpoint + request body). A retry of the
+// same action after a timeout or error reuses it, so the backend hands back
+// the run that is already going instead of starting a second one.
+const pendingActionKeys = new Map();
+
+function newIdempotencyKey() {
+    if (crypto.randomUUID) return crypto.randomUUID();
+    // randomUUID needs a secure context; the dashboard may be served over plain http
+    return Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function postTrigger(url, payload) {
+    const body = JSON.stringify(payload);
+    const action = url + ' ' + body;
+    if (!pendingActionKeys.has(action)) pendingActionKeys.set(action, newIdempotencyKey());
+
+    const resp = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Idempotency-Key': pendingActionKeys.get(action),
+        },
+        body: body,
+    });
+    const data = await resp.json();
+    if (resp.ok && data.status !== 'error') pendingActionKeys.delete(action);
+    return data;
+}
+
 async function findLeads() {
     const city = document.getElementById('city-input').value.trim();
     if (!city) {
@@ -264,18 +308,13 @@ async function findLeads() {
     showLeadsLoading(true);
 
     try {
-        const resp = await fetch('/start_lead_finding', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                city: city,
-                max_results: maxResults,
-                business_types: [],
-                exclude_chains: true,
-                min_rating: 0,
-            }),
+        const data = await postTrigger('/start_lead_finding', {
+            city: city,
+            max_results: maxResults,
+            business_types: [],
+            exclude_chains: true,
+            min_rating: 0,
         });
-        const data = await resp.json();
         if (data.status === 'error') {
             alert('Error: ' + data.message);
         }
@@ -299,21 +338,16 @@ async function startSDR(name, placeId, email, address, city) {
     switchTab('outreach');
 
     try {
-        const resp = await fetch('/start_sdr', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                business_name: name,
-                phone: phone,
-                email: email,
-                address: address,
-                city: city,
-                place_id: placeId,
-                skip_call: skipCall,
-                deck_template: deckTemplate,
-            }),
+        const data = await postTrigger('/start_sdr', {
+            business_name: name,
+            phone: phone,
+            email: email,
+            address: address,
+            city: city,
+            place_id: placeId,
+            skip_call: skipCall,
+            deck_template: deckTemplate,
         });
-        const data = await resp.json();
         if (data.status === 'error') {
             alert('SDR Error: ' + data.message);
             showTabLoading('outreach', false);
@@ -334,12 +368,7 @@ async function processEmails() {
     switchTab('meetings');
 
     try {
-        const resp = await fetch('/start_email_processing', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ max_emails: 10 }),
-        });
-        const data = await resp.json();
+        const data = await postTrigger('/start_email_processing', { max_emails: 10 });
         if (data.status === 'error') {
             alert('Error: ' + data.message);
         }
@@ -391,6 +420,8 @@ function switchTab(tabName) {
         loadSDROutreach();
     } else if (tabName === 'meetings') {
         loadMeetings();
+    } else if (tabName === 'traces') {
+        loadTraces();
     }
 }
 
@@ -594,6 +625,123 @@ function closeModal() {
     document.getElementById('modal-overlay')?.classList.remove('active');
 }
 
+// ── Traces (waterfall) ───────────────────────────────────────
+
+async function loadTraces() {
+    try {
+        const resp = await fetch('/api/traces?limit=50');
+        const data = await resp.json();
+        state.traces = data.traces || [];
+        renderTraceList();
+        const selected = state.selectedTrace || (state.traces[0] && state.traces[0].trace_id);
+        if (selected) await showTrace(selected);
+    } catch (e) {
+        console.warn('Failed to fetch traces:', e);
+    }
+}
+
+function openTrace(traceId) {
+    state.selectedTrace = traceId;
+    switchTab('traces');
+}
+
+function renderTraceList() {
+    const list = document.getElementById('trace-list');
+    if (!list || state.traces.length === 0) return;
+
+    list.innerHTML = state.traces.map(t => `
+        <div class="trace-item${t.trace_id === state.selectedTrace ? ' active' : ''}" data-trace="${escapeHtml(t.trace_id)}">
+            <div class="trace-item-name">${escapeHtml(t.name)}</div>
+            <div class="trace-item-meta">
+                ${formatMs(t.duration_ms)} · ${t.span_count} spans · ${escapeHtml(t.services.join(', '))}
+                ${t.error_count ? `<span class="trace-error-count">${t.error_count} errors</span>` : ''}
+            </div>
+        </div>
+    `).join('');
+
+    list.querySelectorAll('.trace-item').forEach(el => {
+        el.addEventListener('click', () => showTrace(el.dataset.trace));
+    });
+}
+
+async function showTrace(traceId) {
+    state.selectedTrace = traceId;
+    renderTraceList();
+    const container = document.getElementById('trace-waterfall');
+    if (!container) return;
+    try {
+        const resp = await fetch(`/api/traces/${encodeURIComponent(traceId)}`);
+        if (!resp.ok) {
+            container.innerHTML = '<div style="color:var(--text-dim); padding:20px;">Trace not found (yet) — spans are exported every second.</div>';
+            return;
+        }
+        const data = await resp.json();
+        renderWaterfall(container, data.spans || []);
+    } catch (e) {
+        console.warn('Failed to fetch trace:', e);
+    }
+}
+
+function renderWaterfall(container, spans) {
+    if (spans.length === 0) {
+        container.innerHTML = '';
+        return;
+    }
+
+    // Depth-first order: each span directly below its parent, siblings by start time
+    const ids = new Set(spans.map(s => s.span_id));
+    const children = {};
+    spans.forEach(s => {
+        const key = ids.has(s.parent_id) ? s.parent_id : '';
+        (children[key] = children[key] || []).push(s);
+    });
+    const rows = [];
+    const walk = (key, depth) => {
+        (children[key] || [])
+            .sort((a, b) => a.start_ms - b.start_ms)
+            .forEach(s => {
+                rows.push({ span: s, depth });
+                walk(s.span_id, depth + 1);
+            });
+    };
+    walk('', 0);
+
+    const t0 = Math.min(...spans.map(s => s.start_ms));
+    const t1 = Math.max(...spans.map(s => s.start_ms + (s.duration_ms || 0)));
+    const total = Math.max(t1 - t0, 1);
+
+    container.innerHTML = `
+        <div class="waterfall-header">
+            <span>${escapeHtml(rows[0].span.name)}</span>
+            <span>${formatMs(total)}</span>
+        </div>
+    ` + rows.map(({ span, depth }) => {
+        const left = ((span.start_ms - t0) / total) * 100;
+        const width = Math.max(((span.duration_ms || 0) / total) * 100, 0.3);
+        const title = `${span.service} · ${span.name} · ${formatMs(span.duration_ms)}`
+            + (span.error ? `\n${span.error}` : '')
+            + (Object.keys(span.attributes || {}).length ? `\n${JSON.stringify(span.attributes)}` : '');
+        return `
+            <div class="waterfall-row" title="${escapeHtml(title)}">
+                <div class="waterfall-label" style="padding-left:${depth * 14}px;">
+                    <span class="span-service">${escapeHtml(span.service)}</span>
+                    ${escapeHtml(span.name)}
+                </div>
+                <div class="waterfall-track">
+                    <div class="waterfall-bar kind-${escapeHtml(span.kind)}${span.status === 'error' ? ' span-error' : ''}"
+                         style="left:${left}%;width:${width}%;"></div>
+                    <span class="waterfall-duration" style="left:${Math.min(left + width, 92)}%;">${formatMs(span.duration_ms)}</span>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+function formatMs(ms) {
+    if (ms == null) return '…';
+    return ms >= 1000 ? `${(ms / 1000).toFixed(2)} s` : `${ms.toFixed(1)} ms`;
+}
+
 // ── Helpers ──────────────────────────────────────────────────
 
 function escapeHtml(str) {